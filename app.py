@@ -1,16 +1,33 @@
 """App principal - Corretor de Questões SAEB de Múltipla Escolha"""
 
+import math
 import streamlit as st
 import sys
+import time
 from pathlib import Path
 
 # Adicionar src ao path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.analisador import AnalisadorQuestoes
+from src.agregados import AgregadosRespostas
 from src.prompt_generator import GeradorPromptsQuestoes
-from src.questoes_saeb import listar_todas_questoes, obter_descritores_unicos
-from src.file_parser import ParserArquivos, formatar_questoes_extraidas
+from src.questoes_saeb import (
+    listar_todas_questoes, obter_descritores_unicos, obter_questao, obter_questoes_por_descritor, obter_versao_banco
+)
+from src.file_parser import extrair_questoes_arquivos
+from src.busca import buscar_questoes, paginar
+from src.fila_tarefas import obter_fila, PENDENTE, EXECUTANDO, CONCLUIDA
+
+# Questões exibidas por página no modo de consulta
+POR_PAGINA_CONSULTA = 10
+
+# Opções de questões por página na lista extraída de arquivos (a primeira é o padrão);
+# só a página atual é desenhada, então o custo de cada interação não cresce com o arquivo
+OPCOES_POR_PAGINA_ARQUIVO = [10, 25, 50, 100]
+
+# Intervalo entre consultas ao andamento da extração em segundo plano (segundos)
+INTERVALO_CONSULTA_TAREFA = 1.0
 
 # Configuração da página
 st.set_page_config(
@@ -77,6 +94,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Recursos compartilhados entre sessões e reexecuções do script. Os que
+# dependem das questões recebem a versão do banco como chave: uma alteração
+# no banco gera uma nova entrada e as antigas saem pelo max_entries.
+
+@st.cache_resource(max_entries=1)
+def obter_analisador(versao_banco):
+    """Analisador das questões do banco na versão informada"""
+    return AnalisadorQuestoes()
+
+@st.cache_resource
+def obter_gerador_prompts():
+    """Gerador de prompts (sem estado, um por processo)"""
+    return GeradorPromptsQuestoes()
+
+@st.cache_data(max_entries=2)
+def opcoes_selecao_questoes(versao_banco):
+    """Rótulos do seletor de questões mapeados para o id de cada questão"""
+    return {f"Q{q['id']} - {q['descritor']}: {q['competencia'][:40]}...": q['id'] for q in listar_todas_questoes()}
+
+@st.cache_data(max_entries=2)
+def descritores_banco(versao_banco):
+    """Descritores presentes no banco, para o filtro da consulta"""
+    return obter_descritores_unicos()
+
 def init_session_state():
     """Inicializa variáveis de sessão"""
     if "analise_realizada" not in st.session_state:
@@ -93,6 +134,98 @@ def init_session_state():
         st.session_state.analise_arquivo = None
     if "mensagem_extracao" not in st.session_state:
         st.session_state.mensagem_extracao = ""
+    if "relatorio_paginas" not in st.session_state:
+        st.session_state.relatorio_paginas = []
+    if "relatorio_lote" not in st.session_state:
+        st.session_state.relatorio_lote = []
+    if "tarefa_extracao" not in st.session_state:
+        st.session_state.tarefa_extracao = None
+    if "respostas_arquivo" not in st.session_state:
+        st.session_state.respostas_arquivo = {}
+    if "resultados_respondidos" not in st.session_state:
+        st.session_state.resultados_respondidos = {}
+    if "agregados_sessao" not in st.session_state:
+        st.session_state.agregados_sessao = AgregadosRespostas()
+
+def registrar_resposta_sessao(id_questao, resposta):
+    """
+    Corrige a resposta escolhida e atualiza os agregados da sessão
+    
+    Só a questão alterada é corrigida; o resultado anterior dela é
+    descontado dos contadores antes de contar o novo.
+    """
+    st.session_state.questoes_respondidas[id_questao] = resposta
+    anterior = st.session_state.resultados_respondidos.pop(id_questao, None)
+    if anterior is not None:
+        st.session_state.agregados_sessao.remover(anterior)
+    
+    resultado = obter_analisador(obter_versao_banco()).analisar_resposta(id_questao, resposta)
+    if "erro" not in resultado:
+        st.session_state.agregados_sessao.registrar(resultado)
+        st.session_state.resultados_respondidos[id_questao] = resultado
+
+def analise_sessao(ids_questoes):
+    """
+    Análise das respostas da sessão no formato de `analisar_multiplas_respostas`
+    
+    Totais e descritores vêm dos contadores já mantidos; nada é recorrigido.
+    """
+    analise = st.session_state.agregados_sessao.resumo()
+    resultados = st.session_state.resultados_respondidos
+    analise["resultados_individuais"] = [resultados[i] for i in ids_questoes if i in resultados]
+    
+    por_descritor = {}
+    for resultado in analise["resultados_individuais"]:
+        por_descritor.setdefault(resultado["descritor"], []).append(resultado)
+    analise["analise_por_descritor"] = por_descritor
+    
+    return analise
+
+def selecionar_pagina(itens, chave, rotulo_salto):
+    """
+    Mostra os controles de paginação de uma lista e retorna a página atual
+    
+    Tamanho da página, página e o item escolhido em "ir para" ficam em
+    st.session_state com o prefixo `chave`. Escolher um item, ou mudar o
+    tamanho da página, leva à página que contém o item escolhido.
+    
+    Returns:
+        Dict de `paginar`, com "inicio" (posição, a partir de 1, do primeiro
+        item da página)
+    """
+    chave_tamanho, chave_pagina, chave_salto = f"{chave}_por_pagina", f"{chave}_pagina", f"{chave}_ir_para"
+    st.session_state.setdefault(chave_tamanho, OPCOES_POR_PAGINA_ARQUIVO[0])
+    st.session_state.setdefault(chave_pagina, 1)
+    st.session_state.setdefault(chave_salto, 1)
+    
+    total_paginas = max(1, math.ceil(len(itens) / st.session_state[chave_tamanho]))
+    st.session_state[chave_pagina] = min(st.session_state[chave_pagina], total_paginas)
+    st.session_state[chave_salto] = min(st.session_state[chave_salto], max(1, len(itens)))
+    
+    def ir_para_item():
+        st.session_state[chave_pagina] = (st.session_state[chave_salto] - 1) // st.session_state[chave_tamanho] + 1
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.selectbox("Itens por página:", OPCOES_POR_PAGINA_ARQUIVO, key=chave_tamanho, on_change=ir_para_item)
+    
+    with col2:
+        st.number_input(f"Página (de {total_paginas}):", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+    
+    with col3:
+        st.number_input(rotulo_salto, min_value=1, max_value=max(1, len(itens)), step=1,
+                        key=chave_salto, on_change=ir_para_item)
+    
+    pagina = paginar(itens, st.session_state[chave_pagina], st.session_state[chave_tamanho])
+    pagina['inicio'] = (pagina['pagina'] - 1) * pagina['por_pagina'] + 1
+    return pagina
+
+def limpar_paginacao(*chaves):
+    """Volta as listas paginadas com esses prefixos para a primeira página"""
+    for chave in chaves:
+        for sufixo in ("_pagina", "_ir_para"):
+            st.session_state.pop(f"{chave}{sufixo}", None)
 
 def copiar_para_clipboard(texto, label="📋 Copiar para Clipboard"):
     """Cria um componente para copiar texto enviando como download primeiro"""
@@ -164,8 +297,7 @@ def main():
         
         with col1:
             st.subheader("Selecione a Questão")
-            questoes = listar_todas_questoes()
-            opcoes_questoes = {f"Q{q['id']} - {q['descritor']}: {q['competencia'][:40]}...": q['id'] for q in questoes}
+            opcoes_questoes = opcoes_selecao_questoes(obter_versao_banco())
             
             questao_selecionada_texto = st.selectbox(
                 "Questões disponíveis:",
@@ -174,7 +306,7 @@ def main():
             )
             
             id_questao = opcoes_questoes[questao_selecionada_texto]
-            questao = next(q for q in questoes if q['id'] == id_questao)
+            questao = obter_questao(id_questao)
             
             # Mostrar questão
             with st.expander("📖 Ver Enunciado", expanded=True):
@@ -197,7 +329,7 @@ def main():
             st.write("")
             
             if st.button("🔍 Analisar Resposta", use_container_width=True, type="primary"):
-                analisador = AnalisadorQuestoes()
+                analisador = obter_analisador(obter_versao_banco())
                 resultado = analisador.analisar_resposta(id_questao, resposta)
                 st.session_state.resultado_analise = resultado
                 st.session_state.analise_realizada = True
@@ -235,7 +367,7 @@ def main():
             
             # Sugestões
             with st.expander("📚 Como Responder Corretamente"):
-                analisador = AnalisadorQuestoes()
+                analisador = obter_analisador(obter_versao_banco())
                 sugestoes = analisador.obter_sugestoes_melhoria(id_questao)
                 
                 st.write("**Passo a Passo para Resolver:**")
@@ -249,7 +381,7 @@ def main():
             st.info("Clique abaixo para gerar um prompt que pode ser usado em ChatGPT, Claude ou outra IA para obter feedback detalhado.")
             
             if st.button("📋 Gerar Prompt Completo", use_container_width=True):
-                gerador = GeradorPromptsQuestoes()
+                gerador = obter_gerador_prompts()
                 prompt = gerador.gerar_prompt_correcao_completa(resultado)
                 
                 st.markdown("### 📄 Prompt para IA")
@@ -278,15 +410,15 @@ def main():
                         key=f"q_{questao['id']}"
                     )
                     
-                    st.session_state.questoes_respondidas[questao['id']] = resposta
+                    if st.session_state.questoes_respondidas.get(questao['id']) != resposta:
+                        registrar_resposta_sessao(questao['id'], resposta)
         
         with col2:
             st.subheader("📊 Análise")
             
             if st.button("📊 Analisar Todas", use_container_width=True, type="primary"):
                 if st.session_state.questoes_respondidas:
-                    analisador = AnalisadorQuestoes()
-                    analise = analisador.analisar_multiplas_respostas(st.session_state.questoes_respondidas)
+                    analise = analise_sessao([questao['id'] for questao in questoes])
                     st.session_state.resultado_analise = analise
                     st.session_state.analise_realizada = True
                     st.rerun()
@@ -344,7 +476,7 @@ def main():
             st.subheader("🤖 Gerar Relatório para IA")
             
             if st.button("📄 Gerar Prompt de Relatório", use_container_width=True):
-                gerador = GeradorPromptsQuestoes()
+                gerador = obter_gerador_prompts()
                 prompt = gerador.gerar_prompt_multiplas_questoes(analise)
                 
                 copiar_para_clipboard(prompt, "📥 Baixar Relatório")
@@ -355,6 +487,7 @@ def main():
         st.info("""
         📤 **Upload de Arquivo**
         - Suporte para PDF, DOCX e Imagens (JPG, PNG)
+        - Vários arquivos ou um ZIP com todo o material da escola de uma vez
         - Sistema extrai questões automaticamente via OCR
         - Você confirma e responde as questões
         - Análise nos mesmos moldes do sistema
@@ -364,27 +497,27 @@ def main():
         
         with col1:
             st.subheader("📁 Upload do Arquivo")
-            arquivo = st.file_uploader(
-                "Selecione um arquivo:",
-                type=["pdf", "docx", "jpg", "jpeg", "png", "bmp"],
+            arquivos = st.file_uploader(
+                "Selecione um ou mais arquivos:",
+                type=["pdf", "docx", "jpg", "jpeg", "png", "bmp", "zip"],
+                accept_multiple_files=True,
                 label_visibility="collapsed"
             )
             
-            if arquivo:
-                st.markdown(f"**Arquivo selecionado:** {arquivo.name}")
+            if arquivos:
+                if len(arquivos) == 1:
+                    st.markdown(f"**Arquivo selecionado:** {arquivos[0].name}")
+                else:
+                    st.markdown(f"**{len(arquivos)} arquivos selecionados**")
                 
                 if st.button("🔍 Extrair Questões", use_container_width=True, type="primary"):
+                    # A extração roda na fila em segundo plano; a sessão guarda só o id
                     st.session_state.arquivo_processado = True
-                    
-                    with st.spinner("🔄 Processando arquivo..."):
-                        parser = ParserArquivos()
-                        questoes_extraidas, mensagem = parser.processar_arquivo(
-                            arquivo.read(),
-                            arquivo.name
-                        )
-                    
-                    st.session_state.questoes_extraidas = formatar_questoes_extraidas(questoes_extraidas)
-                    st.session_state.mensagem_extracao = mensagem
+                    st.session_state.tarefa_extracao = obter_fila().enviar(
+                        "extracao",
+                        extrair_questoes_arquivos,
+                        [(arquivo.name, arquivo.getvalue()) for arquivo in arquivos]
+                    )
                     st.rerun()
         
         with col2:
@@ -394,6 +527,7 @@ def main():
             - 📄 PDF
             - 📝 DOCX
             - 🖼️ Imagens (JPG, PNG)
+            - 📦 ZIP com arquivos desses formatos
             
             **Como funciona:**
             1. Suba seu arquivo com as questões
@@ -403,6 +537,35 @@ def main():
             5. Receba análise completa
             """)
         
+        # Andamento da extração em segundo plano
+        if st.session_state.tarefa_extracao:
+            fila = obter_fila()
+            tarefa = fila.status(st.session_state.tarefa_extracao)
+            
+            if tarefa is None:
+                st.session_state.tarefa_extracao = None
+            elif tarefa['estado'] in (PENDENTE, EXECUTANDO):
+                if tarefa['estado'] == PENDENTE:
+                    texto = f"⏳ Aguardando na fila ({fila.pendentes()} tarefa(s) em andamento)..."
+                else:
+                    texto = tarefa['mensagem'] or "🔄 Processando arquivo..."
+                st.progress(tarefa['progresso'], text=texto)
+                time.sleep(INTERVALO_CONSULTA_TAREFA)
+                st.rerun()
+            elif tarefa['estado'] == CONCLUIDA:
+                resultado = fila.resultado(st.session_state.tarefa_extracao)
+                st.session_state.questoes_extraidas = resultado['questoes']
+                st.session_state.mensagem_extracao = resultado['mensagem']
+                st.session_state.relatorio_paginas = resultado['relatorio_paginas']
+                st.session_state.relatorio_lote = resultado['relatorio_lote']
+                st.session_state.tarefa_extracao = None
+                st.session_state.respostas_arquivo = {}
+                st.session_state.analise_arquivo = None
+                limpar_paginacao("lista_arquivo", "lista_analise_arquivo")
+            else:
+                st.error(f"❌ Erro ao processar arquivo: {tarefa['erro']}")
+                st.session_state.tarefa_extracao = None
+        
         # Mostrar resultado da extração
         if hasattr(st.session_state, 'questoes_extraidas') and st.session_state.questoes_extraidas:
             st.divider()
@@ -410,15 +573,31 @@ def main():
             # Mensagem de status
             st.markdown(f"<div class='resultado-box'>{st.session_state.mensagem_extracao}</div>", unsafe_allow_html=True)
             
+            # Tempo de extração por página (PDF)
+            if st.session_state.relatorio_paginas:
+                relatorio = st.session_state.relatorio_paginas
+                tempo_total = sum(p['segundos'] for p in relatorio)
+                with st.expander(f"⏱️ Extração: {len(relatorio)} página(s) em {tempo_total:.2f}s de processamento"):
+                    st.dataframe(relatorio, use_container_width=True, hide_index=True)
+            
+            # Resultado de cada arquivo do lote
+            if st.session_state.relatorio_lote:
+                with st.expander(f"📦 Arquivos do lote ({len(st.session_state.relatorio_lote)})"):
+                    st.dataframe(st.session_state.relatorio_lote, use_container_width=True, hide_index=True)
+            
             questoes_arquivo = st.session_state.questoes_extraidas
             
             st.subheader(f"📋 {len(questoes_arquivo)} Questão(ões) Extraída(s)")
             
-            # Permitir responder as questões
-            respostas = {}
+            # Respostas guardadas na sessão: continuam valendo ao trocar de página
+            respostas = st.session_state.respostas_arquivo
+            pagina = selecionar_pagina(questoes_arquivo, "lista_arquivo", "Ir para a questão:")
+            destaque = st.session_state.lista_arquivo_ir_para
             
-            for i, q in enumerate(questoes_arquivo, 1):
-                with st.expander(f"Questão {i}", expanded=(i==1)):
+            for i, q in enumerate(pagina['itens'], pagina['inicio']):
+                with st.expander(f"Questão {i}", expanded=(i == destaque)):
+                    if q.get('arquivo'):
+                        st.caption(f"📁 {q['arquivo']}")
                     st.write(f"**Enunciado:**\n{q['enunciado']}")
                     
                     st.write("\n**Alternativas:**")
@@ -430,14 +609,19 @@ def main():
                             alternativas_lista.append(letra)
                     
                     # Input para resposta
+                    resposta_salva = respostas.get(q['id'])
                     resposta = st.radio(
                         "Sua resposta:",
                         alternativas_lista,
+                        index=alternativas_lista.index(resposta_salva) if resposta_salva in alternativas_lista else 0,
                         key=f"arquivo_resposta_{q['id']}"
                     )
                     
                     respostas[q['id']] = resposta
             
+            st.caption(f"✍️ {len(respostas)} de {len(questoes_arquivo)} questão(ões) respondida(s); "
+                       "questões de páginas ainda não abertas ficam fora da análise")
+            
             st.divider()
             
             if st.button("📊 Analisar Todas as Questões", use_container_width=True, type="primary"):
@@ -458,14 +642,19 @@ def main():
                         analise_resultados.append(resultado)
                 
                 st.session_state.analise_arquivo = analise_resultados
+                limpar_paginacao("lista_analise_arquivo")
                 st.rerun()
             
             # Mostrar análise se já foi feita
-            if hasattr(st.session_state, 'analise_arquivo'):
+            if st.session_state.analise_arquivo:
                 st.divider()
                 st.subheader("📊 Análise das Questões")
                 
-                for resultado in st.session_state.analise_arquivo:
+                pagina_analise = selecionar_pagina(
+                    st.session_state.analise_arquivo, "lista_analise_arquivo", "Ir para o resultado:"
+                )
+                
+                for resultado in pagina_analise['itens']:
                     with st.expander(f"Questão {resultado['questao_id']}: Você respondeu {resultado['resposta_aluno']}"):
                         st.write(f"**Enunciado:**\n{resultado['enunciado']}")
                         st.write(f"\n**Sua resposta:** {resultado['resposta_aluno']}")
@@ -531,18 +720,40 @@ Gere agora uma análise educativa, construtiva e motivadora.
     elif modo == "🔍 Consultar Questões":
         st.header("Banco de Questões SAEB")
         
-        descritores = obter_descritores_unicos()
-        questoes = listar_todas_questoes()
+        descritores = descritores_banco(obter_versao_banco())
         
-        # Filtrar por descritor
-        descritor_selecionado = st.selectbox(
-            "Filtrar por descritor:",
-            descritores
-        )
+        col1, col2, col3 = st.columns([3, 1, 1])
+        
+        with col1:
+            # Busca textual em enunciados, alternativas e justificativas
+            consulta = st.text_input(
+                "Buscar por palavras-chave:",
+                placeholder="Ex.: Cabral, conectivo, poema"
+            )
+        
+        with col2:
+            # Filtrar por descritor
+            descritor_selecionado = st.selectbox(
+                "Filtrar por descritor:",
+                ["Todos"] + descritores
+            )
+        
+        with col3:
+            pagina = st.number_input("Página:", min_value=1, value=1, step=1)
+        
+        descritor_filtro = None if descritor_selecionado == "Todos" else descritor_selecionado
+        
+        if consulta.strip():
+            resultado_consulta = buscar_questoes(consulta, pagina, POR_PAGINA_CONSULTA, descritor_filtro)
+        elif descritor_filtro:
+            resultado_consulta = paginar(obter_questoes_por_descritor(descritor_filtro), pagina, POR_PAGINA_CONSULTA)
+        else:
+            resultado_consulta = paginar(listar_todas_questoes(), pagina, POR_PAGINA_CONSULTA)
         
-        questoes_filtradas = [q for q in questoes if q['descritor'] == descritor_selecionado]
+        questoes_filtradas = resultado_consulta['itens']
         
-        st.write(f"**{len(questoes_filtradas)} questão(ões) para {descritor_selecionado}**")
+        st.write(f"**{resultado_consulta['total']} questão(ões) encontrada(s)** · "
+                 f"página {resultado_consulta['pagina']} de {resultado_consulta['total_paginas']}")
         
         for questao in questoes_filtradas:
             with st.expander(f"Q{questao['id']} - {questao['competencia'][:50]}..."):
@@ -0,0 +1,137 @@
+"""
+Benchmark da Leitura de DOCX
+Mede a extração de questões de um DOCX sintético com parágrafos, tabelas e caixas de texto
+
+Uso (na raiz do projeto):
+    python -m benchmarks.benchmark_docx --questoes 2000 --repeticoes 5
+
+O documento é gerado como o Word grava: cada caixa de texto aparece em
+mc:Choice (DrawingML) e de novo em mc:Fallback (VML). Cada questão precisa
+ser extraída uma única vez, esteja no corpo, em uma tabela ou em uma caixa.
+"""
+
+import argparse
+import io
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from src.file_parser import ParserArquivos, iterar_paragrafos_docx
+
+NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml" '
+    'mc:Ignorable="wps"'
+)
+
+TIPOS_CONTEUDO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+RELACOES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+
+def _paragrafo(texto: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(texto)}</w:t></w:r></w:p>'
+
+
+def _linhas_questao(numero: int):
+    return [f"Questão {numero}", f"Enunciado da questão {numero}."] + [
+        f"{letra}) alternativa {letra.lower()} da questão {numero}" for letra in "ABCD"
+    ]
+
+
+def _caixa_texto(linhas) -> str:
+    """Parágrafo âncora com a caixa de texto nas duas cópias gravadas pelo Word"""
+    conteudo = "<w:txbxContent>" + "".join(_paragrafo(linha) for linha in linhas) + "</w:txbxContent>"
+    return (
+        "<w:p><w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing><wps:txbx>{conteudo}</wps:txbx></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:shape><v:textbox>{conteudo}</v:textbox></v:shape></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+
+
+def _tabela(linhas) -> str:
+    return "<w:tbl><w:tr><w:tc>" + "".join(_paragrafo(linha) for linha in linhas) + "</w:tc></w:tr></w:tbl>"
+
+
+def gerar_docx(questoes: int) -> bytes:
+    """DOCX em que as questões se alternam entre corpo, tabela e caixa de texto"""
+    blocos = []
+    for numero in range(1, questoes + 1):
+        linhas = _linhas_questao(numero)
+        if numero % 3 == 0:
+            blocos.append(_caixa_texto(linhas))
+        elif numero % 3 == 1:
+            blocos.append(_tabela(linhas))
+        else:
+            blocos.extend(_paragrafo(linha) for linha in linhas)
+        blocos.append(_paragrafo(""))
+
+    documento = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document {NAMESPACES}><w:body>{"".join(blocos)}</w:body></w:document>'
+    )
+
+    saida = io.BytesIO()
+    with zipfile.ZipFile(saida, "w", zipfile.ZIP_DEFLATED) as pacote:
+        pacote.writestr("[Content_Types].xml", TIPOS_CONTEUDO)
+        pacote.writestr("_rels/.rels", RELACOES)
+        pacote.writestr("word/document.xml", documento)
+    return saida.getvalue()
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Melhor tempo entre as repetições, em segundos"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument("--questoes", type=int, default=2000)
+    argumentos.add_argument("--repeticoes", type=int, default=5)
+    opcoes = argumentos.parse_args()
+
+    arquivo = gerar_docx(opcoes.questoes)
+    parser = ParserArquivos(cache=False)
+
+    paragrafos = list(iterar_paragrafos_docx(arquivo))
+    titulos = [linha for linha in paragrafos if linha.startswith("Questão ")]
+    if len(titulos) != opcoes.questoes or len(set(titulos)) != opcoes.questoes:
+        raise SystemExit("❌ Parágrafos de caixas de texto lidos mais de uma vez (ou perdidos)")
+
+    questoes, mensagem = parser._processar_docx(arquivo)
+    if len(questoes) != opcoes.questoes:
+        raise SystemExit(f"❌ {len(questoes)} questões extraídas, esperadas {opcoes.questoes}: {mensagem}")
+
+    print(f"{opcoes.questoes} questões, {len(arquivo) / 1024:.0f} KB, {len(paragrafos)} parágrafos")
+
+    tempo_leitura = medir(lambda: sum(1 for _ in iterar_paragrafos_docx(arquivo)), opcoes.repeticoes)
+    tempo_extracao = medir(lambda: parser._processar_docx(arquivo), opcoes.repeticoes)
+
+    for rotulo, tempo in [("leitura", tempo_leitura), ("extração", tempo_extracao)]:
+        print(f"{rotulo:<10}{tempo * 1000:>10.1f} ms{opcoes.questoes / tempo:>14,.0f} questões/s")
+
+
+if __name__ == "__main__":
+    main()
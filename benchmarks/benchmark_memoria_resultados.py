@@ -0,0 +1,90 @@
+"""
+Benchmark de Memória dos Resultados de Correção
+Compara a memória e o tempo de N resultados de `analisar_resposta` com o dict anterior
+
+Uso (na raiz do projeto):
+    python -m benchmarks.benchmark_memoria_resultados --resultados 100000
+
+O resultado anterior (um dict com cópia do feedback por resposta) está
+congelado abaixo como referência; os dois precisam ter o mesmo conteúdo.
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Dict
+
+from src.analisador import AnalisadorQuestoes, _renderizar_feedback
+from src.questoes_saeb import listar_todas_questoes, obter_questao
+
+
+# --- Implementação anterior (congelada) ---
+
+def _analisar_resposta_legado(analisador: AnalisadorQuestoes, id_questao, resposta_aluno) -> Dict:
+    questao = obter_questao(id_questao)
+    resposta_aluno = resposta_aluno.upper().strip() if resposta_aluno else ""
+    acertou = resposta_aluno == questao["resposta_correta"]
+
+    return {
+        "questao_id": id_questao,
+        "descritor": questao["descritor"],
+        "competencia": questao["competencia"],
+        "enunciado": questao["enunciado"],
+        "alternativas": questao["alternativas"],
+        "resposta_aluno": resposta_aluno,
+        "resposta_correta": questao["resposta_correta"],
+        "acertou": acertou,
+        "justificativa": questao["justificativa"],
+        "tipo_texto": questao["tipo_texto"],
+        "sugestoes_procedimentais": questao["sugestoes"],
+        # Sem o cache de textos: cada resultado tinha a própria cópia do feedback
+        "feedback": _renderizar_feedback(acertou, questao, resposta_aluno),
+        "pontuacao": 10 if acertou else 0
+    }
+
+
+# --- Benchmark ---
+
+def medir(funcao, respostas):
+    """Memória retida (bytes) e tempo (s) para criar todos os resultados"""
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultados = [funcao(id_questao, letra) for id_questao, letra in respostas]
+    segundos = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultados, memoria, segundos
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument("--resultados", type=int, default=100000)
+    opcoes = argumentos.parse_args()
+
+    aleatorio = random.Random(0)
+    ids = [q["id"] for q in listar_todas_questoes()]
+    respostas = [(aleatorio.choice(ids), aleatorio.choice("ABCD")) for _ in range(opcoes.resultados)]
+    analisador = AnalisadorQuestoes()
+
+    anteriores, memoria_legado, tempo_legado = medir(
+        lambda id_questao, letra: _analisar_resposta_legado(analisador, id_questao, letra), respostas
+    )
+    amostra = [dict(r) for r in anteriores[:1000]]
+    del anteriores
+
+    atuais, memoria_atual, tempo_atual = medir(analisador.analisar_resposta, respostas)
+    if [dict(r) for r in atuais[:1000]] != amostra:
+        raise SystemExit("❌ Os resultados têm conteúdo diferente")
+
+    print(f"{opcoes.resultados:,} resultado(s)")
+    print(f"{'':<10}{'memória':>12}{'por resultado':>16}{'tempo':>10}")
+    for rotulo, memoria, tempo in [("anterior", memoria_legado, tempo_legado), ("compacto", memoria_atual, tempo_atual)]:
+        print(f"{rotulo:<10}{memoria / 2**20:>9.1f} MB{memoria / opcoes.resultados:>14.0f} B{tempo:>9.2f}s")
+    print(f"redução: {memoria_legado / memoria_atual:.1f}x menos memória")
+
+
+if __name__ == "__main__":
+    main()
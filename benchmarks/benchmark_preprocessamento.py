@@ -0,0 +1,132 @@
+"""
+Benchmark do Pré-processamento de Imagens para OCR
+Compara tempo e precisão do Tesseract com e sem pré-processamento
+
+Uso (na raiz do projeto):
+    python -m benchmarks.benchmark_preprocessamento --amostras pasta_com_fotos
+    python -m benchmarks.benchmark_preprocessamento --config '{"dpi_alvo": 200}'
+
+Cada imagem da pasta pode ter um .txt de mesmo nome com o texto esperado;
+sem ele, só o tempo é medido. Sem --amostras, são geradas páginas sintéticas
+no formato de fotos de celular (12 MP, coloridas e inclinadas); metade delas
+é gravada como JPEG com o DPI padrão de câmera (72), como as fotos reais.
+"""
+
+import argparse
+import difflib
+import io
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+import pytesseract
+
+from src.file_parser import EXTENSOES_IMAGEM
+from src.preprocessamento import preprocessar_imagem
+
+FRASES = [
+    "Leia o texto abaixo e responda à questão.",
+    "O autor utiliza a expressão para indicar uma opinião.",
+    "A finalidade do texto é informar o leitor sobre o evento.",
+    "No trecho, a palavra destacada refere-se ao personagem.",
+    "Qual é o assunto principal do texto lido?",
+    "A) informar  B) convencer  C) divertir  D) instruir",
+]
+
+
+def gerar_amostras(quantidade: int, semente: int = 0):
+    """Gera páginas com texto conhecido fotografadas de forma simulada"""
+    aleatorio = random.Random(semente)
+
+    try:
+        fonte = ImageFont.truetype("DejaVuSans.ttf", 42)
+    except OSError:
+        fonte = ImageFont.load_default()
+
+    for indice in range(quantidade):
+        linhas = [f"Questão {indice + 1}"] + [aleatorio.choice(FRASES) for _ in range(25)]
+        pagina = Image.new("RGB", (2480, 3508), (236, 231, 220))
+        desenho = ImageDraw.Draw(pagina)
+        for numero, linha in enumerate(linhas):
+            desenho.text((180, 250 + numero * 80), linha, fill=(25, 25, 35), font=fonte)
+
+        angulo = aleatorio.uniform(-4, 4)
+        foto = pagina.rotate(angulo, expand=True, fillcolor=(236, 231, 220)).resize((3024, 4032))
+        nome = f"sintetica_{indice + 1}"
+
+        if indice % 2:
+            # Como sai da câmera: JPEG com 72 DPI registrados, que não valem para a página
+            arquivo = io.BytesIO()
+            foto.save(arquivo, "JPEG", quality=90, dpi=(72, 72))
+            foto = Image.open(io.BytesIO(arquivo.getvalue()))
+            nome += "_72dpi"
+
+        yield nome, foto, "\n".join(linhas)
+
+
+def carregar_amostras(pasta: Path):
+    """Lê as imagens da pasta e o texto esperado de cada uma, se houver"""
+    for caminho in sorted(pasta.iterdir()):
+        if caminho.suffix.lower() not in EXTENSOES_IMAGEM:
+            continue
+        esperado = caminho.with_suffix(".txt")
+        texto = esperado.read_text(encoding="utf-8") if esperado.exists() else None
+        yield caminho.name, Image.open(caminho), texto
+
+
+def precisao(reconhecido: str, esperado: str) -> float:
+    """Similaridade entre os textos, ignorando diferenças de espaçamento"""
+    return difflib.SequenceMatcher(None, " ".join(reconhecido.split()), " ".join(esperado.split())).ratio()
+
+
+def medir(amostras, config, idioma: str):
+    tempos_preprocessamento, tempos_ocr, precisoes, lados = [], [], [], []
+
+    for nome, imagem, esperado in amostras:
+        imagem_processada, info = preprocessar_imagem(imagem, config)
+        inicio = time.perf_counter()
+        texto = pytesseract.image_to_string(imagem_processada, lang=idioma)
+        tempos_ocr.append(time.perf_counter() - inicio)
+        tempos_preprocessamento.append(info["segundos_preprocessamento"])
+        lados.append(max(imagem_processada.size))
+
+        if esperado is not None:
+            precisoes.append(precisao(texto, esperado))
+
+    return {
+        "preprocessamento_s": statistics.mean(tempos_preprocessamento),
+        "ocr_s": statistics.mean(tempos_ocr),
+        "total_s": statistics.mean(tempos_preprocessamento) + statistics.mean(tempos_ocr),
+        "precisao": statistics.mean(precisoes) if precisoes else None,
+        "lado_maximo": max(lados)
+    }
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument("--amostras", type=Path, help="Pasta com imagens (e .txt com o texto esperado)")
+    argumentos.add_argument("--quantidade", type=int, default=5, help="Páginas sintéticas geradas sem --amostras")
+    argumentos.add_argument("--config", type=json.loads, default={}, help="Configuração de pré-processamento (JSON)")
+    argumentos.add_argument("--idioma", default="por")
+    opcoes = argumentos.parse_args()
+
+    if opcoes.amostras:
+        amostras = list(carregar_amostras(opcoes.amostras))
+    else:
+        amostras = list(gerar_amostras(opcoes.quantidade))
+
+    print(f"{len(amostras)} imagem(ns)")
+    print(f"{'configuração':<16}{'pré (s)':>10}{'OCR (s)':>10}{'total (s)':>11}{'precisão':>10}{'maior lado':>12}")
+
+    for rotulo, config in [("original", {"ativo": False}), ("pré-processada", opcoes.config)]:
+        resultado = medir(amostras, config, opcoes.idioma)
+        taxa = f"{resultado['precisao']:.1%}" if resultado["precisao"] is not None else "-"
+        print(f"{rotulo:<16}{resultado['preprocessamento_s']:>10.2f}{resultado['ocr_s']:>10.2f}"
+              f"{resultado['total_s']:>11.2f}{taxa:>10}{resultado['lado_maximo']:>12}")
+
+
+if __name__ == "__main__":
+    main()
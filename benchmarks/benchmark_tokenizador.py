@@ -0,0 +1,167 @@
+"""
+Benchmark do Extrator de Questões
+Compara a vazão (linhas/s) do classificador compilado com a implementação anterior
+
+Uso (na raiz do projeto):
+    python -m benchmarks.benchmark_tokenizador --paginas 200 --repeticoes 5
+
+A implementação anterior está congelada abaixo, como referência de
+resultado e de desempenho; as duas precisam extrair as mesmas questões.
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from src.file_parser import ParserArquivos
+
+LINHAS_ENUNCIADO = [
+    "Leia o texto abaixo e responda à questão.",
+    "O menino correu até a praça para ver os fogos.",
+    "Qual é a finalidade do texto?",
+    "No trecho, a palavra destacada refere-se a quem?",
+    "",
+]
+
+
+# --- Implementação anterior (congelada) ---
+
+def _extrair_questoes_legado(texto: str) -> List[Dict]:
+    questoes = []
+    linhas = texto.split('\n')
+
+    i = 0
+    numero_questao = 1
+
+    while i < len(linhas):
+        linha = linhas[i].strip()
+
+        if re.match(r'^(questão|q|q\.|questão)\s*[\d]+', linha, re.IGNORECASE):
+            questao_dict = _extrair_questao_bloco_legado(linhas, i)
+
+            if questao_dict.get('alternativas'):
+                questao_dict['id'] = numero_questao
+                questoes.append(questao_dict)
+                numero_questao += 1
+                i += questao_dict.get('linhas_processadas', 1)
+            else:
+                i += 1
+        else:
+            i += 1
+
+    return questoes
+
+
+def _extrair_questao_bloco_legado(linhas: List[str], indice_inicio: int) -> Dict:
+    questao = {
+        'enunciado': '',
+        'alternativas': {},
+        'linhas_processadas': 0
+    }
+
+    i = indice_inicio
+    blocos_enunciado = []
+    alternativas_encontradas = {}
+
+    while i < len(linhas):
+        linha = linhas[i].strip()
+
+        if re.match(r'^[a-dA-D]\)', linha):
+            break
+
+        if linha and not re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
+            blocos_enunciado.append(linha)
+
+        i += 1
+
+    questao['enunciado'] = ' '.join(blocos_enunciado)
+
+    while i < len(linhas):
+        linha = linhas[i].strip()
+
+        match = re.match(r'^([a-dA-D])\)\s*(.*)', linha)
+        if match:
+            letra = match.group(1).upper()
+            texto = match.group(2)
+            alternativas_encontradas[letra] = texto
+            i += 1
+        elif re.match(r'^[a-dA-D]\)', linha):
+            i += 1
+        elif linha and re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
+            break
+        elif not linha:
+            i += 1
+        else:
+            if alternativas_encontradas:
+                ultima_letra = list(alternativas_encontradas.keys())[-1]
+                alternativas_encontradas[ultima_letra] += ' ' + linha
+            i += 1
+
+    questao['alternativas'] = alternativas_encontradas
+    questao['linhas_processadas'] = i - indice_inicio
+
+    return questao if alternativas_encontradas else {}
+
+
+# --- Benchmark ---
+
+def gerar_texto(paginas: int, questoes_por_pagina: int = 3, semente: int = 0) -> str:
+    """Texto no formato de um caderno de prova extraído de PDF"""
+    aleatorio = random.Random(semente)
+    linhas = []
+    numero = 1
+
+    for pagina in range(paginas):
+        linhas.append(f"SAEB - Língua Portuguesa - página {pagina + 1}")
+        for _ in range(questoes_por_pagina):
+            linhas.append(f"Questão {numero}")
+            linhas.extend(aleatorio.choice(LINHAS_ENUNCIADO) for _ in range(aleatorio.randint(3, 12)))
+            for letra in "ABCD":
+                linhas.append(f"{letra}) alternativa {letra.lower()} da questão {numero}")
+                if aleatorio.random() < 0.2:
+                    linhas.append("continuação da alternativa em outra linha")
+            linhas.append("")
+            numero += 1
+
+    return "\n".join(linhas)
+
+
+def medir(funcao, texto: str, repeticoes: int) -> float:
+    """Melhor tempo entre as repetições, em segundos"""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument("--paginas", type=int, default=200)
+    argumentos.add_argument("--repeticoes", type=int, default=5)
+    opcoes = argumentos.parse_args()
+
+    texto = gerar_texto(opcoes.paginas)
+    total_linhas = texto.count("\n") + 1
+    parser = ParserArquivos(cache=False)
+
+    esperado = _extrair_questoes_legado(texto)
+    obtido = parser._extrair_questoes_do_texto(texto)
+    if obtido != esperado:
+        raise SystemExit("❌ As implementações extraíram questões diferentes")
+
+    print(f"{opcoes.paginas} página(s), {total_linhas} linhas, {len(esperado)} questões")
+
+    tempo_legado = medir(_extrair_questoes_legado, texto, opcoes.repeticoes)
+    tempo_atual = medir(parser._extrair_questoes_do_texto, texto, opcoes.repeticoes)
+
+    for rotulo, tempo in [("anterior", tempo_legado), ("compilado", tempo_atual)]:
+        print(f"{rotulo:<10}{tempo * 1000:>10.1f} ms{total_linhas / tempo:>14,.0f} linhas/s")
+    print(f"ganho: {tempo_legado / tempo_atual:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
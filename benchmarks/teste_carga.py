@@ -0,0 +1,185 @@
+"""
+Teste de Carga da API de Correção
+Mede latência (p50/p90/p99) e requisições por segundo contra a API HTTP
+
+Uso (na raiz do projeto):
+    python -m benchmarks.teste_carga --iniciar-servidor --workers 2 --conexoes 32 --segundos 10
+    python -m benchmarks.teste_carga --url http://127.0.0.1:8000 --cenario lote
+
+Cada conexão mantém o keep-alive e envia requisições em sequência; o
+cliente usa apenas asyncio, sem dependências. Com --iniciar-servidor, a API
+é iniciada (python -m src.api) na porta indicada e encerrada ao final.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from src.questoes_saeb import listar_todas_questoes
+
+LETRAS = "ABCD"
+
+
+def gerar_requisicoes(cenario: str, quantidade: int = 200, semente: int = 0) -> List[Tuple[str, Dict]]:
+    """Pares (rota, corpo) sorteados, percorridos em ciclo pelas conexões"""
+    aleatorio = random.Random(semente)
+    ids = [q["id"] for q in listar_todas_questoes()]
+
+    def analisar():
+        return "/analisar", {"id_questao": aleatorio.choice(ids), "resposta": aleatorio.choice(LETRAS)}
+
+    def multiplas():
+        return "/analisar-multiplas", {"respostas": {str(i): aleatorio.choice(LETRAS) for i in ids}}
+
+    def prompt():
+        return "/prompts/correcao", {"id_questao": aleatorio.choice(ids), "resposta": aleatorio.choice(LETRAS)}
+
+    def lote():
+        requisicoes = [{"rota": rota, "corpo": corpo} for rota, corpo in (analisar() for _ in range(50))]
+        return "/lote", {"requisicoes": requisicoes}
+
+    geradores = {
+        "analisar": [analisar],
+        "multiplas": [multiplas],
+        "prompt": [prompt],
+        "lote": [lote],
+        "misto": [analisar, analisar, analisar, multiplas, prompt]
+    }[cenario]
+
+    return [aleatorio.choice(geradores)() for _ in range(quantidade)]
+
+
+async def _requisitar(leitor, escritor, host: str, rota: str, corpo: bytes) -> int:
+    """Envia um POST HTTP/1.1 na conexão aberta e lê a resposta inteira"""
+    escritor.write(
+        f"POST {rota} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n\r\n".encode("ascii") + corpo
+    )
+    await escritor.drain()
+
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        if nome.strip().lower() == "content-length":
+            tamanho = int(valor)
+
+    await leitor.readexactly(tamanho)
+    return status
+
+
+async def _conexao(host: str, porta: int, requisicoes, inicio_indice: int, fim: float, latencias: List[float],
+                   erros: List[int]):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    indice = inicio_indice
+
+    try:
+        while time.perf_counter() < fim:
+            rota, corpo = requisicoes[indice % len(requisicoes)]
+            indice += 1
+            inicio = time.perf_counter()
+            status = await _requisitar(leitor, escritor, host, rota, corpo)
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        escritor.close()
+
+
+async def executar(url: str, cenario: str, conexoes: int, segundos: float, aquecimento: float) -> Dict:
+    partes = urlsplit(url)
+    host, porta = partes.hostname, partes.port or 80
+    requisicoes = [(rota, json.dumps(corpo).encode("utf-8")) for rota, corpo in gerar_requisicoes(cenario)]
+
+    # Aquecimento: descarta as primeiras requisições (imports, caches)
+    if aquecimento > 0:
+        fim = time.perf_counter() + aquecimento
+        await asyncio.gather(*(_conexao(host, porta, requisicoes, i, fim, [], []) for i in range(conexoes)))
+
+    latencias, erros = [], []
+    inicio = time.perf_counter()
+    fim = inicio + segundos
+    await asyncio.gather(*(
+        _conexao(host, porta, requisicoes, i * 7, fim, latencias, erros) for i in range(conexoes)
+    ))
+    decorrido = time.perf_counter() - inicio
+
+    return {"latencias": latencias, "erros": erros, "segundos": decorrido}
+
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def aguardar_servidor(host: str, porta: int, limite: float = 30.0):
+    """Espera a API aceitar conexões"""
+    fim = time.time() + limite
+
+    async def tentar():
+        leitor, escritor = await asyncio.open_connection(host, porta)
+        escritor.close()
+
+    while True:
+        try:
+            asyncio.run(tentar())
+            return
+        except OSError:
+            if time.time() > fim:
+                raise SystemExit("❌ A API não respondeu a tempo")
+            time.sleep(0.2)
+
+
+def main():
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument("--url", default="http://127.0.0.1:8000")
+    argumentos.add_argument("--cenario", choices=["analisar", "multiplas", "prompt", "lote", "misto"], default="misto")
+    argumentos.add_argument("--conexoes", type=int, default=32, help="Conexões simultâneas")
+    argumentos.add_argument("--segundos", type=float, default=10.0)
+    argumentos.add_argument("--aquecimento", type=float, default=1.0, help="Segundos descartados no início")
+    argumentos.add_argument("--iniciar-servidor", action="store_true", help="Inicia a API antes do teste")
+    argumentos.add_argument("--workers", type=int, default=1, help="Processos da API (com --iniciar-servidor)")
+    opcoes = argumentos.parse_args()
+
+    partes = urlsplit(opcoes.url)
+    servidor = None
+    if opcoes.iniciar_servidor:
+        servidor = subprocess.Popen([
+            sys.executable, "-m", "src.api", "--host", partes.hostname,
+            "--porta", str(partes.port or 80), "--workers", str(opcoes.workers)
+        ])
+        aguardar_servidor(partes.hostname, partes.port or 80)
+
+    try:
+        resultado = asyncio.run(
+            executar(opcoes.url, opcoes.cenario, opcoes.conexoes, opcoes.segundos, opcoes.aquecimento)
+        )
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias = resultado["latencias"]
+    if not latencias:
+        raise SystemExit("❌ Nenhuma requisição concluída")
+
+    print(f"cenário {opcoes.cenario}, {opcoes.conexoes} conexão(ões), {resultado['segundos']:.1f}s")
+    print(f"requisições: {len(latencias):,}   erros: {len(resultado['erros'])}")
+    print(f"req/s:       {len(latencias) / resultado['segundos']:,.0f}")
+    for rotulo, p in [("p50", 50), ("p90", 90), ("p99", 99)]:
+        print(f"{rotulo}:         {percentil(latencias, p) * 1000:.2f} ms")
+    print(f"média:       {statistics.mean(latencias) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
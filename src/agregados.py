@@ -0,0 +1,233 @@
+"""
+Agregados Incrementais de Respostas
+Contadores por questão, descritor, turma e escola atualizados a cada resposta corrigida
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS agregados (
+    tipo_escopo TEXT NOT NULL,
+    escopo TEXT NOT NULL,
+    nivel TEXT NOT NULL,
+    chave TEXT NOT NULL,
+    respostas INTEGER NOT NULL,
+    acertos INTEGER NOT NULL,
+    PRIMARY KEY (tipo_escopo, escopo, nivel, chave)
+) WITHOUT ROWID;
+"""
+
+# Os deltas gravados se somam aos do arquivo, então vários processos podem
+# alimentar o mesmo arquivo sem sobrescrever as contagens uns dos outros
+SQL_SOMAR = """
+INSERT INTO agregados (tipo_escopo, escopo, nivel, chave, respostas, acertos) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (tipo_escopo, escopo, nivel, chave) DO UPDATE SET
+    respostas = respostas + excluded.respostas,
+    acertos = acertos + excluded.acertos
+"""
+
+# Escopos: a rede inteira, cada escola e cada turma (identificada com a escola)
+ESCOPO_GERAL = ("geral", "")
+
+# Alterações acumuladas em memória antes de gravar no arquivo
+INTERVALO_GRAVACAO_PADRAO = 1000
+
+
+def _escopo_turma(turma, escola) -> Tuple[str, str]:
+    """Turmas de mesmo nome em escolas diferentes são escopos diferentes"""
+    return ("turma", json.dumps(["" if escola is None else str(escola), str(turma)], ensure_ascii=False))
+
+
+def _escopos(turma, escola) -> List:
+    escopos = [ESCOPO_GERAL]
+    if escola is not None:
+        escopos.append(("escola", str(escola)))
+    if turma is not None:
+        escopos.append(_escopo_turma(turma, escola))
+    return escopos
+
+
+def _estatisticas(contador) -> Dict:
+    respostas, acertos = contador
+    return {
+        "respostas": respostas,
+        "acertos": acertos,
+        "erros": respostas - acertos,
+        "percentual_acerto": (acertos / respostas * 100) if respostas > 0 else 0
+    }
+
+
+class AgregadosRespostas:
+    """
+    Contadores de respostas e acertos mantidos a cada resultado corrigido
+
+    Cada resposta atualiza, em O(1), o total, o descritor e a questão da
+    rede e, se informadas, da escola e da turma. As leituras usam só os
+    contadores (O(descritores)), sem reler respostas. Com `caminho`, os
+    contadores são gravados em SQLite a cada `intervalo_gravacao` alterações
+    (ou em `salvar`) e recarregados quando outro processo altera o arquivo.
+    """
+
+    def __init__(self, caminho: Optional[str] = None, intervalo_gravacao: int = INTERVALO_GRAVACAO_PADRAO):
+        self.caminho = str(caminho) if caminho else None
+        self.intervalo_gravacao = intervalo_gravacao
+        # {(tipo_escopo, escopo): {nivel: {chave: [respostas, acertos]}}}
+        self._contadores = {}
+        # Deltas ainda não gravados: {(tipo_escopo, escopo, nivel, chave): [respostas, acertos]}
+        self._pendentes = {}
+        self._alteracoes_pendentes = 0
+        self._trava = threading.RLock()
+        self._conexao = None
+
+        if self.caminho:
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.executescript(ESQUEMA)
+            self._carregar()
+
+    def _ler_versao_dados(self) -> int:
+        return self._conexao.execute("PRAGMA data_version").fetchone()[0]
+
+    def _carregar(self):
+        """Lê os contadores do arquivo e reaplica os deltas ainda não gravados"""
+        self._versao_dados = self._ler_versao_dados()
+        self._contadores = {}
+        registros = self._conexao.execute(
+            "SELECT tipo_escopo, escopo, nivel, chave, respostas, acertos FROM agregados WHERE respostas > 0"
+        )
+        for tipo_escopo, escopo, nivel, chave, respostas, acertos in registros:
+            self._somar_memoria((tipo_escopo, escopo), nivel, json.loads(chave), respostas, acertos)
+        for (tipo_escopo, escopo, nivel, chave), (respostas, acertos) in self._pendentes.items():
+            self._somar_memoria((tipo_escopo, escopo), nivel, chave, respostas, acertos)
+
+    def _verificar_alteracoes_externas(self):
+        if self._conexao is not None and self._ler_versao_dados() != self._versao_dados:
+            self._carregar()
+
+    def _somar_memoria(self, escopo, nivel: str, chave, respostas: int, acertos: int):
+        contadores = self._contadores.setdefault(escopo, {}).setdefault(nivel, {})
+        contador = contadores.get(chave)
+
+        if contador is None:
+            contador = contadores[chave] = [0, 0]
+        contador[0] += respostas
+        contador[1] += acertos
+
+        if contador[0] <= 0:
+            del contadores[chave]
+
+    def _somar(self, resultado, turma, escola, sinal: int):
+        acertou = sinal if resultado["acertou"] else 0
+        chaves = (("total", ""), ("descritor", resultado["descritor"]), ("questao", resultado["questao_id"]))
+
+        with self._trava:
+            for escopo in _escopos(turma, escola):
+                for nivel, chave in chaves:
+                    self._somar_memoria(escopo, nivel, chave, sinal, acertou)
+                    if self._conexao is not None:
+                        delta = self._pendentes.setdefault((*escopo, nivel, chave), [0, 0])
+                        delta[0] += sinal
+                        delta[1] += acertou
+
+            if self._conexao is not None:
+                self._alteracoes_pendentes += 1
+                if self._alteracoes_pendentes >= self.intervalo_gravacao:
+                    self.salvar()
+
+    def registrar(self, resultado, turma=None, escola=None):
+        """
+        Conta um resultado de `analisar_resposta` nos agregados
+
+        Args:
+            resultado: Resultado com "questao_id", "descritor" e "acertou"
+            turma: Turma do aluno (opcional; contada junto com a escola)
+            escola: Escola do aluno (opcional)
+        """
+        self._somar(resultado, turma, escola, 1)
+
+    def remover(self, resultado, turma=None, escola=None):
+        """Desconta um resultado registrado antes (ex.: resposta alterada pelo aluno)"""
+        self._somar(resultado, turma, escola, -1)
+
+    def salvar(self):
+        """Grava os deltas pendentes no arquivo, em uma única transação"""
+        with self._trava:
+            if self._conexao is None or not self._pendentes:
+                return
+
+            registros = [
+                (tipo_escopo, escopo, nivel, json.dumps(chave), *delta)
+                for (tipo_escopo, escopo, nivel, chave), delta in self._pendentes.items() if delta != [0, 0]
+            ]
+            # Sem alterações de outros processos, a memória já reflete o arquivo após a gravação
+            externas = self._ler_versao_dados() != self._versao_dados
+            with self._conexao:
+                self._conexao.executemany(SQL_SOMAR, registros)
+            self._pendentes.clear()
+            self._alteracoes_pendentes = 0
+            if externas:
+                self._carregar()
+            else:
+                self._versao_dados = self._ler_versao_dados()
+
+    def _nivel(self, nivel: str, turma, escola) -> Dict:
+        escopo = _escopos(turma, escola)[-1]
+        self._verificar_alteracoes_externas()
+        return self._contadores.get(escopo, {}).get(nivel, {})
+
+    def resumo(self, turma=None, escola=None) -> Dict:
+        """
+        Resumo da turma (da escola informada), da escola ou da rede (sem turma e escola)
+
+        Returns:
+            Dict com "total_questoes", "acertos", "erros" e
+            "percentual_acerto" (como em `analisar_multiplas_respostas`),
+            "por_descritor" ({descritor: contagens}), "descritores_fortes"
+            (acerto total) e "descritores_fraco" (algum erro)
+        """
+        with self._trava:
+            total = _estatisticas(self._nivel("total", turma, escola).get("", (0, 0)))
+            por_descritor = {
+                descritor: _estatisticas(contador)
+                for descritor, contador in self._nivel("descritor", turma, escola).items()
+            }
+
+        return {
+            "total_questoes": total["respostas"],
+            "acertos": total["acertos"],
+            "erros": total["erros"],
+            "percentual_acerto": total["percentual_acerto"],
+            "por_descritor": por_descritor,
+            "descritores_fortes": [d for d, e in por_descritor.items() if e["erros"] == 0],
+            "descritores_fraco": [d for d, e in por_descritor.items() if e["erros"] > 0]
+        }
+
+    def por_questao(self, turma=None, escola=None) -> Dict:
+        """Contagens de cada questão: {id_questao: {"respostas", "acertos", "erros", "percentual_acerto"}}"""
+        with self._trava:
+            return {
+                id_questao: _estatisticas(contador)
+                for id_questao, contador in self._nivel("questao", turma, escola).items()
+            }
+
+    def listar_escopos(self, tipo_escopo: str) -> List:
+        """Escolas ("escola") ou pares (escola, turma) ("turma") com respostas registradas"""
+        with self._trava:
+            self._verificar_alteracoes_externas()
+            escopos = sorted(
+                escopo for (tipo, escopo), niveis in self._contadores.items()
+                if tipo == tipo_escopo and niveis.get("total")
+            )
+        if tipo_escopo == "turma":
+            return sorted(tuple(json.loads(escopo)) for escopo in escopos)
+        return escopos
+
+    def fechar(self):
+        """Grava os deltas pendentes e fecha o arquivo"""
+        with self._trava:
+            if self._conexao is not None:
+                self.salvar()
+                self._conexao.close()
+                self._conexao = None
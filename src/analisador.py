@@ -3,24 +3,230 @@ Módulo de Análise de Questões de Múltipla Escolha SAEB
 Corrige respostas e fornece feedback pedagógico
 """
 
-from src.questoes_saeb import obter_questao, listar_todas_questoes, obter_questoes_por_descritor
+import threading
+from collections.abc import Mapping
+
+from src.questoes_saeb import obter_questao, listar_todas_questoes, obter_questoes_por_descritor, obter_versao_banco
+from src.correcao_vetorizada import corrigir_matriz, montar_gabarito, TAMANHO_BLOCO_PADRAO
+
+# Textos de feedback guardados por (questão, alternativa, versão do banco)
+TAMANHO_CACHE_FEEDBACK = 4096
+
+TIPOS_QUESTAO = {
+    "D1": "Localização de informação explícita",
+    "D3": "Identificação de ideia principal",
+    "D4": "Inferência de informação implícita",
+    "D6": "Distinção entre fato e opinião",
+    "D9": "Identificação de causa e consequência",
+    "D11": "Avaliação de produção textual",
+    "D13": "Análise de coesão",
+    "D15": "Análise de vocabulário"
+}
+
+ESTRATEGIAS_DESCRITOR = {
+    "D1": [
+        "1. Leia o enunciado com atenção, procurando a pergunta específica",
+        "2. Procure no texto a palavra ou informação mencionada na pergunta",
+        "3. Encontre a resposta DIRETAMENTE no texto (não deduza)",
+        "4. Compare a resposta encontrada com as alternativas",
+        "5. Escolha a alternativa que corresponde exatamente ao texto"
+    ],
+    "D3": [
+        "1. Leia o texto inteiro uma primeira vez",
+        "2. Identifique a ideia que se repete ou que está em todo o texto",
+        "3. Procure por palavras-chave que definem o assunto central",
+        "4. Diferencie detalhes do tema principal (D1 encontra detalhes, D3 encontra o geral)",
+        "5. Escolha a alternativa que resume o texto todo, não apenas uma parte"
+    ],
+    "D4": [
+        "1. Leia o texto e observe detalhes que NÃO estão explícitos",
+        "2. Procure por sinais (gestos, tom, atmosfera) que sugerem algo",
+        "3. Use sua experiência de vida para deduzir o que virá",
+        "4. Procure por pergunta com 'conclui-se', 'deduz-se', 'infere-se'",
+        "5. A resposta está 'entre as linhas' do texto, não escrita exatamente"
+    ],
+    "D6": [
+        "1. Identifique cada afirmação como fato ou opinião",
+        "2. Fatos: são dados, números, datas, ações comprovadas",
+        "3. Opiniões: contêm julgamentos, avaliações, 'acho que', 'é importante'",
+        "4. Procure por indicadores de opinião: 'penso', 'acho', 'considero', 'ruim', 'bom'",
+        "5. Fatos são verificáveis; opiniões dependem de ponto de vista"
+    ],
+    "D9": [
+        "1. Identifique o PRIMEIRO evento (a causa inicial)",
+        "2. Trace a sequência: o que acontece POR CAUSA de quê?",
+        "3. Use conectivos como 'porque', 'como', 'portanto', 'então'",
+        "4. Organize em ordem lógica (não cronológica necessariamente)",
+        "5. Verifique se a sequência faz sentido: A causa B, B causa C, C causa D"
+    ],
+    "D11": [
+        "1. Identifique qual é o gênero textual esperado",
+        "2. Verifique se a estrutura está correta para esse gênero",
+        "3. Procure por argumentos válidos (não apenas afirmações)",
+        "4. Verifique se há exemplos, dados ou justificativas",
+        "5. Avalie se a linguagem e tom são apropriados ao gênero"
+    ],
+    "D13": [
+        "1. Procure por pronomes (ele, ela, seu, sua) que retomam pessoas/coisas",
+        "2. Identifique conectivos (e, mas, portanto, além disso)",
+        "3. Verifique se as ideias estão ligadas logicamente",
+        "4. Procure por repetição inteligente de termos usando sinônimos",
+        "5. O texto deve 'fluir' sem frases soltas desconectadas"
+    ],
+    "D15": [
+        "1. Procure por repetição da mesma palavra",
+        "2. Verifique se há sinônimos para variar o vocabulário",
+        "3. Palavras genéricas ('coisa', 'bom', 'ruim') são mais fracas",
+        "4. Palavras específicas e apropriadas melhoram a qualidade",
+        "5. Evite repetição; use diferentes estruturas e termos"
+    ]
+}
+
+EXEMPLOS_DESCRITOR = {
+    "D1": "Procure por questões que perguntam 'Onde?', 'Quando?', 'Quem?', 'Qual é?' - estas pedem informações diretas",
+    "D3": "Questões que perguntam 'Sobre o quê?' ou 'Qual é o tema?' - procure a ideia geral",
+    "D4": "Questões que perguntam 'O que se conclui?', 'O que se deduz?' - use pistas do texto",
+    "D6": "Procure textos que misturam dados reais com avaliações pessoais",
+    "D9": "Leia histórias em sequência lógica: por que uma ação causou outra",
+    "D11": "Leia vários gêneros e analise se cada texto segue seu padrão",
+    "D13": "Localize todos os pronomes e conectivos em um texto",
+    "D15": "Compare dois textos: um repetitivo e outro com vocabulário variado"
+}
+
+def _renderizar_feedback(acertou, questao, resposta_aluno):
+    """Monta o texto de feedback a partir da questão"""
+    
+    if acertou:
+        return f"""✅ PARABÉNS! Você acertou!
+
+Você escolheu a alternativa {resposta_aluno}: "{questao['alternativas'][resposta_aluno]}"
+
+Justificativa: {questao['justificativa']}
+
+Você identificou corretamente o descritor {questao['descritor']} - {questao['competencia']}"""
+    
+    else:
+        resposta_correta = questao["resposta_correta"]
+        texto_resposta_correta = questao["alternativas"][resposta_correta]
+        texto_sua_resposta = questao["alternativas"][resposta_aluno]
+        
+        return f"""❌ Sua resposta está incorreta.
+
+Você escolheu: {resposta_aluno} - "{texto_sua_resposta}"
+Resposta correta: {resposta_correta} - "{texto_resposta_correta}"
+
+Explicação: {questao['justificativa']}
+
+Descritor avaliado: {questao['descritor']} - {questao['competencia']}"""
+
+_cache_feedback = {}
+_trava_cache_feedback = threading.Lock()
+
+def gerar_feedback(acertou, questao, resposta_aluno):
+    """
+    Gera feedback personalizado baseado no resultado
+    
+    Cada texto é montado uma vez por questão e alternativa e guardado com a
+    versão do banco, então alterações feitas pelo banco geram um texto novo.
+    A entrada guarda a própria questão: o texto só é reaproveitado para o
+    mesmo objeto, nunca para outra questão com o mesmo id.
+    """
+    chave = (id(questao), resposta_aluno, acertou, obter_versao_banco())
+    entrada = _cache_feedback.get(chave)
+    
+    if entrada is not None and entrada[0] is questao:
+        return entrada[1]
+    
+    texto = _renderizar_feedback(acertou, questao, resposta_aluno)
+    
+    with _trava_cache_feedback:
+        if len(_cache_feedback) >= TAMANHO_CACHE_FEEDBACK:
+            del _cache_feedback[next(iter(_cache_feedback))]
+        _cache_feedback[chave] = (questao, texto)
+    
+    return texto
+
+# Campos do resultado de `analisar_resposta`, na ordem do antigo dict, com o
+# valor de cada um calculado a partir da questão compartilhada
+_CAMPOS_RESULTADO = {
+    "questao_id": lambda r: r.questao_id,
+    "descritor": lambda r: r.questao["descritor"],
+    "competencia": lambda r: r.questao["competencia"],
+    "enunciado": lambda r: r.questao["enunciado"],
+    "alternativas": lambda r: r.questao["alternativas"],
+    "resposta_aluno": lambda r: r.resposta_aluno,
+    "resposta_correta": lambda r: r.questao["resposta_correta"],
+    "acertou": lambda r: r.acertou,
+    "justificativa": lambda r: r.questao["justificativa"],
+    "tipo_texto": lambda r: r.questao["tipo_texto"],
+    "sugestoes_procedimentais": lambda r: r.questao["sugestoes"],
+    "feedback": lambda r: gerar_feedback(r.acertou, r.questao, r.resposta_aluno),
+    "pontuacao": lambda r: 10 if r.acertou else 0
+}
+
+class ResultadoResposta(Mapping):
+    """
+    Resultado da correção de uma resposta
+    
+    Guarda só o id, a letra, o acerto e uma referência à questão do banco;
+    textos da questão são lidos dela e o feedback é montado quando acessado.
+    Funciona como o dict somente leitura retornado antes por
+    `analisar_resposta` (resultado["acertou"], .get, .items, dict(resultado)).
+    """
+    
+    __slots__ = ("questao_id", "questao", "resposta_aluno", "acertou")
+    
+    def __init__(self, questao_id, questao, resposta_aluno, acertou):
+        self.questao_id = questao_id
+        self.questao = questao
+        self.resposta_aluno = resposta_aluno
+        self.acertou = acertou
+    
+    def __getitem__(self, campo):
+        return _CAMPOS_RESULTADO[campo](self)
+    
+    def __contains__(self, campo):
+        return campo in _CAMPOS_RESULTADO
+    
+    def __iter__(self):
+        return iter(_CAMPOS_RESULTADO)
+    
+    def __len__(self):
+        return len(_CAMPOS_RESULTADO)
+    
+    def __repr__(self):
+        return (f"ResultadoResposta(questao_id={self.questao_id!r}, "
+                f"resposta_aluno={self.resposta_aluno!r}, acertou={self.acertou!r})")
+    
+    def para_dict(self):
+        """Cópia em dict, com todos os campos preenchidos (ex.: para JSON)"""
+        return {campo: valor(self) for campo, valor in _CAMPOS_RESULTADO.items()}
 
 class AnalisadorQuestoes:
     """Analisa respostas de questões SAEB de múltipla escolha"""
     
-    def __init__(self):
+    def __init__(self, agregados=None):
+        """
+        Args:
+            agregados: AgregadosRespostas opcional; cada resposta corrigida
+                       por `analisar_resposta` é contada nele
+        """
         self.questoes = listar_todas_questoes()
+        self.agregados = agregados
     
-    def analisar_resposta(self, id_questao, resposta_aluno):
+    def analisar_resposta(self, id_questao, resposta_aluno, turma=None, escola=None):
         """
         Analisa a resposta de um aluno para uma questão específica
         
         Args:
             id_questao: ID da questão
             resposta_aluno: Alternativa escolhida (A, B, C ou D)
+            turma: Turma do aluno, para os agregados (opcional)
+            escola: Escola do aluno, para os agregados (opcional)
             
         Returns:
-            Dict com análise completa da resposta
+            ResultadoResposta (lido como dict) com a análise completa da
+            resposta, ou dict com "erro"
         """
         questao = obter_questao(id_questao)
         
@@ -41,50 +247,16 @@ class AnalisadorQuestoes:
         
         # Analisar resposta
         acertou = resposta_aluno == questao["resposta_correta"]
+        resultado = ResultadoResposta(id_questao, questao, resposta_aluno, acertou)
         
-        resultado = {
-            "questao_id": id_questao,
-            "descritor": questao["descritor"],
-            "competencia": questao["competencia"],
-            "enunciado": questao["enunciado"],
-            "alternativas": questao["alternativas"],
-            "resposta_aluno": resposta_aluno,
-            "resposta_correta": questao["resposta_correta"],
-            "acertou": acertou,
-            "justificativa": questao["justificativa"],
-            "tipo_texto": questao["tipo_texto"],
-            "sugestoes_procedimentais": questao["sugestoes"],
-            "feedback": self._gerar_feedback(acertou, questao, resposta_aluno),
-            "pontuacao": 10 if acertou else 0
-        }
+        if self.agregados is not None:
+            self.agregados.registrar(resultado, turma=turma, escola=escola)
         
         return resultado
     
     def _gerar_feedback(self, acertou, questao, resposta_aluno):
         """Gera feedback personalizado baseado no resultado"""
-        
-        if acertou:
-            return f"""✅ PARABÉNS! Você acertou!
-
-Você escolheu a alternativa {resposta_aluno}: "{questao['alternativas'][resposta_aluno]}"
-
-Justificativa: {questao['justificativa']}
-
-Você identificou corretamente o descritor {questao['descritor']} - {questao['competencia']}"""
-        
-        else:
-            resposta_correta = questao["resposta_correta"]
-            texto_resposta_correta = questao["alternativas"][resposta_correta]
-            texto_sua_resposta = questao["alternativas"][resposta_aluno]
-            
-            return f"""❌ Sua resposta está incorreta.
-
-Você escolheu: {resposta_aluno} - "{texto_sua_resposta}"
-Resposta correta: {resposta_correta} - "{texto_resposta_correta}"
-
-Explicação: {questao['justificativa']}
-
-Descritor avaliado: {questao['descritor']} - {questao['competencia']}"""
+        return gerar_feedback(acertou, questao, resposta_aluno)
     
     def obter_sugestoes_melhoria(self, id_questao):
         """Retorna sugestões pedagógicas para responder corretamente questões deste tipo"""
@@ -104,104 +276,24 @@ Descritor avaliado: {questao['descritor']} - {questao['competencia']}"""
     
     def _classificar_tipo_questao(self, descritor):
         """Classifica o tipo de questão pelo descritor"""
-        tipos = {
-            "D1": "Localização de informação explícita",
-            "D3": "Identificação de ideia principal",
-            "D4": "Inferência de informação implícita",
-            "D6": "Distinção entre fato e opinião",
-            "D9": "Identificação de causa e consequência",
-            "D11": "Avaliação de produção textual",
-            "D13": "Análise de coesão",
-            "D15": "Análise de vocabulário"
-        }
-        return tipos.get(descritor, "Questão de compreensão")
+        return TIPOS_QUESTAO.get(descritor, "Questão de compreensão")
     
     def _gerar_passo_a_passo(self, descritor):
         """Gera estratégia passo a passo para responder questões deste tipo"""
-        
-        estrategias = {
-            "D1": [
-                "1. Leia o enunciado com atenção, procurando a pergunta específica",
-                "2. Procure no texto a palavra ou informação mencionada na pergunta",
-                "3. Encontre a resposta DIRETAMENTE no texto (não deduza)",
-                "4. Compare a resposta encontrada com as alternativas",
-                "5. Escolha a alternativa que corresponde exatamente ao texto"
-            ],
-            "D3": [
-                "1. Leia o texto inteiro uma primeira vez",
-                "2. Identifique a ideia que se repete ou que está em todo o texto",
-                "3. Procure por palavras-chave que definem o assunto central",
-                "4. Diferencie detalhes do tema principal (D1 encontra detalhes, D3 encontra o geral)",
-                "5. Escolha a alternativa que resume o texto todo, não apenas uma parte"
-            ],
-            "D4": [
-                "1. Leia o texto e observe detalhes que NÃO estão explícitos",
-                "2. Procure por sinais (gestos, tom, atmosfera) que sugerem algo",
-                "3. Use sua experiência de vida para deduzir o que virá",
-                "4. Procure por pergunta com 'conclui-se', 'deduz-se', 'infere-se'",
-                "5. A resposta está 'entre as linhas' do texto, não escrita exatamente"
-            ],
-            "D6": [
-                "1. Identifique cada afirmação como fato ou opinião",
-                "2. Fatos: são dados, números, datas, ações comprovadas",
-                "3. Opiniões: contêm julgamentos, avaliações, 'acho que', 'é importante'",
-                "4. Procure por indicadores de opinião: 'penso', 'acho', 'considero', 'ruim', 'bom'",
-                "5. Fatos são verificáveis; opiniões dependem de ponto de vista"
-            ],
-            "D9": [
-                "1. Identifique o PRIMEIRO evento (a causa inicial)",
-                "2. Trace a sequência: o que acontece POR CAUSA de quê?",
-                "3. Use conectivos como 'porque', 'como', 'portanto', 'então'",
-                "4. Organize em ordem lógica (não cronológica necessariamente)",
-                "5. Verifique se a sequência faz sentido: A causa B, B causa C, C causa D"
-            ],
-            "D11": [
-                "1. Identifique qual é o gênero textual esperado",
-                "2. Verifique se a estrutura está correta para esse gênero",
-                "3. Procure por argumentos válidos (não apenas afirmações)",
-                "4. Verifique se há exemplos, dados ou justificativas",
-                "5. Avalie se a linguagem e tom são apropriados ao gênero"
-            ],
-            "D13": [
-                "1. Procure por pronomes (ele, ela, seu, sua) que retomam pessoas/coisas",
-                "2. Identifique conectivos (e, mas, portanto, além disso)",
-                "3. Verifique se as ideias estão ligadas logicamente",
-                "4. Procure por repetição inteligente de termos usando sinônimos",
-                "5. O texto deve 'fluir' sem frases soltas desconectadas"
-            ],
-            "D15": [
-                "1. Procure por repetição da mesma palavra",
-                "2. Verifique se há sinônimos para variar o vocabulário",
-                "3. Palavras genéricas ('coisa', 'bom', 'ruim') são mais fracas",
-                "4. Palavras específicas e apropriadas melhoram a qualidade",
-                "5. Evite repetição; use diferentes estruturas e termos"
-            ]
-        }
-        
-        return estrategias.get(descritor, ["Analise o tipo de questão especificamente"])
+        return list(ESTRATEGIAS_DESCRITOR.get(descritor, ["Analise o tipo de questão especificamente"]))
     
     def _gerar_exemplos(self, descritor):
         """Gera exemplos de prática para o descritor"""
-        
-        exemplos = {
-            "D1": "Procure por questões que perguntam 'Onde?', 'Quando?', 'Quem?', 'Qual é?' - estas pedem informações diretas",
-            "D3": "Questões que perguntam 'Sobre o quê?' ou 'Qual é o tema?' - procure a ideia geral",
-            "D4": "Questões que perguntam 'O que se conclui?', 'O que se deduz?' - use pistas do texto",
-            "D6": "Procure textos que misturam dados reais com avaliações pessoais",
-            "D9": "Leia histórias em sequência lógica: por que uma ação causou outra",
-            "D11": "Leia vários gêneros e analise se cada texto segue seu padrão",
-            "D13": "Localize todos os pronomes e conectivos em um texto",
-            "D15": "Compare dois textos: um repetitivo e outro com vocabulário variado"
-        }
-        
-        return exemplos.get(descritor, "Continue praticando questões deste tipo")
+        return EXEMPLOS_DESCRITOR.get(descritor, "Continue praticando questões deste tipo")
     
-    def analisar_multiplas_respostas(self, respostas_dict):
+    def analisar_multiplas_respostas(self, respostas_dict, turma=None, escola=None):
         """
         Analisa um conjunto de respostas
         
         Args:
             respostas_dict: Dict {id_questao: resposta_aluno, ...}
+            turma: Turma do aluno, para os agregados (opcional)
+            escola: Escola do aluno, para os agregados (opcional)
             
         Returns:
             Análise agregada
@@ -211,7 +303,7 @@ Descritor avaliado: {questao['descritor']} - {questao['competencia']}"""
         total = 0
         
         for id_questao, resposta in respostas_dict.items():
-            resultado = self.analisar_resposta(id_questao, resposta)
+            resultado = self.analisar_resposta(id_questao, resposta, turma=turma, escola=escola)
             if "erro" not in resultado:
                 resultados.append(resultado)
                 if resultado["acertou"]:
@@ -236,3 +328,25 @@ Descritor avaliado: {questao['descritor']} - {questao['competencia']}"""
             "descritores_fortes": [d for d, r in por_descritor.items() if all(x["acertou"] for x in r)],
             "descritores_fraco": [d for d, r in por_descritor.items() if any(not x["acertou"] for x in r)]
         }
+    
+    def analisar_matriz_respostas(self, matriz, ids_questoes, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        """
+        Corrige uma turma ou rede inteira em uma única passada vetorizada
+        
+        Produz os mesmos números de `analisar_multiplas_respostas` para cada
+        aluno, sem criar um dict por resposta.
+        
+        Args:
+            matriz: Array uint8 (alunos × questões) com códigos de
+                    CODIGOS_ALTERNATIVAS (0 = em branco)
+            ids_questoes: IDs das questões na ordem das colunas
+            tamanho_bloco: Número de alunos processados por bloco
+            
+        Returns:
+            Dict com totais por aluno, subtotais por descritor e máscaras de acerto
+        """
+        gabarito, descritores = montar_gabarito(ids_questoes)
+        resultado = corrigir_matriz(matriz, gabarito, descritores, tamanho_bloco)
+        resultado["ids_questoes"] = list(ids_questoes)
+        
+        return resultado
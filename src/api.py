@@ -0,0 +1,362 @@
+"""
+API HTTP de Correção
+Expõe o analisador, os prompts e a extração de arquivos como um app ASGI
+
+Uso (na raiz do projeto; requer `pip install uvicorn`):
+    python -m src.api --porta 8000 --workers 4
+    uvicorn src.api:app --port 8000 --workers 4
+
+Rotas (JSON no corpo e na resposta):
+    GET  /saude                  estado do serviço e número de questões
+    POST /analisar               {"id_questao": 1, "resposta": "B"}
+    POST /analisar-multiplas     {"respostas": {"1": "B", "2": "A"}}
+    POST /prompts/correcao       {"id_questao": 1, "resposta": "B"}
+    POST /prompts/rapido         {"id_questao": 1, "resposta": "B"}
+    POST /prompts/multiplas      {"respostas": {"1": "B", "2": "A"}}
+    POST /extrair?nome=prova.pdf corpo com o arquivo (PDF, DOCX, imagem ou ZIP)
+    POST /lote                   {"requisicoes": [{"rota": "/analisar", "corpo": {...}}, ...]}
+
+A rota /lote executa várias requisições (exceto /extrair) em uma só ida e
+volta e devolve {"respostas": [{"status": 200, "corpo": {...}}, ...]}, na
+mesma ordem. Erros são respondidos como {"erro": "..."} com o status HTTP
+correspondente; em /extrair, 415 para formatos não suportados e 422 para
+arquivos que não puderam ser lidos.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from src.analisador import AnalisadorQuestoes
+from src.file_parser import (
+    EXTENSOES_DOCX, EXTENSOES_IMAGEM, EXTENSOES_PDF, EXTENSOES_ZIP, extrair_questoes_arquivos
+)
+from src.prompt_generator import GeradorPromptsQuestoes
+from src.questoes_saeb import listar_todas_questoes, obter_questao
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+# Tamanho máximo do corpo das requisições JSON e dos arquivos enviados a /extrair
+MAX_BYTES_JSON = 1024 * 1024
+MAX_BYTES_ARQUIVO = 50 * 1024 * 1024
+
+# Requisições aceitas em uma única chamada a /lote
+MAX_REQUISICOES_LOTE = 1000
+
+# Formatos aceitos em /extrair
+EXTENSOES_EXTRAIR = EXTENSOES_PDF + EXTENSOES_DOCX + EXTENSOES_IMAGEM + EXTENSOES_ZIP
+
+_analisador = AnalisadorQuestoes()
+_gerador = GeradorPromptsQuestoes()
+
+# Pool de processos das extrações, criado na primeira chamada a /extrair e
+# compartilhado por todas as requisições do processo do servidor
+_pool_extracao: Optional[ProcessPoolExecutor] = None
+_trava_pool_extracao = threading.Lock()
+
+
+class ErroRequisicao(Exception):
+    """Erro a ser devolvido ao cliente com o status HTTP indicado"""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _id_questao(corpo: Dict):
+    """Id da questão do corpo; aceita número ou texto com dígitos"""
+    if "id_questao" not in corpo:
+        raise ErroRequisicao(400, "Campo obrigatório ausente: id_questao")
+    id_questao = corpo["id_questao"]
+    if not isinstance(id_questao, (int, str)) or isinstance(id_questao, bool):
+        raise ErroRequisicao(400, "id_questao deve ser um número")
+    return int(id_questao) if isinstance(id_questao, str) and id_questao.strip().isdigit() else id_questao
+
+
+def _respostas(corpo: Dict) -> Dict:
+    """Respostas {id_questao: alternativa}; as chaves do JSON chegam como texto"""
+    respostas = corpo.get("respostas")
+    if not isinstance(respostas, dict):
+        raise ErroRequisicao(400, "Campo obrigatório ausente: respostas ({id_questao: alternativa})")
+    if not all(isinstance(valor, str) or valor is None for valor in respostas.values()):
+        raise ErroRequisicao(400, "As respostas devem ser alternativas (A, B, C ou D)")
+    return {int(chave) if str(chave).strip().isdigit() else chave: valor for chave, valor in respostas.items()}
+
+
+def _resposta(corpo: Dict):
+    resposta = corpo.get("resposta")
+    if not isinstance(resposta, str) and resposta is not None:
+        raise ErroRequisicao(400, "resposta deve ser uma alternativa (A, B, C ou D)")
+    return resposta
+
+
+def _analisar(corpo: Dict) -> Dict:
+    id_questao = _id_questao(corpo)
+    resultado = _analisador.analisar_resposta(id_questao, _resposta(corpo))
+    if "erro" in resultado:
+        raise ErroRequisicao(404 if obter_questao(id_questao) is None else 422, resultado["erro"])
+    return resultado
+
+
+# --- Rotas ---
+
+def rota_saude(corpo: Dict) -> Dict:
+    return {"status": "ok", "questoes": len(listar_todas_questoes())}
+
+
+def rota_analisar(corpo: Dict) -> Dict:
+    return _analisar(corpo)
+
+
+def rota_analisar_multiplas(corpo: Dict) -> Dict:
+    return _analisador.analisar_multiplas_respostas(_respostas(corpo))
+
+
+def rota_prompt_correcao(corpo: Dict) -> Dict:
+    return {"prompt": _gerador.gerar_prompt_correcao_completa(_analisar(corpo))}
+
+
+def rota_prompt_rapido(corpo: Dict) -> Dict:
+    # Mesma validação e mesmos status de /analisar (404 questão, 422 resposta)
+    resultado = _analisar(corpo)
+    return {"prompt": _gerador.gerar_prompt_rapido(resultado["questao_id"], resultado["resposta_aluno"])}
+
+
+def rota_prompt_multiplas(corpo: Dict) -> Dict:
+    analise = _analisador.analisar_multiplas_respostas(_respostas(corpo))
+    return {"prompt": _gerador.gerar_prompt_multiplas_questoes(analise)}
+
+
+ROTAS: Dict[Tuple[str, str], Callable[[Dict], Dict]] = {
+    ("GET", "/saude"): rota_saude,
+    ("POST", "/analisar"): rota_analisar,
+    ("POST", "/analisar-multiplas"): rota_analisar_multiplas,
+    ("POST", "/prompts/correcao"): rota_prompt_correcao,
+    ("POST", "/prompts/rapido"): rota_prompt_rapido,
+    ("POST", "/prompts/multiplas"): rota_prompt_multiplas,
+}
+
+
+def executar_rota(metodo: str, caminho: str, corpo: Dict) -> Tuple[int, Dict]:
+    """Executa uma rota JSON e devolve (status, corpo da resposta)"""
+    funcao = ROTAS.get((metodo, caminho))
+
+    if funcao is None:
+        if any(rota == caminho for _, rota in ROTAS):
+            return 405, {"erro": "Método não permitido"}
+        return 404, {"erro": "Rota não encontrada"}
+
+    try:
+        return 200, funcao(corpo)
+    except ErroRequisicao as e:
+        return e.status, {"erro": str(e)}
+
+
+def rota_lote(corpo: Dict) -> Dict:
+    requisicoes = corpo.get("requisicoes")
+    if not isinstance(requisicoes, list):
+        raise ErroRequisicao(400, "Campo obrigatório ausente: requisicoes")
+    if len(requisicoes) > MAX_REQUISICOES_LOTE:
+        raise ErroRequisicao(413, f"Máximo de {MAX_REQUISICOES_LOTE} requisições por lote")
+
+    respostas = []
+    for requisicao in requisicoes:
+        if not isinstance(requisicao, dict) or not isinstance(requisicao.get("corpo", {}), dict):
+            respostas.append({"status": 400, "corpo": {"erro": "Requisição inválida"}})
+            continue
+        status, resposta = executar_rota(
+            str(requisicao.get("metodo", "POST")).upper(), str(requisicao.get("rota", "")), requisicao.get("corpo", {})
+        )
+        respostas.append({"status": status, "corpo": resposta})
+
+    return {"respostas": respostas}
+
+
+def _validar_arquivo(nome: str, conteudo: bytes):
+    if not nome:
+        raise ErroRequisicao(400, "Informe o nome do arquivo: /extrair?nome=prova.pdf")
+    if not conteudo:
+        raise ErroRequisicao(400, "Corpo da requisição vazio")
+    extensao = Path(nome).suffix.lower()
+    if extensao not in EXTENSOES_EXTRAIR:
+        raise ErroRequisicao(415, f"Formato não suportado: {extensao or nome}")
+
+
+def _falha_extracao(resultado: Dict) -> Optional[str]:
+    """Mensagem de erro se nenhum arquivo pôde ser lido (ex.: PDF corrompido), ou None"""
+    if resultado["questoes"]:
+        return None
+    mensagens = [arquivo["mensagem"] for arquivo in resultado["relatorio_lote"]] or [resultado["mensagem"]]
+    if all(mensagem.startswith("❌") for mensagem in mensagens):
+        return "; ".join(mensagem.removeprefix("❌").strip() for mensagem in mensagens)
+    return None
+
+
+def rota_extrair(nome: str, conteudo: bytes) -> Dict:
+    _validar_arquivo(nome, conteudo)
+    try:
+        # Já roda em um processo do pool de extração: sem pools internos
+        resultado = extrair_questoes_arquivos([(nome, conteudo)], max_workers=1)
+    except ValueError as e:
+        # Arquivos recusados (ex.: limites de ZIP)
+        raise ErroRequisicao(422, str(e))
+
+    falha = _falha_extracao(resultado)
+    if falha:
+        raise ErroRequisicao(422, falha)
+    return resultado
+
+
+def executar_extracao(nome: str, conteudo: bytes) -> Tuple[int, Dict]:
+    """Executa /extrair e devolve (status, corpo da resposta); roda no pool de extração"""
+    try:
+        return 200, rota_extrair(nome, conteudo)
+    except ErroRequisicao as e:
+        return e.status, {"erro": str(e)}
+
+
+def _obter_pool_extracao() -> ProcessPoolExecutor:
+    global _pool_extracao
+
+    with _trava_pool_extracao:
+        if _pool_extracao is None:
+            _pool_extracao = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+    return _pool_extracao
+
+
+def _encerrar_pool_extracao():
+    global _pool_extracao
+
+    with _trava_pool_extracao:
+        if _pool_extracao is not None:
+            _pool_extracao.shutdown(cancel_futures=True)
+            _pool_extracao = None
+
+
+# --- ASGI ---
+
+async def _ler_corpo(receive, limite: int) -> bytes:
+    partes, tamanho = [], 0
+
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "http.disconnect":
+            raise ErroRequisicao(400, "Conexão encerrada pelo cliente")
+        parte = mensagem.get("body", b"")
+        tamanho += len(parte)
+        if tamanho > limite:
+            raise ErroRequisicao(413, f"Corpo maior que {limite // (1024 * 1024)} MB")
+        partes.append(parte)
+        if not mensagem.get("more_body", False):
+            return b"".join(partes)
+
+
+def _para_json(valor):
+    """Converte os resultados do analisador (ResultadoResposta) para o JSON"""
+    if isinstance(valor, Mapping):
+        return dict(valor)
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+async def _responder(send, status: int, corpo: Dict):
+    dados = json.dumps(corpo, ensure_ascii=False, default=_para_json).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json; charset=utf-8"),
+            (b"content-length", str(len(dados)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": dados})
+
+
+async def _lifespan(receive, send):
+    while True:
+        mensagem = await receive()
+        if mensagem["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif mensagem["type"] == "lifespan.shutdown":
+            _encerrar_pool_extracao()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """
+    App ASGI
+
+    As rotas JSON são rápidas e rodam no próprio laço de eventos; a extração
+    de arquivos roda em um pool de processos único do app, para não travar
+    as demais requisições nem criar processos a cada arquivo.
+    """
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    metodo, caminho = scope["method"], scope["path"].rstrip("/") or "/"
+
+    try:
+        if caminho == "/extrair":
+            if metodo != "POST":
+                raise ErroRequisicao(405, "Método não permitido")
+            nome = parse_qs(scope.get("query_string", b"").decode("utf-8")).get("nome", [""])[0]
+            conteudo = await _ler_corpo(receive, MAX_BYTES_ARQUIVO)
+            _validar_arquivo(nome, conteudo)
+            resposta = await asyncio.get_running_loop().run_in_executor(
+                _obter_pool_extracao(), executar_extracao, nome, conteudo
+            )
+            await _responder(send, *resposta)
+            return
+
+        dados = await _ler_corpo(receive, MAX_BYTES_JSON)
+        try:
+            corpo = json.loads(dados) if dados.strip() else {}
+        except ValueError:
+            raise ErroRequisicao(400, "Corpo não é um JSON válido")
+        if not isinstance(corpo, dict):
+            raise ErroRequisicao(400, "O corpo deve ser um objeto JSON")
+
+        if caminho == "/lote":
+            if metodo != "POST":
+                raise ErroRequisicao(405, "Método não permitido")
+            await _responder(send, 200, rota_lote(corpo))
+        else:
+            await _responder(send, *executar_rota(metodo, caminho, corpo))
+    except ErroRequisicao as e:
+        await _responder(send, e.status, {"erro": str(e)})
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(
+        prog="python -m src.api",
+        description=__doc__.splitlines()[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[3:])
+    )
+    argumentos.add_argument("--host", default="127.0.0.1")
+    argumentos.add_argument("--porta", type=int, default=8000)
+    argumentos.add_argument("--workers", type=int, default=1, help="Processos do servidor")
+    opcoes = argumentos.parse_args(argv)
+
+    if uvicorn is None:
+        raise SystemExit("❌ O servidor requer o uvicorn (pip install uvicorn)")
+
+    uvicorn.run("src.api:app", host=opcoes.host, port=opcoes.porta, workers=opcoes.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Armazenamento Colunar de Respostas
+Grava respostas de alunos em colunas binárias particionadas por escola e avaliação
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from src.correcao_vetorizada import codificar_alternativa
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Colunas de cada partição: arquivo binário (sem cabeçalho) com o tipo de cada valor.
+# "aluno" é o índice do aluno no dicionário da partição (alunos.txt)
+COLUNAS = {
+    "aluno": np.dtype("<i4"),
+    "questao": np.dtype("<i4"),
+    "alternativa": np.dtype("u1"),
+    "momento": np.dtype("<M8[ms]")
+}
+
+ARQUIVO_METADADOS = "_particao.json"
+ARQUIVO_ALUNOS = "alunos.txt"
+ARQUIVO_TRAVA = ".trava"
+
+# Linhas lidas por vez ao montar a matriz de respostas
+TAMANHO_BLOCO_LEITURA = 1 << 18
+
+
+def _nome_particao(escola, avaliacao) -> str:
+    return f"escola={quote(str(escola), safe='')}/avaliacao={quote(str(avaliacao), safe='')}"
+
+
+def _codificar_alternativas(alternativas) -> np.ndarray:
+    """Letras ('A'..'D') ou códigos já prontos para o vetor uint8 de códigos"""
+    alternativas = np.asarray(alternativas)
+
+    if alternativas.dtype.kind in "iu":
+        return alternativas.astype(np.uint8)
+
+    # Converte só os valores distintos e espalha com o índice inverso
+    valores, inverso = np.unique(alternativas.astype(str), return_inverse=True)
+    codigos = np.array([codificar_alternativa(v) for v in valores], dtype=np.uint8)
+    return codigos[inverso.reshape(-1)]
+
+
+class ArmazemRespostas:
+    """
+    Respostas de alunos em formato colunar, no disco
+
+    Cada partição (escola, avaliação) é um diretório com um arquivo por
+    coluna, no formato de COLUNAS, mais o dicionário de alunos. O número de
+    linhas confirmadas fica em `_particao.json`, trocado de forma atômica ao
+    fim de cada gravação: leitores mapeiam só as linhas confirmadas, e o que
+    uma gravação interrompida deixar além delas é descartado na seguinte.
+    A leitura usa np.memmap, sem copiar as colunas para a memória.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self._trava = threading.Lock()
+        # {caminho da partição: {id_aluno: índice}} das partições já gravadas pelo processo
+        self._dicionarios = {}
+
+    def _caminho(self, escola, avaliacao) -> Path:
+        return self.diretorio / _nome_particao(escola, avaliacao)
+
+    @staticmethod
+    def _metadados(caminho: Path) -> Dict:
+        try:
+            with open(caminho / ARQUIVO_METADADOS, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except FileNotFoundError:
+            return {"linhas": 0, "alunos": 0, "bytes_alunos": 0}
+
+    @staticmethod
+    def _gravar_metadados(caminho: Path, metadados: Dict):
+        descritor, temporario = tempfile.mkstemp(dir=caminho, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+                json.dump(metadados, arquivo)
+            os.replace(temporario, caminho / ARQUIVO_METADADOS)
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+
+    def _dicionario_alunos(self, caminho: Path, metadados: Dict) -> Dict:
+        """Dicionário id → índice da partição, relido se outro processo gravou alunos"""
+        dicionario = self._dicionarios.get(caminho)
+
+        if dicionario is None or len(dicionario) != metadados["alunos"]:
+            dicionario = {id_aluno: indice for indice, id_aluno in enumerate(self._ler_alunos(caminho, metadados))}
+            self._dicionarios[caminho] = dicionario
+
+        return dicionario
+
+    @staticmethod
+    def _ler_alunos(caminho: Path, metadados: Dict) -> List[str]:
+        if not metadados["alunos"]:
+            return []
+        with open(caminho / ARQUIVO_ALUNOS, "rb") as arquivo:
+            # Só "\n" separa os ids: splitlines também quebraria em \x0b, \x1c, \u2028 etc.
+            return arquivo.read(metadados["bytes_alunos"]).decode("utf-8").split("\n")[:-1]
+
+    def anexar(self, escola, avaliacao, alunos: Sequence, questoes: Sequence, alternativas: Sequence,
+               momentos=None) -> int:
+        """
+        Acrescenta respostas a uma partição
+
+        Args:
+            escola: Escola das respostas
+            avaliacao: Avaliação das respostas
+            alunos: Id de cada aluno (texto ou número; sem quebras de linha)
+            questoes: Id (inteiro) da questão de cada resposta
+            alternativas: Letra ('A'..'D') ou código de CODIGOS_ALTERNATIVAS;
+                          vazias ou inválidas viram 0 (em branco)
+            momentos: Data/hora de cada resposta (padrão: agora)
+
+        Returns:
+            Número de linhas da partição após a gravação
+        """
+        alunos = np.asarray(alunos)
+        questoes = np.asarray(questoes)
+        alternativas = _codificar_alternativas(alternativas)
+        n_linhas = len(alunos)
+
+        # np.asarray([]) é float64: o tipo só é conferido quando há ids
+        if questoes.size and questoes.dtype.kind not in "iu":
+            raise ValueError("Os ids das questões devem ser inteiros")
+        if not len(questoes) == len(alternativas) == n_linhas:
+            raise ValueError("alunos, questoes e alternativas devem ter o mesmo tamanho")
+        if not n_linhas:
+            return self._metadados(self._caminho(escola, avaliacao))["linhas"]
+
+        if momentos is None:
+            momentos = np.full(n_linhas, np.datetime64("now", "ms"))
+        momentos = np.asarray(momentos, dtype=COLUNAS["momento"])
+        if len(momentos) != n_linhas:
+            raise ValueError("momentos deve ter uma data/hora por resposta")
+
+        caminho = self._caminho(escola, avaliacao)
+        caminho.mkdir(parents=True, exist_ok=True)
+
+        with self._trava, open(caminho / ARQUIVO_TRAVA, "w") as trava:
+            # Um gravador por partição, também entre processos
+            if fcntl is not None:
+                fcntl.flock(trava, fcntl.LOCK_EX)
+
+            metadados = self._metadados(caminho)
+            dicionario = self._dicionario_alunos(caminho, metadados)
+
+            # Novos alunos entram no fim do dicionário, na ordem em que aparecem;
+            # só os ids distintos são convertidos para texto
+            distintos, primeira, inverso = np.unique(alunos, return_index=True, return_inverse=True)
+            distintos = distintos.astype(str).tolist()
+            ordem_chegada = np.argsort(primeira, kind="stable").tolist()
+            novos = [distintos[i] for i in ordem_chegada if distintos[i] not in dicionario]
+            if any("\n" in id_aluno or "\r" in id_aluno for id_aluno in novos):
+                raise ValueError("Os ids dos alunos não podem conter quebras de linha")
+            for id_aluno in novos:
+                dicionario[id_aluno] = len(dicionario)
+            indices = np.array([dicionario[id_aluno] for id_aluno in distintos], dtype=COLUNAS["aluno"])
+
+            valores = {
+                "aluno": indices[inverso.reshape(-1)],
+                "questao": questoes.astype(COLUNAS["questao"]),
+                "alternativa": alternativas,
+                "momento": momentos
+            }
+
+            for coluna, tipo in COLUNAS.items():
+                with open(caminho / f"{coluna}.bin", "ab") as arquivo:
+                    arquivo.truncate(metadados["linhas"] * tipo.itemsize)
+                    arquivo.write(valores[coluna].tobytes())
+
+            texto_alunos = "".join(id_aluno + "\n" for id_aluno in novos).encode("utf-8")
+            with open(caminho / ARQUIVO_ALUNOS, "ab") as arquivo:
+                arquivo.truncate(metadados["bytes_alunos"])
+                arquivo.write(texto_alunos)
+
+            metadados = {
+                "linhas": metadados["linhas"] + n_linhas,
+                "alunos": len(dicionario),
+                "bytes_alunos": metadados["bytes_alunos"] + len(texto_alunos)
+            }
+            self._gravar_metadados(caminho, metadados)
+
+        return metadados["linhas"]
+
+    def ler(self, escola, avaliacao) -> Dict:
+        """
+        Colunas de uma partição mapeadas do disco (somente leitura)
+
+        Returns:
+            Dict com "aluno", "questao", "alternativa" e "momento" (np.memmap
+            ou vetor vazio) e "ids_alunos" (id de cada índice de "aluno")
+        """
+        caminho = self._caminho(escola, avaliacao)
+        metadados = self._metadados(caminho)
+        n_linhas = metadados["linhas"]
+
+        colunas = {
+            coluna: np.memmap(caminho / f"{coluna}.bin", dtype=tipo, mode="r", shape=(n_linhas,))
+            if n_linhas else np.empty(0, dtype=tipo)
+            for coluna, tipo in COLUNAS.items()
+        }
+        colunas["ids_alunos"] = self._ler_alunos(caminho, metadados)
+
+        return colunas
+
+    def listar_particoes(self, avaliacao=None) -> List[Tuple[str, str]]:
+        """Pares (escola, avaliação) gravados, opcionalmente de uma avaliação"""
+        particoes = []
+
+        for caminho in sorted(self.diretorio.glob(f"escola=*/avaliacao=*/{ARQUIVO_METADADOS}")):
+            escola = unquote(caminho.parent.parent.name.partition("=")[2])
+            avaliacao_particao = unquote(caminho.parent.name.partition("=")[2])
+            if avaliacao is None or avaliacao_particao == str(avaliacao):
+                particoes.append((escola, avaliacao_particao))
+
+        return particoes
+
+    def versao(self, avaliacao) -> Tuple:
+        """Linhas confirmadas em cada escola da avaliação; muda a cada gravação"""
+        return tuple(
+            (escola, self._metadados(self._caminho(escola, avaliacao))["linhas"])
+            for escola, _ in self.listar_particoes(avaliacao)
+        )
+
+    def matriz_respostas(self, avaliacao, ids_questoes: Sequence, escolas: Optional[Sequence] = None) -> Dict:
+        """
+        Matriz alunos × questões de uma avaliação, pronta para `corrigir_matriz`
+        e `estatisticas_itens`
+
+        Lê as colunas mapeadas em blocos de TAMANHO_BLOCO_LEITURA linhas e
+        espalha os códigos de cada bloco na matriz; se um aluno respondeu a
+        mesma questão mais de uma vez, vale a última resposta gravada.
+        Respostas a questões fora de `ids_questoes` são ignoradas.
+
+        Args:
+            avaliacao: Avaliação
+            ids_questoes: IDs das questões na ordem das colunas
+            escolas: Escolas incluídas (padrão: todas da avaliação)
+
+        Returns:
+            Dict com "matriz" (uint8, uma linha por aluno de cada escola, em
+            ordem de cadastro), "ids_alunos" e "escolas" (escola de cada linha)
+        """
+        ids_questoes = np.asarray(ids_questoes, dtype=np.int64)
+        ordem_questoes = np.argsort(ids_questoes, kind="stable")
+        ids_ordenados = ids_questoes[ordem_questoes]
+        n_itens = len(ids_questoes)
+
+        if escolas is None:
+            escolas = [escola for escola, _ in self.listar_particoes(avaliacao)]
+
+        matrizes, ids_alunos, escolas_linhas = [], [], []
+
+        for escola in escolas:
+            colunas = self.ler(escola, avaliacao)
+            n_alunos = len(colunas["ids_alunos"])
+            matriz = np.zeros((n_alunos, n_itens), dtype=np.uint8)
+
+            celulas_matriz = matriz.reshape(-1)
+
+            # Blocos em ordem de gravação: um bloco posterior sobrescreve os anteriores
+            for inicio in range(0, len(colunas["questao"]) if n_itens else 0, TAMANHO_BLOCO_LEITURA):
+                fim = inicio + TAMANHO_BLOCO_LEITURA
+                questoes = np.asarray(colunas["questao"][inicio:fim])
+                posicoes = np.searchsorted(ids_ordenados, questoes)
+                posicoes[posicoes == n_itens] = 0
+                validas = ids_ordenados[posicoes] == questoes
+                celulas = colunas["aluno"][inicio:fim][validas].astype(np.intp) * n_itens
+                celulas += ordem_questoes[posicoes[validas]]
+                alternativas = colunas["alternativa"][inicio:fim][validas]
+
+                # Atribuição com índices repetidos não tem ordem garantida: dentro
+                # do bloco, grava só a última resposta de cada célula (a primeira
+                # do bloco invertido; np.unique com return_index é estável)
+                celulas, ultimas = np.unique(celulas[::-1], return_index=True)
+                celulas_matriz[celulas] = alternativas[::-1][ultimas]
+
+            matrizes.append(matriz)
+            ids_alunos.extend(colunas["ids_alunos"])
+            escolas_linhas.extend([str(escola)] * n_alunos)
+
+        return {
+            "matriz": np.concatenate(matrizes) if matrizes else np.zeros((0, n_itens), dtype=np.uint8),
+            "ids_alunos": ids_alunos,
+            "escolas": escolas_linhas
+        }
@@ -0,0 +1,205 @@
+"""
+Banco de Questões Persistente em SQLite
+Armazena as questões em arquivo local com consultas indexadas
+"""
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS questoes (
+    id INTEGER PRIMARY KEY,
+    descritor TEXT NOT NULL,
+    tipo_texto TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questoes_descritor ON questoes (descritor);
+CREATE INDEX IF NOT EXISTS idx_questoes_tipo_texto ON questoes (tipo_texto);
+"""
+
+TAMANHO_CACHE_PADRAO = 4096
+
+
+class BancoQuestoesSQLite:
+    """
+    Banco de questões em SQLite com a mesma interface de `BancoQuestoes`
+
+    As questões são lidas do arquivo sob demanda e mantidas em um cache LRU
+    limitado. Alterações feitas por outros processos no mesmo arquivo são
+    detectadas por `PRAGMA data_version` e descartam o cache.
+    """
+
+    def __init__(self, caminho: str, tamanho_cache: int = TAMANHO_CACHE_PADRAO):
+        self.caminho = str(caminho)
+        self.tamanho_cache = tamanho_cache
+        self._versao = 0
+        self._cache = OrderedDict()
+        self._trava = threading.RLock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.executescript(ESQUEMA)
+        self._versao_dados = self._ler_versao_dados()
+
+    def _ler_versao_dados(self) -> int:
+        return self._conexao.execute("PRAGMA data_version").fetchone()[0]
+
+    def _verificar_alteracoes_externas(self):
+        """Descarta o cache se outro processo alterou o arquivo"""
+        versao_dados = self._ler_versao_dados()
+        if versao_dados != self._versao_dados:
+            self._versao_dados = versao_dados
+            self._cache.clear()
+            self._versao += 1
+
+    @property
+    def versao(self) -> int:
+        """Versão das questões; considera alterações feitas por outros processos"""
+        with self._trava:
+            self._verificar_alteracoes_externas()
+            return self._versao
+
+    def _questao_do_registro(self, id_questao, dados: str) -> Dict:
+        """Converte um registro em questão, reaproveitando o objeto em cache"""
+        questao = self._cache.get(id_questao)
+
+        if questao is None:
+            questao = json.loads(dados)
+            self._cache[id_questao] = questao
+            if len(self._cache) > self.tamanho_cache:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(id_questao)
+
+        return questao
+
+    def _consultar(self, sql: str, parametros=()) -> List[Dict]:
+        with self._trava:
+            self._verificar_alteracoes_externas()
+            registros = self._conexao.execute(sql, parametros).fetchall()
+            return [self._questao_do_registro(id_questao, dados) for id_questao, dados in registros]
+
+    def invalidar(self):
+        """Descarta o cache de questões carregadas"""
+        with self._trava:
+            self._cache.clear()
+            self._versao += 1
+
+    def obter_questao(self, id_questao) -> Optional[Dict]:
+        """Retorna uma questão específica"""
+        with self._trava:
+            self._verificar_alteracoes_externas()
+
+            if id_questao in self._cache:
+                self._cache.move_to_end(id_questao)
+                return self._cache[id_questao]
+
+            registro = self._conexao.execute(
+                "SELECT dados FROM questoes WHERE id = ?", (id_questao,)
+            ).fetchone()
+
+            return self._questao_do_registro(id_questao, registro[0]) if registro else None
+
+    def obter_questoes_por_descritor(self, descritor) -> List[Dict]:
+        """Retorna questões de um descritor específico"""
+        return self._consultar("SELECT id, dados FROM questoes WHERE descritor = ? ORDER BY id", (descritor,))
+
+    def obter_questoes_por_tipo_texto(self, tipo_texto) -> List[Dict]:
+        """Retorna questões de um tipo de texto específico"""
+        return self._consultar("SELECT id, dados FROM questoes WHERE tipo_texto = ? ORDER BY id", (tipo_texto,))
+
+    def obter_descritores_unicos(self) -> List[str]:
+        """Retorna lista de descritores únicos"""
+        with self._trava:
+            registros = self._conexao.execute(
+                "SELECT DISTINCT descritor FROM questoes ORDER BY descritor"
+            ).fetchall()
+            return [descritor for (descritor,) in registros]
+
+    def listar_todas(self) -> List[Dict]:
+        """Lista todas as questões"""
+        return self._consultar("SELECT id, dados FROM questoes ORDER BY id")
+
+    def contar(self) -> int:
+        """Número de questões armazenadas"""
+        with self._trava:
+            return self._conexao.execute("SELECT COUNT(*) FROM questoes").fetchone()[0]
+
+    def _registro(self, questao: Dict):
+        return (
+            questao["id"],
+            questao["descritor"],
+            questao.get("tipo_texto"),
+            json.dumps(questao, ensure_ascii=False)
+        )
+
+    def _gravar(self, sql: str, registros: Iterable):
+        """Executa a escrita em uma única transação e invalida o cache"""
+        with self._trava:
+            with self._conexao:
+                cursor = self._conexao.executemany(sql, registros)
+            self._versao_dados = self._ler_versao_dados()
+            self.invalidar()
+            return cursor.rowcount
+
+    def adicionar_questao(self, questao: Dict):
+        """Adiciona uma questão ao banco"""
+        try:
+            self._gravar(
+                "INSERT INTO questoes (id, descritor, tipo_texto, dados) VALUES (?, ?, ?, ?)",
+                [self._registro(questao)]
+            )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Já existe uma questão com id {questao['id']}")
+
+    def importar_questoes(self, questoes: Iterable[Dict]) -> int:
+        """
+        Importa questões em lote em uma única transação
+
+        Questões com id já existente são substituídas.
+
+        Returns:
+            Número de questões gravadas
+        """
+        return self._gravar(
+            "INSERT OR REPLACE INTO questoes (id, descritor, tipo_texto, dados) VALUES (?, ?, ?, ?)",
+            (self._registro(q) for q in questoes)
+        )
+
+    def atualizar_questao(self, id_questao, **campos) -> Optional[Dict]:
+        """Atualiza campos de uma questão existente; retorna a questão ou None"""
+        with self._trava:
+            questao = self.obter_questao(id_questao)
+
+            if questao is None:
+                return None
+
+            questao = {**questao, **campos, "id": id_questao}
+            self._gravar(
+                "UPDATE questoes SET descritor = ?, tipo_texto = ?, dados = ? WHERE id = ?",
+                [self._registro(questao)[1:] + (id_questao,)]
+            )
+            return self.obter_questao(id_questao)
+
+    def remover_questao(self, id_questao) -> bool:
+        """Remove uma questão do banco; retorna True se ela existia"""
+        return self._gravar("DELETE FROM questoes WHERE id = ?", [(id_questao,)]) > 0
+
+    def fechar(self):
+        """Fecha a conexão com o arquivo"""
+        with self._trava:
+            self._conexao.close()
+
+
+def abrir_banco_sqlite(caminho: str, questoes_iniciais: Optional[Iterable[Dict]] = None) -> BancoQuestoesSQLite:
+    """
+    Abre (ou cria) um banco SQLite, populando-o com `questoes_iniciais`
+    quando o arquivo ainda estiver vazio
+    """
+    banco = BancoQuestoesSQLite(caminho)
+
+    if questoes_iniciais is not None and banco.contar() == 0:
+        banco.importar_questoes(questoes_iniciais)
+
+    return banco
@@ -0,0 +1,238 @@
+"""
+Módulo de Busca Textual no Banco de Questões
+Índice invertido com remoção de acentos, radicalização e ranking BM25
+"""
+
+import math
+import re
+import threading
+import unicodedata
+import weakref
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.questoes_saeb import obter_banco
+
+# Peso de cada campo na contagem de termos
+PESOS_CAMPOS = {
+    "enunciado": 1.0,
+    "alternativas": 1.0,
+    "justificativa": 0.5
+}
+
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+
+POR_PAGINA_PADRAO = 10
+
+STOPWORDS = frozenset("""
+a ao aos as com como da das de do dos e ela elas ele eles em entre era essa esse esta este eu foi
+ha isso isto ja la lhe mais mas me mesmo meu minha muito na nao nas nem no nos o os ou para pela
+pelas pelo pelos por qual quando que quem se sem ser seu sua sao so tambem te tem um uma umas uns
+voce
+""".split())
+
+# Sufixos removidos pela radicalização (texto já sem acentos), do mais longo ao mais curto
+_SUFIXOS_PLURAL = [("oes", "ao"), ("aes", "ao"), ("ais", "al"), ("eis", "el"), ("ois", "ol"), ("ns", "m"), ("s", "")]
+_SUFIXOS = sorted("""
+amento imento mente acoes acao ucao idade ismo ista avel ivel ancia encia adora ador
+ante ando endo indo ado ada ido ida eza oso osa ivo iva ar er ir
+""".split(), key=len, reverse=True)
+_VOGAIS_FINAIS = ("a", "e", "o")
+_TAMANHO_MINIMO_RADICAL = 3
+
+_PADRAO_PALAVRA = re.compile(r"\w+")
+
+
+def normalizar(texto: str) -> str:
+    """Converte para minúsculas e remove acentos"""
+    return unicodedata.normalize("NFKD", texto.lower()).encode("ascii", "ignore").decode("ascii")
+
+
+@lru_cache(maxsize=65536)
+def radical(palavra: str) -> str:
+    """Radicalização leve para português (plural, sufixos comuns e vogal final)"""
+    for sufixo, troca in _SUFIXOS_PLURAL:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= _TAMANHO_MINIMO_RADICAL:
+            if sufixo == "s" and palavra.endswith(("ss", "us", "is")):
+                break
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+
+    for sufixo in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= _TAMANHO_MINIMO_RADICAL:
+            palavra = palavra[:-len(sufixo)]
+            break
+
+    if palavra.endswith(_VOGAIS_FINAIS) and len(palavra) > _TAMANHO_MINIMO_RADICAL:
+        palavra = palavra[:-1]
+
+    return palavra
+
+
+def extrair_termos(texto: str) -> List[str]:
+    """Quebra o texto em termos normalizados e radicalizados, sem stopwords"""
+    return [
+        radical(palavra)
+        for palavra in _PADRAO_PALAVRA.findall(normalizar(texto))
+        if len(palavra) > 1 and palavra not in STOPWORDS
+    ]
+
+
+def _textos_campos(questao: Dict) -> Dict[str, str]:
+    alternativas = questao.get("alternativas") or {}
+    return {
+        "enunciado": questao.get("enunciado") or "",
+        "alternativas": " ".join(alternativas.values()),
+        "justificativa": questao.get("justificativa") or ""
+    }
+
+
+class IndiceBusca:
+    """
+    Índice invertido em memória sobre enunciados, alternativas e justificativas
+
+    Cada termo guarda os documentos em que aparece e a contribuição BM25
+    já calculada, de modo que a consulta se reduz a somas vetorizadas.
+    """
+
+    def __init__(self, questoes: List[Dict]):
+        self.questoes = list(questoes)
+        documentos_por_termo = {}
+        frequencias_por_termo = {}
+        tamanhos = np.zeros(len(self.questoes), dtype=np.float64)
+
+        for posicao, questao in enumerate(self.questoes):
+            frequencias = {}
+            for campo, texto in _textos_campos(questao).items():
+                peso = PESOS_CAMPOS[campo]
+                for termo in extrair_termos(texto):
+                    frequencias[termo] = frequencias.get(termo, 0.0) + peso
+
+            tamanhos[posicao] = sum(frequencias.values())
+            for termo, frequencia in frequencias.items():
+                if termo not in documentos_por_termo:
+                    documentos_por_termo[termo] = []
+                    frequencias_por_termo[termo] = []
+                documentos_por_termo[termo].append(posicao)
+                frequencias_por_termo[termo].append(frequencia)
+
+        total = len(self.questoes)
+        tamanho_medio = tamanhos.mean() if total else 0.0
+        normalizacao = K1 * (1 - B + B * tamanhos / tamanho_medio) if tamanho_medio else np.full(total, K1)
+
+        self._postagens = {}
+        for termo, documentos in documentos_por_termo.items():
+            documentos = np.array(documentos, dtype=np.int32)
+            frequencias = np.array(frequencias_por_termo[termo], dtype=np.float64)
+            idf = math.log(1 + (total - len(documentos) + 0.5) / (len(documentos) + 0.5))
+            pesos = idf * frequencias * (K1 + 1) / (frequencias + normalizacao[documentos])
+            self._postagens[termo] = (documentos, pesos)
+
+        descritores = sorted(set(q.get("descritor") or "" for q in self.questoes))
+        self._codigos_descritores = {d: i for i, d in enumerate(descritores)}
+        self._descritores = np.array(
+            [self._codigos_descritores[q.get("descritor") or ""] for q in self.questoes], dtype=np.int32
+        )
+
+    def pontuar(self, consulta: str) -> np.ndarray:
+        """Pontuação BM25 de cada questão (0 para as que não contêm nenhum termo)"""
+        pontuacoes = np.zeros(len(self.questoes), dtype=np.float64)
+
+        for termo in set(extrair_termos(consulta)):
+            postagem = self._postagens.get(termo)
+            if postagem is not None:
+                documentos, pesos = postagem
+                pontuacoes[documentos] += pesos
+
+        return pontuacoes
+
+    def buscar(self, consulta: str, pagina: int = 1, por_pagina: int = POR_PAGINA_PADRAO,
+               descritor: Optional[str] = None) -> Dict:
+        """
+        Busca questões pela consulta, ordenadas por relevância
+
+        Args:
+            consulta: Palavras-chave
+            pagina: Página desejada (a partir de 1)
+            por_pagina: Resultados por página
+            descritor: Se informado, restringe a busca a esse descritor
+
+        Returns:
+            Dict de página (ver `paginar`) com "pontuacoes" das questões da página
+        """
+        pontuacoes = self.pontuar(consulta)
+        candidatos = np.flatnonzero(pontuacoes > 0)
+
+        if descritor:
+            codigo = self._codigos_descritores.get(descritor, -1)
+            candidatos = candidatos[self._descritores[candidatos] == codigo]
+
+        total = len(candidatos)
+        por_pagina = max(1, por_pagina)
+        total_paginas = max(1, math.ceil(total / por_pagina))
+        pagina = min(max(1, pagina), total_paginas)
+
+        # Seleciona só o necessário até a página pedida antes de ordenar
+        limite = pagina * por_pagina
+        if len(candidatos) > limite:
+            candidatos = candidatos[np.argpartition(-pontuacoes[candidatos], limite - 1)[:limite]]
+        candidatos = candidatos[np.lexsort((candidatos, -pontuacoes[candidatos]))]
+        pagina_atual = candidatos[(pagina - 1) * por_pagina:limite]
+
+        return {
+            "itens": [self.questoes[p] for p in pagina_atual],
+            "pontuacoes": pontuacoes[pagina_atual].tolist(),
+            "pagina": pagina,
+            "por_pagina": por_pagina,
+            "total": total,
+            "total_paginas": total_paginas
+        }
+
+
+def paginar(itens: List, pagina: int = 1, por_pagina: int = POR_PAGINA_PADRAO) -> Dict:
+    """
+    Recorta uma lista em páginas
+
+    Returns:
+        Dict com "itens" da página, "pagina", "por_pagina", "total" e "total_paginas"
+    """
+    por_pagina = max(1, por_pagina)
+    total_paginas = max(1, math.ceil(len(itens) / por_pagina))
+    pagina = min(max(1, pagina), total_paginas)
+    inicio = (pagina - 1) * por_pagina
+
+    return {
+        "itens": itens[inicio:inicio + por_pagina],
+        "pagina": pagina,
+        "por_pagina": por_pagina,
+        "total": len(itens),
+        "total_paginas": total_paginas
+    }
+
+
+# Índices já montados, por banco, válidos enquanto a versão do banco não mudar
+_indices = weakref.WeakKeyDictionary()
+_trava_indices = threading.Lock()
+
+
+def obter_indice(banco=None) -> IndiceBusca:
+    """Retorna o índice do banco, remontando-o se o banco foi alterado"""
+    banco = banco if banco is not None else obter_banco()
+
+    with _trava_indices:
+        versao, indice = _indices.get(banco, (None, None))
+        if indice is None or versao != banco.versao:
+            indice = IndiceBusca(banco.listar_todas())
+            _indices[banco] = (banco.versao, indice)
+
+    return indice
+
+
+def buscar_questoes(consulta: str, pagina: int = 1, por_pagina: int = POR_PAGINA_PADRAO,
+                    descritor: Optional[str] = None, banco=None) -> Dict:
+    """Busca questões por palavras-chave no banco em uso (ver `IndiceBusca.buscar`)"""
+    return obter_indice(banco).buscar(consulta, pagina, por_pagina, descritor)
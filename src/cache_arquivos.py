@@ -0,0 +1,128 @@
+"""
+Cache em Disco de Arquivos Processados
+Guarda o resultado da extração pelo hash SHA-256 do conteúdo do arquivo
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+# Limite padrão de espaço em disco ocupado pelo cache
+TAMANHO_MAXIMO_PADRAO = 256 * 1024 * 1024
+
+
+def diretorio_cache_padrao() -> Path:
+    """Diretório do cache: SAEB_CACHE_DIR ou ~/.cache/analisador_saeb"""
+    return Path(os.environ.get("SAEB_CACHE_DIR", Path.home() / ".cache" / "analisador_saeb"))
+
+
+class CacheArquivos:
+    """
+    Cache em disco, compartilhado entre sessões e processos
+
+    Cada entrada é um arquivo JSON gravado de forma atômica. O horário de
+    modificação marca o último acesso, e as entradas mais antigas são
+    removidas quando o total passa de `tamanho_maximo` (LRU).
+    """
+
+    def __init__(self, diretorio=None, tamanho_maximo: int = TAMANHO_MAXIMO_PADRAO):
+        self.diretorio = Path(diretorio) if diretorio else diretorio_cache_padrao()
+        self.tamanho_maximo = tamanho_maximo
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def chave(arquivo_bytes: bytes, extensao: str, versao: str) -> str:
+        """Chave da entrada: SHA-256 da versão do parser, da extensão e do conteúdo"""
+        resumo = hashlib.sha256()
+        resumo.update(f"{versao}\0{extensao}\0".encode("utf-8"))
+        resumo.update(arquivo_bytes)
+        return resumo.hexdigest()
+
+    def _caminho(self, chave: str) -> Path:
+        return self.diretorio / chave[:2] / f"{chave}.json"
+
+    def obter(self, chave: str) -> Optional[Dict]:
+        """Retorna a entrada guardada ou None"""
+        caminho = self._caminho(chave)
+
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                valor = json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass  # Cache somente leitura ou compartilhado: a leitura continua válida
+
+        return valor
+
+    def guardar(self, chave: str, valor: Dict):
+        """Grava a entrada e remove as menos usadas se o limite for excedido"""
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+
+        descritor, temporario = tempfile.mkstemp(dir=caminho.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descritor, "w", encoding="utf-8") as arquivo:
+                json.dump(valor, arquivo, ensure_ascii=False)
+            os.replace(temporario, caminho)
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+
+        self._podar()
+
+    def _podar(self):
+        """Remove as entradas com acesso mais antigo até caber no limite"""
+        entradas = []
+        total = 0
+
+        for caminho in self.diretorio.glob("*/*.json"):
+            try:
+                estado = caminho.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((estado.st_mtime, estado.st_size, caminho))
+            total += estado.st_size
+
+        if total <= self.tamanho_maximo:
+            return
+
+        for _, tamanho, caminho in sorted(entradas):
+            caminho.unlink(missing_ok=True)
+            total -= tamanho
+            if total <= self.tamanho_maximo:
+                break
+
+    def limpar(self):
+        """Remove todas as entradas"""
+        for caminho in self.diretorio.glob("*/*.json"):
+            caminho.unlink(missing_ok=True)
+
+
+_cache_padrao = None
+_trava_cache_padrao = threading.Lock()
+
+
+def obter_cache_padrao() -> Optional[CacheArquivos]:
+    """
+    Cache compartilhado do processo, no diretório padrão
+
+    Retorna None se o diretório não puder ser criado (ex.: disco somente leitura).
+    """
+    global _cache_padrao
+
+    with _trava_cache_padrao:
+        if _cache_padrao is None:
+            try:
+                _cache_padrao = CacheArquivos()
+            except OSError:
+                return None
+
+    return _cache_padrao
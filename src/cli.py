@@ -0,0 +1,444 @@
+"""
+Correção em Lote pela Linha de Comando
+Corrige arquivos CSV/Parquet de respostas sem o Streamlit, em blocos e em paralelo
+
+Uso (na raiz do projeto):
+    python -m src.cli respostas.csv --saida resultados/
+    python -m src.cli respostas.parquet --saida resultados/ --manter escola,turma --processos 8
+
+O arquivo tem uma linha por aluno: uma coluna com o identificador do aluno
+(--coluna-aluno) e uma coluna por questão, com o id da questão no cabeçalho
+("1", "Q1", "questao_1"...) e a alternativa marcada (A-D; outros valores
+contam como em branco). Colunas que não são questões são ignoradas, exceto
+as listadas em --manter, copiadas para a saída por aluno.
+
+São gravados dois arquivos na pasta de saída:
+    alunos.csv       uma linha por aluno, na ordem da entrada
+    descritores.csv  totais da rede por descritor
+
+O arquivo é lido em blocos de linhas, corrigidos em um pool de processos com
+um número limitado de blocos em andamento, então a memória não cresce com o
+tamanho da entrada. Com o pyarrow instalado, CSV e Parquet são lidos pelo
+Arrow; sem ele, CSV usa o módulo csv da biblioteca padrão.
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.analisador import AnalisadorQuestoes
+from src.correcao_vetorizada import LETRAS_POR_CODIGO, MAIOR_CODIGO, codificar_alternativa, montar_gabarito
+from src.questoes_saeb import obter_questao
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# Alunos por bloco enviado aos processos
+TAMANHO_BLOCO_PADRAO = 50000
+
+# Blocos lidos e ainda não gravados, por processo; acima disso a leitura espera
+BLOCOS_EM_ANDAMENTO_POR_PROCESSO = 2
+
+# Cabeçalhos aceitos para as colunas de questões: "7", "Q7", "q_7", "questao 7"...
+_PADRAO_COLUNA_QUESTAO = re.compile(r"^\s*(?:q|quest[aã]o)?[\s_.-]*(\d+)\s*$", re.IGNORECASE)
+
+# Letras na ordem dos códigos: a posição na lista + 1 é o código da alternativa
+_LETRAS = [LETRAS_POR_CODIGO[codigo] for codigo in range(1, MAIOR_CODIGO + 1)]
+
+# Valores mais comuns já resolvidos; os demais passam por `codificar_alternativa`
+_CODIGOS_RAPIDOS = {
+    **{letra: codigo for codigo, letra in enumerate(_LETRAS, 1)},
+    **{letra.lower(): codigo for codigo, letra in enumerate(_LETRAS, 1)},
+    "": 0
+}
+
+# Analisador de cada processo do pool, criado uma vez
+_analisador_worker = None
+
+
+def id_da_coluna(nome: str) -> Optional[int]:
+    """Id da questão de um cabeçalho de coluna, ou None se não for uma questão"""
+    encontrado = _PADRAO_COLUNA_QUESTAO.match(nome)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def _codificar_valores(valores: Sequence) -> np.ndarray:
+    """Codifica uma coluna de alternativas (lista de str) em uint8"""
+    return np.fromiter(
+        (_CODIGOS_RAPIDOS[v] if v in _CODIGOS_RAPIDOS else codificar_alternativa(v) for v in valores),
+        dtype=np.uint8,
+        count=len(valores)
+    )
+
+
+def _codificar_coluna_arrow(coluna) -> np.ndarray:
+    """Codifica uma coluna do Arrow em uint8 sem passar por objetos Python"""
+    letras = pc.utf8_upper(pc.utf8_trim_whitespace(coluna.cast(pa.string())))
+    posicoes = pc.fill_null(pc.index_in(letras, value_set=pa.array(_LETRAS)), -1)
+    return (posicoes.to_numpy() + 1).astype(np.uint8)
+
+
+# --- Leitura em blocos ---
+
+def _ler_cabecalho_csv(caminho: Path, separador: str) -> List[str]:
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        return next(csv.reader(arquivo, delimiter=separador), [])
+
+
+def colunas_do_arquivo(caminho: Path, formato: str, separador: str) -> List[str]:
+    """Nomes das colunas do arquivo de respostas"""
+    if formato == "parquet":
+        return list(pq.ParquetFile(caminho).schema_arrow.names)
+    return _ler_cabecalho_csv(caminho, separador)
+
+
+def _blocos_csv(caminho: Path, separador: str, colunas: List[str], tamanho_bloco: int) -> Iterator:
+    """Blocos de linhas (listas de str) lidos com o módulo csv"""
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        leitor = csv.reader(arquivo, delimiter=separador)
+        cabecalho = next(leitor, [])
+        posicoes = [cabecalho.index(nome) for nome in colunas]
+        bloco = []
+
+        for linha in leitor:
+            if not linha:
+                continue
+            linha += [""] * (len(cabecalho) - len(linha))
+            bloco.append([linha[posicao] for posicao in posicoes])
+            if len(bloco) >= tamanho_bloco:
+                yield bloco
+                bloco = []
+
+        if bloco:
+            yield bloco
+
+
+def _blocos_arrow(caminho: Path, formato: str, separador: str, colunas: List[str], tamanho_bloco: int) -> Iterator:
+    """Blocos de RecordBatches do Arrow, com as colunas pedidas lidas como texto"""
+    if formato == "parquet":
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield [lote]
+        return
+
+    leitor = pa_csv.open_csv(
+        caminho,
+        parse_options=pa_csv.ParseOptions(delimiter=separador),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={nome: pa.string() for nome in colunas},
+            include_columns=colunas
+        )
+    )
+
+    # O leitor do Arrow entrega lotes pelo tamanho em bytes; junta até o bloco
+    bloco, linhas = [], 0
+    for lote in leitor:
+        bloco.append(lote)
+        linhas += lote.num_rows
+        if linhas >= tamanho_bloco:
+            yield bloco
+            bloco, linhas = [], 0
+
+    if bloco:
+        yield bloco
+
+
+def ler_blocos(caminho: Path, formato: str, separador: str, colunas: List[str],
+               tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Iterator:
+    """
+    Lê o arquivo em blocos de até `tamanho_bloco` alunos (aproximadamente,
+    para CSV lido pelo Arrow), apenas com as colunas pedidas e na ordem delas
+    """
+    if pa is not None:
+        return _blocos_arrow(caminho, formato, separador, colunas, tamanho_bloco)
+    if formato == "parquet":
+        raise RuntimeError("Arquivos Parquet exigem o pyarrow (pip install pyarrow)")
+    return _blocos_csv(caminho, separador, colunas, tamanho_bloco)
+
+
+# --- Correção (processos do pool) ---
+
+def _inicializar_worker():
+    global _analisador_worker
+    _analisador_worker = AnalisadorQuestoes()
+
+
+def _colunas_do_bloco(bloco, n_colunas: int) -> Tuple[List[List], List[np.ndarray]]:
+    """
+    Separa um bloco em colunas de texto (as `n_colunas` primeiras: aluno e
+    extras) e colunas de questões (as demais), já codificadas em uint8
+    """
+    if pa is not None and not isinstance(bloco[0], list):
+        tabela = pa.Table.from_batches(bloco)
+        textos = [tabela.column(i).to_pylist() for i in range(n_colunas)]
+        questoes = [_codificar_coluna_arrow(tabela.column(i)) for i in range(n_colunas, tabela.num_columns)]
+        return textos, questoes
+
+    colunas = list(zip(*bloco))
+    return [list(coluna) for coluna in colunas[:n_colunas]], [_codificar_valores(c) for c in colunas[n_colunas:]]
+
+
+def _listar_descritores(mascara: np.ndarray, descritores: List[str]) -> List[str]:
+    """Descritores marcados em cada linha, separados por ';' (um texto por combinação distinta)"""
+    if not descritores:
+        return [""] * len(mascara)
+
+    # Cada linha vira um inteiro (um bit por descritor): ordenar inteiros é
+    # muito mais barato que ordenar as linhas da máscara
+    if len(descritores) < 63:
+        chaves = mascara.astype(np.int64) @ (np.int64(1) << np.arange(len(descritores), dtype=np.int64))
+        chaves_distintas, posicoes = np.unique(chaves, return_inverse=True)
+        combinacoes = [[(chave >> i) & 1 for i in range(len(descritores))] for chave in chaves_distintas.tolist()]
+    else:
+        combinacoes, posicoes = np.unique(mascara, axis=0, return_inverse=True)
+        combinacoes = combinacoes.tolist()
+
+    textos = np.array(
+        [";".join(d for d, marcado in zip(descritores, linha) if marcado) for linha in combinacoes],
+        dtype=object
+    )
+    return textos[posicoes.ravel()].tolist()
+
+
+def corrigir_bloco(bloco, n_colunas_texto: int, ids_questoes: List[int]) -> Dict:
+    """
+    Corrige um bloco de alunos
+
+    Returns:
+        Dict com "texto" (linhas de alunos.csv, na ordem do bloco),
+        "n_alunos" e as somas do
+        bloco por descritor ("acertos", "respostas", "alunos", "alunos_fortes",
+        "alunos_fraco"), na ordem dos descritores de `corrigir_matriz`
+    """
+    analisador = _analisador_worker or AnalisadorQuestoes()
+    textos, questoes = _colunas_do_bloco(bloco, n_colunas_texto)
+    n_alunos = len(textos[0])
+    matriz = np.column_stack(questoes) if questoes else np.zeros((n_alunos, 0), dtype=np.uint8)
+
+    resultado = analisador.analisar_matriz_respostas(matriz, ids_questoes)
+    descritores = resultado["descritores"]
+    acertos_descritor = resultado["acertos_por_descritor"]
+    total_descritor = resultado["total_por_descritor"]
+    fortes = resultado["descritores_fortes"]
+    fraco = resultado["descritores_fraco"]
+
+    # O CSV é formatado aqui, no processo do pool; o principal só grava o texto
+    saida = io.StringIO()
+    csv.writer(saida).writerows(zip(
+        *textos,
+        resultado["total_questoes"].tolist(),
+        resultado["acertos"].tolist(),
+        resultado["erros"].tolist(),
+        np.round(resultado["percentual_acerto"], 2).tolist(),
+        resultado["pontuacao"].tolist(),
+        _listar_descritores(fortes, descritores),
+        _listar_descritores(fraco, descritores),
+        *np.hstack([acertos_descritor, total_descritor]).T.tolist()
+    ))
+
+    return {
+        "texto": saida.getvalue(),
+        "n_alunos": n_alunos,
+        "acertos": acertos_descritor.sum(axis=0, dtype=np.int64),
+        "respostas": total_descritor.sum(axis=0, dtype=np.int64),
+        "alunos": (total_descritor > 0).sum(axis=0, dtype=np.int64),
+        "alunos_fortes": fortes.sum(axis=0, dtype=np.int64),
+        "alunos_fraco": fraco.sum(axis=0, dtype=np.int64)
+    }
+
+
+# --- Execução ---
+
+def corrigir_arquivo(caminho, pasta_saida, coluna_aluno: str = "aluno", manter: Sequence[str] = (),
+                     formato: Optional[str] = None, separador: str = ",",
+                     tamanho_bloco: int = TAMANHO_BLOCO_PADRAO, n_processos: Optional[int] = None,
+                     ao_gravar_bloco=None) -> Dict:
+    """
+    Corrige um arquivo de respostas e grava alunos.csv e descritores.csv
+
+    Args:
+        caminho: Arquivo CSV ou Parquet, uma linha por aluno
+        pasta_saida: Pasta onde os resultados são gravados (criada se preciso)
+        coluna_aluno: Coluna com o identificador do aluno
+        manter: Colunas copiadas para a saída por aluno (ex.: escola, turma)
+        formato: "csv" ou "parquet" (padrão: pela extensão do arquivo)
+        separador: Separador do CSV
+        tamanho_bloco: Alunos corrigidos por vez em cada processo
+        n_processos: Processos de correção (padrão: número de CPUs; 1
+                     corrige no próprio processo)
+        ao_gravar_bloco: Chamado como ao_gravar_bloco(alunos_gravados) a cada
+                         bloco gravado
+
+    Returns:
+        Dict com "alunos", "questoes" (ids corrigidos), "ignoradas" (ids fora
+        do banco), "descritores", "segundos" e os caminhos gravados
+    """
+    inicio = time.perf_counter()
+    caminho = Path(caminho)
+    formato = formato or ("parquet" if caminho.suffix.lower() in (".parquet", ".pq") else "csv")
+    pasta_saida = Path(pasta_saida)
+    n_processos = n_processos or os.cpu_count() or 1
+
+    if formato == "parquet" and pa is None:
+        raise RuntimeError("Arquivos Parquet exigem o pyarrow (pip install pyarrow)")
+
+    nomes = colunas_do_arquivo(caminho, formato, separador)
+    faltando = [nome for nome in [coluna_aluno, *manter] if nome not in nomes]
+    if faltando:
+        raise ValueError(f"Coluna(s) não encontrada(s) no arquivo: {', '.join(faltando)}")
+
+    colunas_questoes, ids_questoes, ignoradas = [], [], []
+    for nome in nomes:
+        id_questao = id_da_coluna(nome)
+        if id_questao is None or nome in (coluna_aluno, *manter):
+            continue
+        if obter_questao(id_questao) is None:
+            ignoradas.append(id_questao)
+            continue
+        colunas_questoes.append(nome)
+        ids_questoes.append(id_questao)
+
+    if not ids_questoes:
+        raise ValueError("Nenhuma coluna corresponde a questões do banco")
+
+    # Mesmos descritores, na mesma ordem, que `corrigir_matriz` devolve
+    gabarito, descritores_itens = montar_gabarito(ids_questoes)
+    descritores = sorted(set(d for d, codigo in zip(descritores_itens, gabarito) if codigo))
+    totais = {campo: np.zeros(len(descritores), dtype=np.int64)
+              for campo in ("acertos", "respostas", "alunos", "alunos_fortes", "alunos_fraco")}
+    n_alunos = 0
+
+    colunas_texto = [coluna_aluno, *manter]
+    blocos = ler_blocos(caminho, formato, separador, colunas_texto + colunas_questoes, tamanho_bloco)
+
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+    caminho_alunos = pasta_saida / "alunos.csv"
+    caminho_descritores = pasta_saida / "descritores.csv"
+
+    with open(caminho_alunos, "w", newline="", encoding="utf-8") as arquivo_alunos:
+        escritor = csv.writer(arquivo_alunos)
+        escritor.writerow(
+            colunas_texto
+            + ["total_questoes", "acertos", "erros", "percentual_acerto", "pontuacao",
+               "descritores_fortes", "descritores_fraco"]
+            + [f"acertos_{d}" for d in descritores] + [f"total_{d}" for d in descritores]
+        )
+
+        def gravar(parcial: Dict):
+            nonlocal n_alunos
+            arquivo_alunos.write(parcial["texto"])
+            for campo, soma in totais.items():
+                soma += parcial[campo]
+
+            n_alunos += parcial["n_alunos"]
+            if ao_gravar_bloco:
+                ao_gravar_bloco(n_alunos)
+
+        if n_processos == 1:
+            for bloco in blocos:
+                gravar(corrigir_bloco(bloco, len(colunas_texto), ids_questoes))
+        else:
+            # Blocos gravados na ordem de leitura; a janela limita a memória
+            limite = n_processos * BLOCOS_EM_ANDAMENTO_POR_PROCESSO
+            with ProcessPoolExecutor(max_workers=n_processos, initializer=_inicializar_worker) as executor:
+                pendentes = deque()
+                for bloco in blocos:
+                    pendentes.append(executor.submit(corrigir_bloco, bloco, len(colunas_texto), ids_questoes))
+                    if len(pendentes) >= limite:
+                        gravar(pendentes.popleft().result())
+                while pendentes:
+                    gravar(pendentes.popleft().result())
+
+    with open(caminho_descritores, "w", newline="", encoding="utf-8") as arquivo_descritores:
+        escritor = csv.writer(arquivo_descritores)
+        escritor.writerow(["descritor", "questoes", "alunos", "respostas", "acertos", "percentual_acerto",
+                           "alunos_fortes", "alunos_fraco"])
+        for i, descritor in enumerate(descritores):
+            respostas = int(totais["respostas"][i])
+            acertos = int(totais["acertos"][i])
+            escritor.writerow([
+                descritor,
+                sum(1 for d, codigo in zip(descritores_itens, gabarito) if codigo and d == descritor),
+                int(totais["alunos"][i]),
+                respostas,
+                acertos,
+                round(acertos / respostas * 100, 2) if respostas else 0,
+                int(totais["alunos_fortes"][i]),
+                int(totais["alunos_fraco"][i])
+            ])
+
+    return {
+        "alunos": n_alunos,
+        "questoes": ids_questoes,
+        "ignoradas": ignoradas,
+        "descritores": descritores,
+        "segundos": time.perf_counter() - inicio,
+        "arquivo_alunos": str(caminho_alunos),
+        "arquivo_descritores": str(caminho_descritores)
+    }
+
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description=__doc__.splitlines()[1],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[3:])
+    )
+    argumentos.add_argument("arquivo", type=Path, help="CSV ou Parquet com as respostas (uma linha por aluno)")
+    argumentos.add_argument("--saida", type=Path, required=True, help="Pasta para alunos.csv e descritores.csv")
+    argumentos.add_argument("--coluna-aluno", default="aluno", help="Coluna com o identificador do aluno")
+    argumentos.add_argument("--manter", default="", help="Colunas copiadas para a saída, separadas por vírgula")
+    argumentos.add_argument("--formato", choices=["csv", "parquet"], help="Padrão: pela extensão do arquivo")
+    argumentos.add_argument("--separador", default=",", help="Separador do CSV (ex.: ';')")
+    argumentos.add_argument("--tamanho-bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="Alunos por bloco")
+    argumentos.add_argument("--processos", type=int, help="Processos de correção (padrão: número de CPUs)")
+    opcoes = argumentos.parse_args(argv)
+
+    inicio = time.perf_counter()
+
+    def mostrar_andamento(alunos: int):
+        decorrido = time.perf_counter() - inicio
+        print(f"\r{alunos:,} aluno(s) corrigido(s) ({alunos / max(decorrido, 1e-9):,.0f}/s)",
+              end="", file=sys.stderr, flush=True)
+
+    try:
+        resumo = corrigir_arquivo(
+            opcoes.arquivo,
+            opcoes.saida,
+            coluna_aluno=opcoes.coluna_aluno,
+            manter=[nome.strip() for nome in opcoes.manter.split(",") if nome.strip()],
+            formato=opcoes.formato,
+            separador=opcoes.separador,
+            tamanho_bloco=max(1, opcoes.tamanho_bloco),
+            n_processos=opcoes.processos,
+            ao_gravar_bloco=mostrar_andamento
+        )
+    except (OSError, ValueError, RuntimeError) as e:
+        raise SystemExit(f"❌ {e}")
+
+    print(file=sys.stderr)
+    if resumo["ignoradas"]:
+        print(f"⚠️ Questões fora do banco ignoradas: {', '.join(map(str, resumo['ignoradas']))}", file=sys.stderr)
+    print(f"✅ {resumo['alunos']:,} aluno(s), {len(resumo['questoes'])} questão(ões), "
+          f"{len(resumo['descritores'])} descritor(es) em {resumo['segundos']:.1f}s")
+    print(f"   {resumo['arquivo_alunos']}")
+    print(f"   {resumo['arquivo_descritores']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Consolidação por Descritor em Turma, Escola e Rede
+Soma os acertos de cada descritor dos alunos para todos os níveis da hierarquia
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.correcao_vetorizada import TAMANHO_BLOCO_PADRAO, corrigir_matriz, montar_gabarito
+from src.descritores import listar_todos_descritores
+from src.questoes_saeb import obter_versao_banco
+
+# Níveis da hierarquia, do mais específico para o mais geral
+NIVEIS = ("turma", "escola", "rede")
+
+# Chaves que identificam um grupo de cada nível, na ordem de ordenação dos alunos
+CHAVES_NIVEL = {
+    "rede": ("rede",),
+    "escola": ("rede", "escola"),
+    "turma": ("rede", "escola", "turma")
+}
+
+# Consolidações guardadas por ArmazemConsolidado
+TAMANHO_CACHE_PADRAO = 32
+
+
+def descritores_saeb() -> List[str]:
+    """Códigos de todos os descritores de DESCRITORES_SAEB, na ordem da matriz"""
+    return [descritor["codigo"] for descritor in listar_todos_descritores()]
+
+
+def _inicios_segmentos(chaves, profundidade: int) -> np.ndarray:
+    """Linhas em que muda alguma das `profundidade` primeiras colunas de chaves ordenadas"""
+    mudou = np.zeros(chaves.shape[0], dtype=bool)
+    if chaves.shape[0]:
+        mudou[0] = True
+        for coluna in range(profundidade):
+            mudou[1:] |= chaves[1:, coluna] != chaves[:-1, coluna]
+    return np.flatnonzero(mudou)
+
+
+def _reduzir(chaves, alunos, acertos, respostas, profundidade: int) -> Dict:
+    """Soma as linhas (alunos ou grupos do nível abaixo) de cada segmento"""
+    inicios = _inicios_segmentos(chaves, profundidade)
+
+    if not len(inicios):
+        return {
+            "chaves": chaves[:0, :profundidade],
+            "alunos": np.zeros(0, dtype=np.int64),
+            "acertos": np.zeros((0, acertos.shape[1]), dtype=np.int64),
+            "respostas": np.zeros((0, respostas.shape[1]), dtype=np.int64)
+        }
+
+    return {
+        "chaves": chaves[inicios, :profundidade],
+        "alunos": np.add.reduceat(alunos, inicios, dtype=np.int64),
+        "acertos": np.add.reduceat(acertos, inicios, axis=0, dtype=np.int64),
+        "respostas": np.add.reduceat(respostas, inicios, axis=0, dtype=np.int64)
+    }
+
+
+def _consolidar_nivel(chaves, acertos, respostas, nivel: str) -> Dict:
+    """Um nível direto dos alunos (executado também nos processos do pool)"""
+    alunos = np.ones(chaves.shape[0], dtype=np.int64)
+    return _reduzir(chaves, alunos, acertos, respostas, len(CHAVES_NIVEL[nivel]))
+
+
+def _formatar(nivel: str, grupos: Dict, rotulos: Sequence, descritores: List[str], colunas) -> Dict:
+    """Troca os códigos das chaves pelos rótulos, põe cada descritor na sua coluna e calcula os percentuais"""
+    acertos = np.zeros((len(grupos["alunos"]), len(descritores)), dtype=np.int64)
+    respostas = np.zeros_like(acertos)
+    acertos[:, colunas] = grupos["acertos"]
+    respostas[:, colunas] = grupos["respostas"]
+    percentual = np.zeros(acertos.shape, dtype=np.float64)
+    np.divide(acertos, respostas, out=percentual, where=respostas > 0)
+    percentual *= 100
+
+    total_acertos, total_respostas = acertos.sum(axis=1), respostas.sum(axis=1)
+    percentual_geral = np.zeros(len(total_acertos), dtype=np.float64)
+    np.divide(total_acertos, total_respostas, out=percentual_geral, where=total_respostas > 0)
+    percentual_geral *= 100
+
+    nomes = CHAVES_NIVEL[nivel]
+    grupos_rotulados = [
+        {nome: rotulos[coluna][codigo] for coluna, (nome, codigo) in enumerate(zip(nomes, linha))}
+        for linha in grupos["chaves"].tolist()
+    ]
+
+    return {
+        "nivel": nivel,
+        "descritores": descritores,
+        "grupos": grupos_rotulados,
+        "alunos": grupos["alunos"],
+        "acertos": acertos,
+        "respostas": respostas,
+        "percentual_acerto": percentual,
+        "percentual_geral": percentual_geral
+    }
+
+
+def consolidar_matriz(matriz, ids_questoes: Sequence, escolas: Sequence, turmas: Sequence,
+                      redes: Optional[Sequence] = None, niveis: Sequence[str] = NIVEIS,
+                      n_processos: Optional[int] = None, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Dict:
+    """
+    Acertos e respostas por descritor de cada turma, escola e rede
+
+    Os alunos são corrigidos em uma passada vetorizada e ordenados uma vez
+    pelas chaves (rede, escola, turma); cada grupo é um segmento contíguo e
+    as somas saem de np.add.reduceat. Sem processos, as turmas são somadas
+    dos alunos e cada nível acima das somas do nível abaixo. Com
+    `n_processos` > 1, cada nível é somado direto dos alunos em um processo.
+
+    Args:
+        matriz: Array uint8 (alunos × questões) com códigos de CODIGOS_ALTERNATIVAS
+        ids_questoes: IDs das questões na ordem das colunas
+        escolas: Escola de cada aluno
+        turmas: Turma de cada aluno (dentro da escola)
+        redes: Rede de cada aluno (padrão: todos em uma única rede, "rede")
+        niveis: Níveis calculados, entre NIVEIS
+        n_processos: Se > 1, calcula os níveis em um pool de processos
+        tamanho_bloco: Alunos por bloco na correção
+
+    Returns:
+        Dict {nivel: {"descritores", "grupos" ([{"rede", "escola", "turma"}]),
+        "alunos", "acertos" e "respostas" (grupos × descritores),
+        "percentual_acerto" (grupos × descritores) e "percentual_geral"}};
+        os descritores são todos os de DESCRITORES_SAEB, mais os do banco
+        que não estiverem lá
+    """
+    desconhecidos = [nivel for nivel in niveis if nivel not in NIVEIS]
+    if desconhecidos:
+        raise ValueError(f"Nível desconhecido: {', '.join(desconhecidos)}")
+
+    n_alunos = np.asarray(matriz).shape[0]
+    if redes is None:
+        redes = ["rede"] * n_alunos
+    if not len(escolas) == len(turmas) == len(redes) == n_alunos:
+        raise ValueError("escolas, turmas e redes devem ter um valor por aluno")
+
+    gabarito, descritores_itens = montar_gabarito(ids_questoes)
+    correcao = corrigir_matriz(matriz, gabarito, descritores_itens, tamanho_bloco)
+
+    # Colunas de todos os descritores do SAEB
+    descritores = descritores_saeb()
+    descritores += [d for d in correcao["descritores"] if d not in descritores]
+    colunas = np.array([descritores.index(d) for d in correcao["descritores"]], dtype=np.intp)
+
+    # Chaves codificadas em inteiros; só os valores distintos viram texto
+    rotulos, codigos = [], []
+    for valores in (redes, escolas, turmas):
+        distintos, inverso = np.unique(np.asarray(valores), return_inverse=True)
+        rotulos.append([str(valor) for valor in distintos.tolist()])
+        codigos.append(inverso.reshape(-1).astype(np.int64))
+
+    # Uma chave inteira combinada ordena por (rede, escola, turma) em uma só ordenação
+    combinada = (codigos[0] * len(rotulos[1]) + codigos[1]) * len(rotulos[2]) + codigos[2]
+    ordem = np.argsort(combinada, kind="stable")
+    chaves = np.column_stack(codigos)[ordem] if n_alunos else np.zeros((0, 3), dtype=np.int64)
+    # Só os descritores com questões são somados; os demais ficam zerados em `_formatar`
+    acertos = correcao["acertos_por_descritor"][ordem]
+    respostas = correcao["total_por_descritor"][ordem]
+
+    niveis = [nivel for nivel in NIVEIS if nivel in niveis]
+
+    if n_processos and n_processos > 1 and len(niveis) > 1:
+        with ProcessPoolExecutor(max_workers=min(n_processos, len(niveis))) as executor:
+            futuros = {
+                nivel: executor.submit(_consolidar_nivel, chaves, acertos, respostas, nivel) for nivel in niveis
+            }
+            grupos = {nivel: futuro.result() for nivel, futuro in futuros.items()}
+    else:
+        grupos = {}
+        anterior = None
+        for nivel in niveis:
+            profundidade = len(CHAVES_NIVEL[nivel])
+            if anterior is None:
+                grupos[nivel] = _consolidar_nivel(chaves, acertos, respostas, nivel)
+            else:
+                grupos[nivel] = _reduzir(
+                    anterior["chaves"], anterior["alunos"], anterior["acertos"], anterior["respostas"], profundidade
+                )
+            anterior = grupos[nivel]
+
+    return {nivel: _formatar(nivel, grupos[nivel], rotulos, descritores, colunas) for nivel in niveis}
+
+
+class ArmazemConsolidado:
+    """
+    Consolidações das avaliações de um ArmazemRespostas, em cache
+
+    Cada resultado fica guardado por (avaliação, nível), junto da versão
+    dos dados (linhas gravadas em cada escola, questões e versão do banco);
+    um nível é recalculado só se essa versão mudar. O cache é LRU, limitado
+    a `tamanho_cache` entradas.
+    """
+
+    def __init__(self, armazem, turmas: Optional[Mapping] = None, rede: str = "rede",
+                 tamanho_cache: int = TAMANHO_CACHE_PADRAO):
+        """
+        Args:
+            armazem: ArmazemRespostas com as respostas
+            turmas: {id_aluno (texto, como no armazém): turma}; alunos
+                    ausentes ficam na turma ""
+            rede: Nome da rede de todas as escolas do armazém
+            tamanho_cache: Entradas (avaliação, nível) guardadas
+        """
+        self.armazem = armazem
+        self.turmas = turmas or {}
+        self.rede = rede
+        self.tamanho_cache = tamanho_cache
+        self._cache = OrderedDict()
+        self._trava = threading.Lock()
+
+    def invalidar(self):
+        """Descarta as consolidações guardadas (ex.: após mudar `turmas`)"""
+        with self._trava:
+            self._cache.clear()
+
+    def consolidar(self, avaliacao, ids_questoes: Sequence, niveis: Sequence[str] = NIVEIS,
+                   n_processos: Optional[int] = None) -> Dict:
+        """
+        Consolidação dos níveis pedidos de uma avaliação
+
+        Returns:
+            Dict {nivel: resultado}, como em `consolidar_matriz`
+        """
+        versao = (self.armazem.versao(avaliacao), tuple(ids_questoes), obter_versao_banco())
+
+        with self._trava:
+            resultado = {}
+            for nivel in niveis:
+                entrada = self._cache.get((avaliacao, nivel))
+                if entrada is not None and entrada[0] == versao:
+                    self._cache.move_to_end((avaliacao, nivel))
+                    resultado[nivel] = entrada[1]
+
+        faltando = [nivel for nivel in niveis if nivel not in resultado]
+        if faltando:
+            dados = self.armazem.matriz_respostas(avaliacao, ids_questoes)
+            turmas = [self.turmas.get(id_aluno, "") for id_aluno in dados["ids_alunos"]]
+            calculados = consolidar_matriz(
+                dados["matriz"], ids_questoes, dados["escolas"], turmas, niveis=faltando, n_processos=n_processos,
+                redes=[self.rede] * len(turmas)
+            )
+
+            with self._trava:
+                for nivel, consolidado in calculados.items():
+                    self._cache[(avaliacao, nivel)] = (versao, consolidado)
+                    self._cache.move_to_end((avaliacao, nivel))
+                    if len(self._cache) > self.tamanho_cache:
+                        self._cache.popitem(last=False)
+            resultado.update(calculados)
+
+        return {nivel: resultado[nivel] for nivel in niveis}
@@ -0,0 +1,177 @@
+"""
+Módulo de Correção Vetorizada de Questões SAEB
+Corrige matrizes alunos × questões em uma única passada com NumPy
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from src.questoes_saeb import obter_questao
+
+# Códigos uint8 usados na matriz de respostas (0 = em branco ou inválida)
+CODIGO_BRANCO = 0
+CODIGOS_ALTERNATIVAS = {"A": 1, "B": 2, "C": 3, "D": 4}
+LETRAS_POR_CODIGO = {codigo: letra for letra, codigo in CODIGOS_ALTERNATIVAS.items()}
+MAIOR_CODIGO = max(CODIGOS_ALTERNATIVAS.values())
+
+# Linhas corrigidas por vez; limita os temporários ao tamanho de um bloco
+TAMANHO_BLOCO_PADRAO = 65536
+
+
+def codificar_alternativa(letra) -> int:
+    """Converte uma alternativa ('A'..'D') no código uint8 correspondente"""
+    letra = letra.upper().strip() if letra else ""
+    return CODIGOS_ALTERNATIVAS.get(letra, CODIGO_BRANCO)
+
+
+def codificar_respostas(respostas: Sequence[Dict], ids_questoes: Sequence) -> np.ndarray:
+    """
+    Monta a matriz de respostas a partir de dicts por aluno
+
+    Args:
+        respostas: Lista de dicts {id_questao: resposta_aluno, ...}, um por aluno
+        ids_questoes: IDs das questões na ordem das colunas
+
+    Returns:
+        Matriz uint8 (alunos × questões) com os códigos das alternativas
+    """
+    matriz = np.zeros((len(respostas), len(ids_questoes)), dtype=np.uint8)
+
+    for linha, respostas_aluno in enumerate(respostas):
+        for coluna, id_questao in enumerate(ids_questoes):
+            matriz[linha, coluna] = codificar_alternativa(respostas_aluno.get(id_questao))
+
+    return matriz
+
+
+def montar_gabarito(ids_questoes: Sequence) -> Tuple[np.ndarray, List]:
+    """
+    Monta o vetor de gabarito e os descritores a partir do banco de questões
+
+    Questões inexistentes recebem código 0 e são ignoradas na correção,
+    como acontece em `AnalisadorQuestoes.analisar_multiplas_respostas`.
+
+    Returns:
+        Tupla (gabarito uint8, lista de descritores por coluna)
+    """
+    gabarito = np.zeros(len(ids_questoes), dtype=np.uint8)
+    descritores = []
+
+    for coluna, id_questao in enumerate(ids_questoes):
+        questao = obter_questao(id_questao)
+        if questao:
+            gabarito[coluna] = codificar_alternativa(questao["resposta_correta"])
+            descritores.append(questao["descritor"])
+        else:
+            descritores.append(None)
+
+    return gabarito, descritores
+
+
+def corrigir_matriz(matriz, gabarito, descritores_itens: Sequence,
+                    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Dict:
+    """
+    Corrige todos os alunos de uma vez
+
+    Args:
+        matriz: Array uint8 (alunos × questões) com códigos de CODIGOS_ALTERNATIVAS
+        gabarito: Vetor uint8 com o código da resposta correta de cada questão
+                  (0 marca a questão como inexistente)
+        descritores_itens: Descritor de cada coluna
+        tamanho_bloco: Número de alunos processados por bloco
+
+    Returns:
+        Dict com totais por aluno, subtotais por descritor e máscaras de acerto
+    """
+    matriz = np.asarray(matriz, dtype=np.uint8)
+    gabarito = np.asarray(gabarito, dtype=np.uint8)
+
+    if matriz.ndim != 2:
+        raise ValueError("A matriz de respostas deve ter duas dimensões (alunos × questões)")
+
+    n_alunos, n_itens = matriz.shape
+
+    if gabarito.shape != (n_itens,) or len(descritores_itens) != n_itens:
+        raise ValueError("Gabarito e descritores devem ter uma entrada por coluna da matriz")
+
+    # Colunas válidas agrupadas por descritor, para somas por segmento
+    itens_validos = gabarito != CODIGO_BRANCO
+    descritores = sorted(set(d for d, valido in zip(descritores_itens, itens_validos) if valido))
+    indice_descritor = {d: i for i, d in enumerate(descritores)}
+    colunas_validas = np.flatnonzero(itens_validos)
+    codigos_descritor = np.array(
+        [indice_descritor[descritores_itens[c]] for c in colunas_validas], dtype=np.intp
+    )
+    ordem = colunas_validas[np.argsort(codigos_descritor, kind="stable")]
+    inicios = np.searchsorted(np.sort(codigos_descritor), np.arange(len(descritores)))
+
+    mascara_respondidas = np.empty((n_alunos, n_itens), dtype=bool)
+    mascara_acertos = np.empty((n_alunos, n_itens), dtype=bool)
+    acertos_por_descritor = np.zeros((n_alunos, len(descritores)), dtype=np.int32)
+    total_por_descritor = np.zeros((n_alunos, len(descritores)), dtype=np.int32)
+
+    for inicio in range(0, n_alunos, tamanho_bloco):
+        bloco = slice(inicio, inicio + tamanho_bloco)
+        respostas = matriz[bloco]
+
+        respondidas = mascara_respondidas[bloco]
+        np.logical_and(respostas != CODIGO_BRANCO, respostas <= MAIOR_CODIGO, out=respondidas)
+        respondidas &= itens_validos
+        np.logical_and(respostas == gabarito, respondidas, out=mascara_acertos[bloco])
+
+        if descritores:
+            acertos_por_descritor[bloco] = np.add.reduceat(
+                mascara_acertos[bloco][:, ordem], inicios, axis=1, dtype=np.int32
+            )
+            total_por_descritor[bloco] = np.add.reduceat(
+                respondidas[:, ordem], inicios, axis=1, dtype=np.int32
+            )
+
+    total = mascara_respondidas.sum(axis=1, dtype=np.int32)
+    acertos = mascara_acertos.sum(axis=1, dtype=np.int32)
+
+    # Mesma ordem de operações do caminho por aluno: acertos / total * 100
+    percentual = np.zeros(n_alunos, dtype=np.float64)
+    np.divide(acertos, total, out=percentual, where=total > 0)
+    percentual *= 100
+
+    return {
+        "descritores": descritores,
+        "descritores_itens": list(descritores_itens),
+        "total_questoes": total,
+        "acertos": acertos,
+        "erros": total - acertos,
+        "percentual_acerto": percentual,
+        "pontuacao": acertos * 10,
+        "mascara_acertos": mascara_acertos,
+        "mascara_respondidas": mascara_respondidas,
+        "acertos_por_descritor": acertos_por_descritor,
+        "total_por_descritor": total_por_descritor,
+        "descritores_fortes": (total_por_descritor > 0) & (acertos_por_descritor == total_por_descritor),
+        "descritores_fraco": acertos_por_descritor < total_por_descritor
+    }
+
+
+def resumo_aluno(resultado: Dict, indice: int) -> Dict:
+    """
+    Extrai o resumo de um aluno no mesmo formato agregado de
+    `AnalisadorQuestoes.analisar_multiplas_respostas`
+
+    Os descritores saem na ordem da primeira questão respondida de cada um,
+    como no caminho por aluno (e não na ordem de "descritores").
+    """
+    posicao = {d: i for i, d in enumerate(resultado["descritores"])}
+    respondidas = np.flatnonzero(resultado["mascara_respondidas"][indice]).tolist()
+    ordem = list(dict.fromkeys(resultado["descritores_itens"][coluna] for coluna in respondidas))
+    fortes = resultado["descritores_fortes"][indice]
+    fracos = resultado["descritores_fraco"][indice]
+
+    return {
+        "total_questoes": int(resultado["total_questoes"][indice]),
+        "acertos": int(resultado["acertos"][indice]),
+        "erros": int(resultado["erros"][indice]),
+        "percentual_acerto": float(resultado["percentual_acerto"][indice]),
+        "descritores_fortes": [d for d in ordem if fortes[posicao[d]]],
+        "descritores_fraco": [d for d in ordem if fracos[posicao[d]]]
+    }
@@ -0,0 +1,301 @@
+"""
+Módulo de Estatísticas de Itens - Teoria Clássica dos Testes
+Dificuldade, discriminação e análise de distratores de cada questão para uma coorte inteira
+"""
+
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.correcao_vetorizada import CODIGO_BRANCO, LETRAS_POR_CODIGO, MAIOR_CODIGO, montar_gabarito
+
+# Fração de alunos nos grupos superior e inferior do índice de discriminação (Kelley)
+FRACAO_GRUPOS_PADRAO = 0.27
+
+N_BOOTSTRAP_PADRAO = 200
+NIVEL_CONFIANCA_PADRAO = 0.95
+
+# Alunos processados por bloco; limita os temporários ao tamanho de um bloco
+TAMANHO_BLOCO_PADRAO = 65536
+
+# Estatísticas que recebem intervalo de confiança por bootstrap
+ESTATISTICAS_BOOTSTRAP = ("p_valor", "ponto_bisserial", "correlacao_item_total", "indice_discriminacao")
+
+# Dados do bootstrap em cada processo do pool, enviados uma vez na criação
+_dados_worker = None
+
+
+def _mascaras_bloco(codigos, gabarito, itens_validos, omissao_como_erro: bool):
+    """Máscaras de respondidas e acertos de um bloco de códigos (alunos × itens)"""
+    if omissao_como_erro:
+        respondidas = np.broadcast_to(itens_validos, codigos.shape)
+    else:
+        respondidas = (codigos != CODIGO_BRANCO) & (codigos <= MAIOR_CODIGO) & itens_validos
+    return respondidas, (codigos == gabarito) & itens_validos
+
+
+def _pontuacao_total(matriz, gabarito, itens_validos, tamanho_bloco: int) -> np.ndarray:
+    """Número de acertos de cada aluno"""
+    total = np.empty(matriz.shape[0], dtype=np.int32)
+    for inicio in range(0, matriz.shape[0], tamanho_bloco):
+        bloco = slice(inicio, inicio + tamanho_bloco)
+        total[bloco] = ((matriz[bloco] == gabarito) & itens_validos).sum(axis=1)
+    return total
+
+
+def _somas_ponderadas(ordenada, gabarito, itens_validos, total, pesos, fracao_grupos: float,
+                      omissao_como_erro: bool, tamanho_bloco: int) -> Dict:
+    """
+    Somas ponderadas por item de que saem todas as estatísticas
+
+    `ordenada` e `total` estão em ordem crescente de pontuação total, então os
+    grupos inferior e superior são o começo e o fim das linhas. Com pesos 1
+    são as somas da coorte; no bootstrap, os pesos são quantas vezes cada
+    aluno foi sorteado.
+    """
+    n_alunos, n_itens = ordenada.shape
+    acumulado = np.cumsum(pesos)
+    peso_total = acumulado[-1] if n_alunos else 0.0
+    limite_grupo = fracao_grupos * peso_total
+    fim_inferior = int(np.searchsorted(acumulado, limite_grupo, side="right"))
+    inicio_superior = int(np.searchsorted(acumulado, peso_total - limite_grupo, side="left")) + 1
+    inicio_superior = max(inicio_superior, fim_inferior)
+
+    # Colunas: peso, peso·t, peso·t², peso no grupo inferior, peso no grupo superior
+    somas_respondidas = np.zeros((n_itens, 5))
+    somas_acertos = np.zeros((n_itens, 5))
+
+    for inicio in range(0, n_alunos, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n_alunos)
+        respondidas, acertos = _mascaras_bloco(ordenada[inicio:fim], gabarito, itens_validos, omissao_como_erro)
+        p = pesos[inicio:fim]
+        t = total[inicio:fim].astype(np.float64)
+        posicoes = np.arange(inicio, fim)
+        fatores = np.column_stack([
+            p, p * t, p * t * t, p * (posicoes < fim_inferior), p * (posicoes >= inicio_superior)
+        ])
+        somas_respondidas += respondidas.T.astype(np.float64) @ fatores
+        somas_acertos += acertos.T.astype(np.float64) @ fatores
+
+    return {"respondidas": somas_respondidas, "acertos": somas_acertos}
+
+
+def _correlacao(n, sx, sy, sxy, syy):
+    """Correlação de Pearson de x binário com y a partir das somas; NaN se indefinida"""
+    numerador = n * sxy - sx * sy
+    denominador = (n * sx - sx * sx) * (n * syy - sy * sy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominador > 0, numerador / np.sqrt(np.maximum(denominador, 0)), np.nan)
+
+
+def _estatisticas_das_somas(somas: Dict) -> Dict:
+    """p-valor, ponto-bisserial, correlação item-total corrigida e índice D"""
+    n, st, stt, n_inferior, n_superior = somas["respondidas"].T
+    sx, sxt, _, x_inferior, x_superior = somas["acertos"].T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_valor = np.where(n > 0, sx / n, np.nan)
+        indice = np.where(
+            (n_inferior > 0) & (n_superior > 0), x_superior / n_superior - x_inferior / n_inferior, np.nan
+        )
+
+    # Item-total corrigida: correlação com o total sem o próprio item (x² = x)
+    return {
+        "p_valor": p_valor,
+        "ponto_bisserial": _correlacao(n, sx, st, sxt, stt),
+        "correlacao_item_total": _correlacao(n, sx, st - sx, sxt - sx, stt - 2 * sxt + sx),
+        "indice_discriminacao": indice
+    }
+
+
+def _taxas_alternativas(ordenada, itens_validos, fim_inferior: int, inicio_superior: int,
+                        tamanho_bloco: int) -> Dict:
+    """Proporção de alunos em cada código (0 = em branco) por item, na coorte e nos grupos"""
+    n_alunos, n_itens = ordenada.shape
+    n_codigos = MAIOR_CODIGO + 1
+    contagens = {grupo: np.zeros((n_itens, n_codigos)) for grupo in ("todos", "inferior", "superior")}
+    limites = {"todos": (0, n_alunos), "inferior": (0, fim_inferior), "superior": (inicio_superior, n_alunos)}
+
+    for grupo, (inicio_grupo, fim_grupo) in limites.items():
+        for inicio in range(inicio_grupo, fim_grupo, tamanho_bloco):
+            codigos = ordenada[inicio:min(inicio + tamanho_bloco, fim_grupo)]
+            codigos = np.where(codigos <= MAIOR_CODIGO, codigos, CODIGO_BRANCO)
+            for codigo in range(n_codigos):
+                contagens[grupo][:, codigo] += (codigos == codigo).sum(axis=0)
+
+    taxas = {}
+    for grupo, contagem in contagens.items():
+        quantidade = limites[grupo][1] - limites[grupo][0]
+        taxas[grupo] = contagem / quantidade if quantidade else np.full_like(contagem, np.nan)
+        taxas[grupo][~itens_validos] = np.nan
+
+    return taxas
+
+
+def _inicializar_worker_bootstrap(dados: Dict):
+    global _dados_worker
+    _dados_worker = dados
+
+
+def _replicas_bootstrap(sementes: Sequence, dados: Optional[Dict] = None) -> Dict:
+    """Estatísticas de um lote de réplicas (executado também nos processos do pool)"""
+    dados = dados or _dados_worker
+    n_alunos = dados["ordenada"].shape[0]
+    replicas = {nome: [] for nome in ESTATISTICAS_BOOTSTRAP}
+
+    for semente in sementes:
+        gerador = np.random.default_rng(semente)
+        pesos = np.bincount(gerador.integers(0, n_alunos, n_alunos), minlength=n_alunos).astype(np.float64)
+        somas = _somas_ponderadas(
+            dados["ordenada"], dados["gabarito"], dados["itens_validos"], dados["total"], pesos,
+            dados["fracao_grupos"], dados["omissao_como_erro"], dados["tamanho_bloco"]
+        )
+        for nome, valores in _estatisticas_das_somas(somas).items():
+            replicas[nome].append(valores)
+
+    return {nome: np.array(valores).reshape(len(sementes), -1) for nome, valores in replicas.items()}
+
+
+def estatisticas_itens(matriz, gabarito, omissao_como_erro: bool = True,
+                       fracao_grupos: float = FRACAO_GRUPOS_PADRAO, n_bootstrap: int = 0,
+                       nivel_confianca: float = NIVEL_CONFIANCA_PADRAO, n_processos: Optional[int] = None,
+                       semente: Optional[int] = None, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO) -> Dict:
+    """
+    Estatísticas clássicas de todos os itens em uma passada vetorizada
+
+    Os alunos são ordenados uma vez pela pontuação total; cada estatística
+    sai de somas ponderadas por item acumuladas em blocos, e cada réplica
+    do bootstrap só troca os pesos (quantas vezes cada aluno foi sorteado),
+    sem copiar a matriz.
+
+    Args:
+        matriz: Array uint8 (alunos × itens) com códigos de CODIGOS_ALTERNATIVAS
+        gabarito: Código da resposta correta de cada item (0 = item inexistente)
+        omissao_como_erro: Se True, respostas em branco contam como erro; se
+                           False, cada item considera só quem o respondeu
+        fracao_grupos: Fração de alunos nos grupos superior e inferior do índice D
+        n_bootstrap: Réplicas para os intervalos de confiança (0 desativa)
+        nivel_confianca: Nível dos intervalos (percentis do bootstrap)
+        n_processos: Se > 1, distribui as réplicas em um pool de processos
+                     (padrão: número de CPUs)
+        semente: Semente do bootstrap, para resultados reproduzíveis
+        tamanho_bloco: Alunos por bloco
+
+    Returns:
+        Dict com vetores por item "p_valor", "ponto_bisserial",
+        "correlacao_item_total", "indice_discriminacao" e "respondentes";
+        "taxas_alternativas", "taxas_grupo_inferior" e "taxas_grupo_superior"
+        (itens × códigos, coluna 0 = em branco); "alunos" e, com bootstrap,
+        "intervalos" ({estatística: (limite_inferior, limite_superior)})
+    """
+    matriz = np.asarray(matriz, dtype=np.uint8)
+    gabarito = np.asarray(gabarito, dtype=np.uint8)
+
+    if matriz.ndim != 2 or gabarito.shape != (matriz.shape[1],):
+        raise ValueError("A matriz deve ser alunos × itens e o gabarito deve ter um código por item")
+    if not 0 < fracao_grupos <= 0.5:
+        raise ValueError("A fração dos grupos deve estar entre 0 e 0,5")
+
+    itens_validos = gabarito != CODIGO_BRANCO
+    total = _pontuacao_total(matriz, gabarito, itens_validos, tamanho_bloco)
+    ordem = np.argsort(total, kind="stable")
+    ordenada = matriz[ordem]
+    total = total[ordem]
+
+    n_alunos = matriz.shape[0]
+    somas = _somas_ponderadas(
+        ordenada, gabarito, itens_validos, total, np.ones(n_alunos), fracao_grupos, omissao_como_erro, tamanho_bloco
+    )
+    resultado = _estatisticas_das_somas(somas)
+    resultado["respondentes"] = somas["respondidas"][:, 0].astype(np.int64)
+    resultado["alunos"] = n_alunos
+
+    tamanho_grupo = int(fracao_grupos * n_alunos)
+    taxas = _taxas_alternativas(ordenada, itens_validos, tamanho_grupo, n_alunos - tamanho_grupo, tamanho_bloco)
+    resultado["taxas_alternativas"] = taxas["todos"]
+    resultado["taxas_grupo_inferior"] = taxas["inferior"]
+    resultado["taxas_grupo_superior"] = taxas["superior"]
+
+    if n_bootstrap > 0 and n_alunos > 0:
+        dados = {
+            "ordenada": ordenada, "gabarito": gabarito, "itens_validos": itens_validos, "total": total,
+            "fracao_grupos": fracao_grupos, "omissao_como_erro": omissao_como_erro, "tamanho_bloco": tamanho_bloco
+        }
+        # Uma semente por réplica: o resultado não depende do número de processos
+        sementes = np.random.SeedSequence(semente).spawn(n_bootstrap)
+        n_processos = n_processos or os.cpu_count() or 1
+
+        if n_processos > 1 and n_bootstrap > 1:
+            lotes = [lote for lote in np.array_split(np.array(sementes, dtype=object), n_processos) if len(lote)]
+            with ProcessPoolExecutor(max_workers=len(lotes), initializer=_inicializar_worker_bootstrap,
+                                     initargs=(dados,)) as executor:
+                partes = list(executor.map(_replicas_bootstrap, [list(lote) for lote in lotes]))
+        else:
+            partes = [_replicas_bootstrap(sementes, dados)]
+
+        alfa = (1 - nivel_confianca) / 2 * 100
+        resultado["intervalos"] = {}
+        for nome in ESTATISTICAS_BOOTSTRAP:
+            replicas = np.concatenate([parte[nome] for parte in partes])
+            # Itens inexistentes no banco têm só NaN nas réplicas
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                limites = np.nanpercentile(replicas, [alfa, 100 - alfa], axis=0)
+            resultado["intervalos"][nome] = (limites[0], limites[1])
+
+    return resultado
+
+
+def _taxas_por_letra(taxas) -> Dict:
+    """Linha de taxas (coluna 0 = em branco) como {"A": ..., "D": ..., "branco": ...}"""
+    letras = {LETRAS_POR_CODIGO[codigo]: float(taxas[codigo]) for codigo in range(1, MAIOR_CODIGO + 1)}
+    letras["branco"] = float(taxas[CODIGO_BRANCO])
+    return letras
+
+
+def estatisticas_itens_banco(matriz, ids_questoes: Sequence, **opcoes) -> Dict:
+    """
+    Estatísticas das questões do banco a partir de uma matriz de respostas codificada
+
+    Args:
+        matriz: Array uint8 (alunos × questões) com códigos de CODIGOS_ALTERNATIVAS
+        ids_questoes: IDs das questões na ordem das colunas
+        **opcoes: Repassadas para `estatisticas_itens`
+
+    Returns:
+        Dict {id_questao: {"descritor", "resposta_correta", "p_valor",
+        "ponto_bisserial", "correlacao_item_total", "indice_discriminacao",
+        "respondentes", "taxas_alternativas", "taxas_grupo_inferior",
+        "taxas_grupo_superior" e, com bootstrap, "intervalos"}}; questões
+        fora do banco ficam de fora
+    """
+    gabarito, descritores = montar_gabarito(ids_questoes)
+    estatisticas = estatisticas_itens(matriz, gabarito, **opcoes)
+    itens = {}
+
+    for i, id_questao in enumerate(ids_questoes):
+        if not gabarito[i]:
+            continue
+
+        item = {
+            "descritor": descritores[i],
+            "resposta_correta": LETRAS_POR_CODIGO[int(gabarito[i])],
+            "respondentes": int(estatisticas["respondentes"][i]),
+            **{nome: float(estatisticas[nome][i]) for nome in ESTATISTICAS_BOOTSTRAP},
+            "taxas_alternativas": _taxas_por_letra(estatisticas["taxas_alternativas"][i]),
+            "taxas_grupo_inferior": _taxas_por_letra(estatisticas["taxas_grupo_inferior"][i]),
+            "taxas_grupo_superior": _taxas_por_letra(estatisticas["taxas_grupo_superior"][i])
+        }
+
+        if "intervalos" in estatisticas:
+            item["intervalos"] = {
+                nome: (float(inferior[i]), float(superior[i]))
+                for nome, (inferior, superior) in estatisticas["intervalos"].items()
+            }
+
+        itens[id_questao] = item
+
+    return itens
@@ -0,0 +1,261 @@
+"""
+Fila de Tarefas em Segundo Plano
+Executa extrações demoradas fora do script do Streamlit, com estado em SQLite
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from src.cache_arquivos import diretorio_cache_padrao
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    progresso REAL NOT NULL DEFAULT 0,
+    mensagem TEXT NOT NULL DEFAULT '',
+    resultado TEXT,
+    erro TEXT,
+    processo INTEGER NOT NULL,
+    criada_em REAL NOT NULL,
+    iniciada_em REAL,
+    concluida_em REAL,
+    renovada_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_estado ON tarefas (estado);
+"""
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+ERRO = "erro"
+
+# Tarefas executadas ao mesmo tempo; as demais aguardam na fila
+N_WORKERS_PADRAO = 2
+
+# Tarefas concluídas ficam disponíveis por este tempo (segundos)
+RETENCAO_PADRAO = 24 * 60 * 60
+
+# Intervalo mínimo entre gravações de progresso de uma tarefa (segundos)
+INTERVALO_PROGRESSO = 0.25
+
+# Cada processo renova suas tarefas pendentes e em execução neste intervalo;
+# tarefas sem renovação há mais que o prazo ficaram sem processo e são
+# marcadas como interrompidas (segundos)
+INTERVALO_RENOVACAO = 10
+PRAZO_RENOVACAO = 60
+
+_CAMPOS_STATUS = "id, tipo, estado, progresso, mensagem, erro, criada_em, iniciada_em, concluida_em"
+
+
+class FilaTarefas:
+    """
+    Fila local de tarefas executadas por um pool de threads
+
+    Cada tarefa recebe um id, e seu estado, progresso e resultado (JSON)
+    ficam em uma tabela SQLite. A página guarda apenas o id e consulta o
+    estado a cada execução, então a tarefa continua mesmo que o usuário
+    mude de tela, e o resultado pode ser buscado depois.
+
+    As entradas das tarefas ficam só em memória. Vários processos podem
+    usar o mesmo arquivo: cada um renova as próprias tarefas a cada
+    INTERVALO_RENOVACAO, e as que ficam sem renovação por PRAZO_RENOVACAO
+    (processo encerrado ou reiniciado) são marcadas como interrompidas.
+    """
+
+    def __init__(self, caminho=None, n_workers: int = N_WORKERS_PADRAO, retencao: float = RETENCAO_PADRAO):
+        if caminho is None:
+            diretorio = diretorio_cache_padrao()
+            diretorio.mkdir(parents=True, exist_ok=True)
+            caminho = diretorio / "tarefas.sqlite3"
+
+        self.caminho = str(caminho)
+        self.retencao = retencao
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conexao.executescript(ESQUEMA)
+        self._migrar()
+        self._executor = ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix="fila_tarefas")
+        # Tarefas deste processo ainda pendentes ou em execução, renovadas pela thread abaixo
+        self._ativas = set()
+        self._encerrada = threading.Event()
+
+        self._expirar_orfas()
+        self._renovacao = threading.Thread(target=self._renovar_periodicamente, name="fila_tarefas_renovacao",
+                                           daemon=True)
+        self._renovacao.start()
+
+    def _migrar(self):
+        """Acrescenta `renovada_em` a arquivos criados antes da coluna existir"""
+        colunas = [registro[1] for registro in self._conexao.execute("PRAGMA table_info(tarefas)")]
+        if "renovada_em" not in colunas:
+            try:
+                self._conexao.execute("ALTER TABLE tarefas ADD COLUMN renovada_em REAL")
+            except sqlite3.OperationalError:
+                # Outro processo acrescentou a coluna ao mesmo tempo
+                pass
+
+    def _executar_sql(self, sql: str, parametros=()):
+        with self._trava:
+            with self._conexao:
+                return self._conexao.execute(sql, parametros)
+
+    def _renovar(self):
+        """Marca as tarefas deste processo como vivas"""
+        with self._trava:
+            ativas = list(self._ativas)
+            if ativas:
+                with self._conexao:
+                    self._conexao.execute(
+                        f"UPDATE tarefas SET renovada_em = ? WHERE id IN ({', '.join('?' * len(ativas))})",
+                        (time.time(), *ativas)
+                    )
+
+    def _expirar_orfas(self):
+        """Marca como interrompidas as tarefas que nenhum processo renovou dentro do prazo"""
+        self._executar_sql(
+            "UPDATE tarefas SET estado = ?, erro = ?, concluida_em = ? "
+            "WHERE estado IN (?, ?) AND COALESCE(renovada_em, criada_em) < ?",
+            (ERRO, "Tarefa interrompida (o servidor foi reiniciado)", time.time(), PENDENTE, EXECUTANDO,
+             time.time() - PRAZO_RENOVACAO)
+        )
+
+    def _renovar_periodicamente(self):
+        while not self._encerrada.wait(INTERVALO_RENOVACAO):
+            try:
+                self._renovar()
+                self._expirar_orfas()
+            except sqlite3.Error:
+                # Arquivo ocupado ou fechado: tenta de novo no próximo intervalo
+                pass
+
+    def enviar(self, tipo: str, funcao: Callable, *args, **kwargs) -> str:
+        """
+        Coloca uma tarefa na fila
+
+        `funcao` é chamada como funcao(*args, reportar=..., **kwargs), em que
+        reportar(progresso, mensagem) atualiza o andamento (progresso de 0 a
+        1, ou None para manter o atual). O valor retornado deve ser
+        serializável em JSON.
+
+        Returns:
+            Id da tarefa
+        """
+        self.limpar_antigas()
+        id_tarefa = uuid.uuid4().hex
+        agora = time.time()
+        with self._trava:
+            self._ativas.add(id_tarefa)
+        self._executar_sql(
+            "INSERT INTO tarefas (id, tipo, estado, processo, criada_em, renovada_em) VALUES (?, ?, ?, ?, ?, ?)",
+            (id_tarefa, tipo, PENDENTE, os.getpid(), agora, agora)
+        )
+        self._executor.submit(self._executar, id_tarefa, funcao, args, kwargs)
+        return id_tarefa
+
+    def _executar(self, id_tarefa: str, funcao: Callable, args, kwargs):
+        try:
+            self._executar_tarefa(id_tarefa, funcao, args, kwargs)
+        finally:
+            with self._trava:
+                self._ativas.discard(id_tarefa)
+
+    def _executar_tarefa(self, id_tarefa: str, funcao: Callable, args, kwargs):
+        agora = time.time()
+        self._executar_sql(
+            "UPDATE tarefas SET estado = ?, iniciada_em = ?, renovada_em = ? WHERE id = ?",
+            (EXECUTANDO, agora, agora, id_tarefa)
+        )
+        ultima_gravacao = 0.0
+
+        def reportar(progresso: Optional[float] = None, mensagem: Optional[str] = None):
+            nonlocal ultima_gravacao
+            agora = time.monotonic()
+            if agora - ultima_gravacao < INTERVALO_PROGRESSO and progresso != 1:
+                return
+            ultima_gravacao = agora
+            self._executar_sql(
+                "UPDATE tarefas SET progresso = COALESCE(?, progresso), mensagem = COALESCE(?, mensagem), "
+                "renovada_em = ? WHERE id = ?",
+                (progresso, mensagem, time.time(), id_tarefa)
+            )
+
+        try:
+            resultado = json.dumps(funcao(*args, reportar=reportar, **kwargs), ensure_ascii=False)
+        except Exception as e:
+            self._executar_sql(
+                "UPDATE tarefas SET estado = ?, erro = ?, concluida_em = ? WHERE id = ?",
+                (ERRO, str(e) or type(e).__name__, time.time(), id_tarefa)
+            )
+            return
+
+        self._executar_sql(
+            "UPDATE tarefas SET estado = ?, progresso = 1, resultado = ?, concluida_em = ? WHERE id = ?",
+            (CONCLUIDA, resultado, time.time(), id_tarefa)
+        )
+
+    def status(self, id_tarefa: str) -> Optional[Dict]:
+        """Estado, progresso e mensagem da tarefa (sem o resultado), ou None"""
+        with self._trava:
+            cursor = self._conexao.execute(f"SELECT {_CAMPOS_STATUS} FROM tarefas WHERE id = ?", (id_tarefa,))
+            registro = cursor.fetchone()
+            if registro is None:
+                return None
+            return dict(zip([coluna[0] for coluna in cursor.description], registro))
+
+    def resultado(self, id_tarefa: str):
+        """Resultado de uma tarefa concluída, ou None"""
+        with self._trava:
+            registro = self._conexao.execute(
+                "SELECT resultado FROM tarefas WHERE id = ? AND estado = ?", (id_tarefa, CONCLUIDA)
+            ).fetchone()
+        return json.loads(registro[0]) if registro else None
+
+    def pendentes(self) -> int:
+        """Número de tarefas aguardando ou em execução"""
+        with self._trava:
+            return self._conexao.execute(
+                "SELECT COUNT(*) FROM tarefas WHERE estado IN (?, ?)", (PENDENTE, EXECUTANDO)
+            ).fetchone()[0]
+
+    def limpar_antigas(self):
+        """Remove tarefas concluídas (ou com erro) há mais tempo que a retenção e expira as órfãs"""
+        self._expirar_orfas()
+        self._executar_sql(
+            "DELETE FROM tarefas WHERE estado IN (?, ?) AND concluida_em < ?",
+            (CONCLUIDA, ERRO, time.time() - self.retencao)
+        )
+
+    def encerrar(self, aguardar: bool = True):
+        """Para de aceitar tarefas e fecha o arquivo"""
+        self._executor.shutdown(wait=aguardar, cancel_futures=not aguardar)
+        self._encerrada.set()
+        self._renovacao.join()
+        with self._trava:
+            self._conexao.close()
+
+
+_fila_padrao = None
+_trava_fila_padrao = threading.Lock()
+
+
+def obter_fila() -> FilaTarefas:
+    """Fila compartilhada pelo processo (todas as sessões do Streamlit)"""
+    global _fila_padrao
+
+    with _trava_fila_padrao:
+        if _fila_padrao is None:
+            try:
+                _fila_padrao = FilaTarefas()
+            except (OSError, sqlite3.Error):
+                # Sem diretório gravável: estado só em memória, perdido ao reiniciar
+                _fila_padrao = FilaTarefas(":memory:")
+
+    return _fila_padrao
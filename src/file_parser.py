@@ -6,8 +6,16 @@ Versão otimizada com pytesseract (3x mais rápido que easyocr)
 
 import re
 import io
+import os
+import math
+import time
+import zipfile
+import posixpath
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable, Callable
+from collections import deque
 
 try:
     import PyPDF2
@@ -15,62 +23,650 @@ except ImportError:
     PyPDF2 = None
 
 try:
-    from docx import Document
+    from pdf2image import convert_from_bytes
 except ImportError:
-    Document = None
+    convert_from_bytes = None
 
 try:
     from PIL import Image
 except ImportError:
     Image = None
 
-try:
-    import pytesseract
-except ImportError:
-    pytesseract = None
+from src.cache_arquivos import obter_cache_padrao
+from src.ocr import ocr_disponivel, obter_servico_ocr
+
+
+# Versão da extração; incrementar quando o resultado do parsing mudar,
+# para que o cache de arquivos processados não devolva resultados antigos
+VERSAO_PARSER = "5"
+
+EXTENSOES_PDF = ['.pdf']
+EXTENSOES_DOCX = ['.docx', '.doc']
+EXTENSOES_IMAGEM = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
+EXTENSOES_ZIP = ['.zip']
+
+# Limites na abertura de ZIPs enviados (proteção contra "zip bombs")
+MAX_ARQUIVOS_ZIP = 1000
+MAX_BYTES_ARQUIVO_ZIP = 100 * 1024 * 1024
+MAX_BYTES_ZIP = 1024 * 1024 * 1024
+MAX_TAXA_COMPRESSAO_ZIP = 100
+
+# PDFs com menos páginas que isso são extraídos no próprio processo
+MIN_PAGINAS_PARALELO = 8
+
+# Tarefas por worker na extração paralela (equilibra páginas lentas e rápidas)
+TAREFAS_POR_WORKER = 4
+
+# Páginas com menos caracteres visíveis que isso são tratadas como
+# digitalizadas (sem camada de texto) e vão para o OCR
+MIN_CARACTERES_CAMADA_TEXTO = 25
+
+# Resolução usada para rasterizar páginas digitalizadas
+DPI_RASTERIZACAO = 300
+
+# Leitor de PDF de cada processo do pool, criado uma vez pelo inicializador
+_leitor_pdf_worker = None
+_bytes_pdf_worker = None
+_rasterizar_worker = False
+
+
+def _inicializar_worker_pdf(arquivo_bytes, rasterizar=False):
+    """Abre o PDF uma única vez em cada processo do pool"""
+    global _leitor_pdf_worker, _bytes_pdf_worker, _rasterizar_worker
+    _leitor_pdf_worker = PyPDF2.PdfReader(io.BytesIO(arquivo_bytes))
+    _bytes_pdf_worker = arquivo_bytes
+    _rasterizar_worker = rasterizar
+
+
+def tem_camada_texto(texto: str) -> bool:
+    """Indica se o texto extraído de uma página é suficiente para dispensar o OCR"""
+    return len("".join(texto.split())) >= MIN_CARACTERES_CAMADA_TEXTO
+
+
+def _rasterizar_pagina(indice: int, leitor, arquivo_bytes) -> Optional[bytes]:
+    """
+    Imagem de uma página para OCR
+    
+    Usa o pdf2image (poppler) quando disponível; sem ele, recorre à maior
+    imagem embutida na página, que em PDFs digitalizados é a própria folha.
+    """
+    if convert_from_bytes is not None:
+        try:
+            imagens = convert_from_bytes(
+                arquivo_bytes, dpi=DPI_RASTERIZACAO, first_page=indice + 1, last_page=indice + 1, grayscale=True
+            )
+        except Exception:
+            imagens = []  # poppler ausente ou página ilegível: tenta as imagens embutidas
+        
+        if imagens:
+            saida = io.BytesIO()
+            imagens[0].save(saida, format="PNG", dpi=(DPI_RASTERIZACAO, DPI_RASTERIZACAO), compress_level=1)
+            return saida.getvalue()
+    
+    try:
+        embutidas = leitor.pages[indice].images
+        maior = max(embutidas, key=lambda imagem: len(imagem.data), default=None)
+    except Exception:
+        return None
+    
+    return maior.data if maior is not None else None
+
+
+def _extrair_intervalo_paginas(inicio: int, fim: int, leitor=None, arquivo_bytes=None,
+                               rasterizar=None) -> List[Tuple[int, str, float, Optional[bytes]]]:
+    """
+    Extrai o texto das páginas [inicio, fim) com o tempo gasto em cada uma
+    
+    Com `rasterizar`, páginas sem camada de texto também trazem a imagem
+    a ser enviada ao OCR (None nas demais).
+    """
+    if leitor is None:
+        leitor, arquivo_bytes, rasterizar = _leitor_pdf_worker, _bytes_pdf_worker, _rasterizar_worker
+    paginas = []
+    
+    for indice in range(inicio, fim):
+        inicio_pagina = time.perf_counter()
+        texto = leitor.pages[indice].extract_text() or ""
+        imagem = None
+        if rasterizar and not tem_camada_texto(texto):
+            imagem = _rasterizar_pagina(indice, leitor, arquivo_bytes)
+        paginas.append((indice, texto, time.perf_counter() - inicio_pagina, imagem))
+    
+    return paginas
+
+
+def expandir_zip(arquivo_bytes, nome_zip: str) -> Tuple[List[Tuple[str, bytes]], List[str]]:
+    """
+    Extrai do ZIP os arquivos em formatos suportados
+    
+    Pastas, arquivos ocultos, ZIPs aninhados, arquivos criptografados e
+    entradas acima dos limites (tamanho ou taxa de compressão) são
+    ignorados, com um aviso. O tamanho lido é conferido durante a leitura,
+    sem confiar no cabeçalho do ZIP.
+    
+    Returns:
+        Tupla (lista de (nome, conteudo_bytes), avisos)
+    
+    Raises:
+        ValueError: se o ZIP ultrapassar o número de arquivos ou o total descompactado
+    """
+    arquivos = []
+    avisos = []
+    total_bytes = 0
+    
+    with zipfile.ZipFile(io.BytesIO(arquivo_bytes)) as pacote:
+        entradas = [
+            info for info in pacote.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not posixpath.basename(info.filename).startswith(".")
+        ]
+        
+        if len(entradas) > MAX_ARQUIVOS_ZIP:
+            raise ValueError(f"{nome_zip} tem mais de {MAX_ARQUIVOS_ZIP} arquivos")
+        
+        for info in entradas:
+            nome = f"{nome_zip}/{info.filename}"
+            extensao = Path(info.filename).suffix.lower()
+            
+            if extensao not in EXTENSOES_PDF + EXTENSOES_DOCX + EXTENSOES_IMAGEM:
+                avisos.append(f"⚠️ {nome}: formato não suportado, ignorado")
+                continue
+            if info.flag_bits & 0x1:
+                avisos.append(f"⚠️ {nome}: arquivo criptografado, ignorado")
+                continue
+            if (info.file_size > MAX_BYTES_ARQUIVO_ZIP
+                    or info.file_size > MAX_TAXA_COMPRESSAO_ZIP * max(info.compress_size, 1)):
+                avisos.append(f"⚠️ {nome}: tamanho ou compressão acima do limite, ignorado")
+                continue
+            
+            with pacote.open(info) as membro:
+                conteudo = membro.read(MAX_BYTES_ARQUIVO_ZIP + 1)
+            
+            if len(conteudo) > MAX_BYTES_ARQUIVO_ZIP:
+                avisos.append(f"⚠️ {nome}: tamanho acima do limite, ignorado")
+                continue
+            
+            total_bytes += len(conteudo)
+            if total_bytes > MAX_BYTES_ZIP:
+                raise ValueError(f"{nome_zip} passa de {MAX_BYTES_ZIP // (1024 * 1024)} MB descompactado")
+            
+            arquivos.append((nome, conteudo))
+    
+    return arquivos, avisos
+
+
+def _processar_arquivo_isolado(nome_arquivo: str, arquivo_bytes) -> Tuple[List[Dict], str, float]:
+    """Processa um arquivo do lote em um processo do pool, sem paralelismo interno"""
+    inicio = time.perf_counter()
+    questoes, mensagem = ParserArquivos(max_workers=1, cache=False).processar_arquivo(arquivo_bytes, nome_arquivo)
+    return questoes, mensagem, time.perf_counter() - inicio
+
+
+def _chave_questao(questao: Dict) -> Tuple:
+    """Identidade de uma questão para remover repetições entre arquivos"""
+    def normalizar(texto):
+        return " ".join(texto.lower().split())
+    
+    return (
+        normalizar(questao.get('enunciado', '')),
+        tuple(sorted((letra, normalizar(texto)) for letra, texto in questao.get('alternativas', {}).items()))
+    )
+
+
+def _mapear_em_ordem(executor, funcao, *argumentos, janela: int) -> Iterator:
+    """
+    Como `executor.map`, mas com no máximo `janela` tarefas em andamento,
+    para que resultados não consumidos não se acumulem na memória
+    """
+    pendentes = deque()
+    
+    for args in zip(*argumentos):
+        if len(pendentes) >= janela:
+            yield pendentes.popleft().result()
+        pendentes.append(executor.submit(funcao, *args))
+    
+    while pendentes:
+        yield pendentes.popleft().result()
+
+
+# Classificador de linhas (já sem espaços nas pontas), em uma única passada:
+# - alternativa: "A) texto" (letras A-D, como valida o analisador)
+# - cabecalho: início de questão ("Questão 3", "Q 3", "Q. 3")
+# - prefixo_q: demais linhas iniciadas por "q" (ex.: "Qual..."), que não
+#   entram no enunciado e encerram a questão após as alternativas
+# Sem correspondência, a linha é vazia ou continuação do bloco atual
+_PADRAO_LINHA = re.compile(
+    r'(?P<letra>[a-dA-D])\)\s*(?P<alternativa>.*)'
+    r'|(?P<cabecalho>(?:questão|q\.?)\s*\d)'
+    r'|(?P<prefixo_q>q)',
+    re.IGNORECASE
+)
+
+# Estados do extrator
+_FORA_DE_QUESTAO = 0
+_NO_ENUNCIADO = 1
+_NAS_ALTERNATIVAS = 2
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+_TIPO_DOCUMENTO_PRINCIPAL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# Texto equivalente dos elementos de uma execução (w:r) do DOCX; quebras de
+# página e de coluna (w:br com w:type) não geram texto, como no python-docx
+_TEXTO_ELEMENTOS_DOCX = {
+    _W + "tab": "\t",
+    _W + "ptab": "\t",
+    _W + "cr": "\n",
+    _W + "noBreakHyphen": "-",
+}
+
+
+def _caminho_documento_docx(pacote: zipfile.ZipFile) -> str:
+    """Parte principal do DOCX, segundo _rels/.rels (normalmente word/document.xml)"""
+    try:
+        with pacote.open("_rels/.rels") as relacoes:
+            for relacao in ElementTree.parse(relacoes).getroot():
+                if relacao.get("Type") == _TIPO_DOCUMENTO_PRINCIPAL:
+                    return posixpath.normpath(relacao.get("Target").lstrip("/"))
+    except (KeyError, ElementTree.ParseError):
+        pass
+    
+    return "word/document.xml"
+
+
+def iterar_paragrafos_docx(arquivo_bytes) -> Iterator[str]:
+    """
+    Gera o texto de cada parágrafo do DOCX, em ordem, inclusive os de tabelas
+    
+    Lê o XML do documento direto do zip com um parser incremental, sem
+    carregar imagens e demais partes, e descarta cada trecho já lido.
+    O Word grava cada caixa de texto duas vezes (mc:Choice e mc:Fallback);
+    só a primeira cópia é lida.
+    """
+    with zipfile.ZipFile(io.BytesIO(arquivo_bytes)) as pacote:
+        with pacote.open(_caminho_documento_docx(pacote)) as documento:
+            # Parágrafos abertos: caixas de texto podem conter parágrafos aninhados
+            abertos = []
+            execucoes = 0
+            profundidade = 0
+            # Elementos mc:Fallback abertos; o conteúdo deles repete o de mc:Choice
+            alternativos = 0
+            corpo = None
+            
+            for evento, elemento in ElementTree.iterparse(documento, events=("start", "end")):
+                tag = elemento.tag
+                
+                if evento == "start":
+                    profundidade += 1
+                    if tag == _MC + "Fallback":
+                        alternativos += 1
+                    elif alternativos:
+                        pass
+                    elif tag == _W + "p":
+                        abertos.append([])
+                    elif tag == _W + "r":
+                        execucoes += 1
+                    elif tag == _W + "body":
+                        corpo = elemento
+                    continue
+                
+                profundidade -= 1
+                
+                if tag == _MC + "Fallback":
+                    alternativos -= 1
+                elif alternativos:
+                    pass
+                elif tag == _W + "r":
+                    execucoes -= 1
+                elif execucoes and abertos:
+                    if tag == _W + "t":
+                        abertos[-1].append(elemento.text or "")
+                    elif tag == _W + "br":
+                        if elemento.get(_W + "type", "textWrapping") == "textWrapping":
+                            abertos[-1].append("\n")
+                    elif tag in _TEXTO_ELEMENTOS_DOCX:
+                        abertos[-1].append(_TEXTO_ELEMENTOS_DOCX[tag])
+                
+                if tag == _W + "p" and not alternativos:
+                    yield "".join(abertos.pop())
+                
+                # Filho do corpo concluído (parágrafo ou tabela): libera a memória
+                if profundidade == 2 and corpo is not None:
+                    corpo.clear()
+
+
+class ExtratorQuestoesIncremental:
+    """
+    Extrai questões de um texto recebido em partes (ex.: página a página)
+    
+    Cada linha é classificada uma única vez e conduz uma pequena máquina de
+    estados (fora de questão, no enunciado, nas alternativas). Cada questão
+    é devolvida assim que termina, isto é, quando começa a próxima questão
+    ou quando o texto acaba, e pode atravessar quebras de página. O
+    resultado é o mesmo de extrair o texto inteiro de uma vez.
+    """
+    
+    def __init__(self):
+        self._linha_parcial = ""
+        self._estado = _FORA_DE_QUESTAO
+        self._numero_questao = 1
+        self._enunciado = []
+        self._alternativas = {}
+        self._ultima_letra = None
+        self._linhas_bloco = 0
+    
+    def alimentar(self, trecho: str) -> List[Dict]:
+        """Recebe o próximo trecho do texto; retorna as questões concluídas"""
+        linhas = (self._linha_parcial + trecho).split('\n')
+        self._linha_parcial = linhas.pop()
+        
+        concluidas = []
+        for linha in linhas:
+            self._processar_linha(linha, concluidas)
+        
+        return concluidas
+    
+    def finalizar(self) -> List[Dict]:
+        """Indica o fim do texto; retorna a última questão, se houver"""
+        concluidas = []
+        self._processar_linha(self._linha_parcial, concluidas)
+        self._linha_parcial = ""
+        self._concluir_questao(concluidas)
+        return concluidas
+    
+    def _processar_linha(self, linha_original: str, concluidas: List[Dict]):
+        linha = linha_original.strip()
+        classe = None
+        if linha:
+            correspondencia = _PADRAO_LINHA.match(linha)
+            if correspondencia is not None:
+                classe = correspondencia.lastgroup
+        
+        if self._estado == _NAS_ALTERNATIVAS and classe in ('cabecalho', 'prefixo_q'):
+            # Início da próxima questão (ou linha "q..."): a atual está completa
+            self._concluir_questao(concluidas)
+        
+        if self._estado == _FORA_DE_QUESTAO:
+            if classe == 'cabecalho':
+                self._estado = _NO_ENUNCIADO
+                self._linhas_bloco = 1
+            return
+        
+        self._linhas_bloco += 1
+        
+        if classe == 'alternativa':
+            letra = correspondencia.group('letra').upper()
+            if letra not in self._alternativas:
+                self._ultima_letra = letra
+            self._alternativas[letra] = correspondencia.group('alternativa')
+            self._estado = _NAS_ALTERNATIVAS
+        elif classe is None and linha:
+            if self._estado == _NO_ENUNCIADO:
+                self._enunciado.append(linha)
+            else:
+                # Continuação da alternativa inserida por último
+                self._alternativas[self._ultima_letra] += ' ' + linha
+    
+    def _concluir_questao(self, concluidas: List[Dict]):
+        if self._estado == _NAS_ALTERNATIVAS:
+            concluidas.append({
+                'enunciado': ' '.join(self._enunciado),
+                'alternativas': self._alternativas,
+                'linhas_processadas': self._linhas_bloco,
+                'id': self._numero_questao
+            })
+            self._numero_questao += 1
+        
+        self._estado = _FORA_DE_QUESTAO
+        self._enunciado = []
+        self._alternativas = {}
+        self._ultima_letra = None
+        self._linhas_bloco = 0
 
 
 class ParserArquivos:
     """Parser para extrair questões de diferentes formatos de arquivo"""
     
-    def processar_arquivo(self, arquivo_bytes, nome_arquivo: str) -> Tuple[List[Dict], str]:
+    def __init__(self, max_workers: Optional[int] = None, cache=None):
+        """
+        Args:
+            max_workers: Processos usados na extração de páginas de PDF, no
+                         OCR e no processamento em lote (padrão: número de
+                         CPUs; 1 desativa o paralelismo)
+            cache: CacheArquivos para reaproveitar resultados de arquivos já
+                   processados (padrão: cache compartilhado em disco;
+                   False desativa)
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = obter_cache_padrao() if cache is None else cache
+        self.relatorio_paginas = []
+        self.relatorio_ocr = []
+    
+    def processar_arquivo(self, arquivo_bytes, nome_arquivo: str,
+                          ao_extrair_questao: Optional[Callable[[Dict], None]] = None) -> Tuple[List[Dict], str]:
         """
         Processa arquivo e extrai questões
         
+        Arquivos com o mesmo conteúdo já processados pela mesma versão do
+        parser são servidos do cache, sem nova extração ou OCR.
+        
         Args:
             arquivo_bytes: Conteúdo do arquivo em bytes
             nome_arquivo: Nome do arquivo
+            ao_extrair_questao: Chamada com cada questão assim que ela é
+                                extraída (em PDFs, antes do fim do documento)
             
         Returns:
             Tupla (lista_questoes, mensagem_status)
         """
         extensao = Path(nome_arquivo).suffix.lower()
         
-        if extensao == '.pdf':
-            return self._processar_pdf(arquivo_bytes)
-        elif extensao in ['.docx', '.doc']:
-            return self._processar_docx(arquivo_bytes)
-        elif extensao in ['.jpg', '.jpeg', '.png', '.bmp', '.gif']:
-            return self._processar_imagem(arquivo_bytes, extensao)
-        else:
+        if extensao not in EXTENSOES_PDF + EXTENSOES_DOCX + EXTENSOES_IMAGEM:
             return [], f"❌ Formato não suportado: {extensao}"
+        
+        chave, em_cache = self._consultar_cache(arquivo_bytes, extensao)
+        
+        if em_cache is not None:
+            self.relatorio_paginas = []
+            self.relatorio_ocr = []
+            questoes = self._coletar_questoes(em_cache[0], ao_extrair_questao)
+            return questoes, em_cache[1]
+        
+        questoes, mensagem = self._processar_por_formato(arquivo_bytes, extensao, ao_extrair_questao)
+        self._guardar_cache(chave, questoes, mensagem)
+        
+        return questoes, mensagem
+    
+    def _consultar_cache(self, arquivo_bytes, extensao: str) -> Tuple[Optional[str], Optional[Tuple[List[Dict], str]]]:
+        """Retorna (chave, (questoes, mensagem) ou None); chave é None sem cache"""
+        if not self.cache:
+            return None, None
+        
+        chave = self.cache.chave(arquivo_bytes, extensao, VERSAO_PARSER)
+        em_cache = self.cache.obter(chave)
+        
+        if em_cache is None:
+            return chave, None
+        return chave, (em_cache['questoes'], f"{em_cache['mensagem']} (recuperado do cache)")
+    
+    def _guardar_cache(self, chave: Optional[str], questoes: List[Dict], mensagem: str):
+        # Erros podem ser passageiros (ex.: dependência ausente) e não são guardados
+        if chave and not mensagem.startswith("❌"):
+            try:
+                self.cache.guardar(chave, {'questoes': questoes, 'mensagem': mensagem})
+            except OSError:
+                pass  # Sem espaço ou permissão: o resultado continua válido
+    
+    def _processar_por_formato(self, arquivo_bytes, extensao: str, ao_extrair_questao=None) -> Tuple[List[Dict], str]:
+        """Encaminha o arquivo para o extrator do seu formato"""
+        if extensao in EXTENSOES_PDF:
+            return self._processar_pdf(arquivo_bytes, ao_extrair_questao)
+        elif extensao in EXTENSOES_DOCX:
+            return self._processar_docx(arquivo_bytes, ao_extrair_questao)
+        else:
+            return self._processar_imagem(arquivo_bytes, extensao, ao_extrair_questao)
     
-    def _processar_pdf(self, arquivo_bytes) -> Tuple[List[Dict], str]:
+    def processar_lote(self, arquivos: List[Tuple[str, bytes]],
+                       ao_concluir_arquivo: Optional[Callable[[int, int, str, str], None]] = None) -> Dict:
+        """
+        Processa vários arquivos (PDF, DOCX, imagens e ZIPs com esses formatos)
+        
+        PDFs e DOCX são distribuídos entre processos e as imagens vão para o
+        serviço de OCR, todos ao mesmo tempo, de modo que o lote leva perto
+        do tempo do arquivo mais demorado. Arquivos já processados vêm do cache.
+        
+        Args:
+            arquivos: Lista de tuplas (nome_arquivo, conteudo_bytes)
+            ao_concluir_arquivo: Chamada a cada arquivo concluído com
+                                 (concluidos, total, nome_arquivo, mensagem)
+        
+        Returns:
+            Dict com "questoes" (todas, sem repetições, renumeradas e com o
+            "arquivo" de origem), "arquivos" (questões, mensagem e tempo de
+            cada arquivo), "total_arquivos" e "duplicadas"
+        """
+        self.relatorio_ocr = []
+        entradas = []
+        avisos = []
+        
+        for nome, conteudo in arquivos:
+            if Path(nome).suffix.lower() in EXTENSOES_ZIP:
+                try:
+                    extraidos, avisos_zip = expandir_zip(conteudo, nome)
+                except (zipfile.BadZipFile, ValueError) as e:
+                    avisos.append({"arquivo": nome, "questoes": 0, "mensagem": f"❌ ZIP inválido: {e}", "segundos": 0.0})
+                    continue
+                entradas.extend(extraidos)
+                avisos.extend({"arquivo": nome, "questoes": 0, "mensagem": aviso, "segundos": 0.0} for aviso in avisos_zip)
+            else:
+                entradas.append((nome, conteudo))
+        
+        total = len(entradas)
+        resultados = [None] * total
+        chaves = [None] * total
+        concluidos = 0
+        
+        def concluir(posicao, questoes, mensagem, segundos):
+            nonlocal concluidos
+            resultados[posicao] = (questoes, mensagem, segundos)
+            concluidos += 1
+            if ao_concluir_arquivo is not None:
+                ao_concluir_arquivo(concluidos, total, entradas[posicao][0], mensagem)
+        
+        documentos = []
+        imagens = []
+        for posicao, (nome, conteudo) in enumerate(entradas):
+            extensao = Path(nome).suffix.lower()
+            
+            if extensao not in EXTENSOES_PDF + EXTENSOES_DOCX + EXTENSOES_IMAGEM:
+                concluir(posicao, [], f"❌ Formato não suportado: {extensao}", 0.0)
+                continue
+            
+            chaves[posicao], em_cache = self._consultar_cache(conteudo, extensao)
+            if em_cache is not None:
+                concluir(posicao, *em_cache, 0.0)
+            elif extensao in EXTENSOES_IMAGEM:
+                imagens.append(posicao)
+            else:
+                documentos.append(posicao)
+        
+        if imagens and (Image is None or not ocr_disponivel()):
+            for posicao in imagens:
+                concluir(posicao, [], "❌ pytesseract não está instalado", 0.0)
+            imagens = []
+        
+        posicoes_imagens = set(imagens)
+        executor = None
+        futuros = {}
+        try:
+            if len(documentos) > 1 and self.max_workers > 1:
+                executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(documentos)))
+                for posicao in documentos:
+                    futuros[executor.submit(_processar_arquivo_isolado, *entradas[posicao])] = posicao
+            
+            for posicao in imagens:
+                futuros[obter_servico_ocr(self.max_workers).enviar(entradas[posicao][1])] = posicao
+            
+            # Sem pool (um só documento ou max_workers=1), no próprio processo
+            if executor is None:
+                for posicao in documentos:
+                    inicio = time.perf_counter()
+                    questoes, mensagem = self._processar_por_formato(
+                        entradas[posicao][1], Path(entradas[posicao][0]).suffix.lower()
+                    )
+                    self._guardar_cache(chaves[posicao], questoes, mensagem)
+                    concluir(posicao, questoes, mensagem, time.perf_counter() - inicio)
+            
+            for futuro in as_completed(futuros):
+                posicao = futuros[futuro]
+                nome = entradas[posicao][0]
+                
+                if posicao in posicoes_imagens:
+                    try:
+                        resultado = futuro.result()
+                    except Exception as e:
+                        resultado = {"erro": str(e)}
+                    questoes, mensagem = self._questoes_do_ocr(nome, resultado)
+                    segundos = resultado.get('latencia', 0.0)
+                else:
+                    try:
+                        questoes, mensagem, segundos = futuro.result()
+                    except Exception as e:
+                        questoes, mensagem, segundos = [], f"❌ Erro ao processar {nome}: {e}", 0.0
+                
+                self._guardar_cache(chaves[posicao], questoes, mensagem)
+                concluir(posicao, questoes, mensagem, segundos)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        
+        # Junta as questões na ordem dos arquivos, sem repetições
+        questoes_lote = []
+        vistas = set()
+        duplicadas = 0
+        
+        for (nome, _), (questoes, _, _) in zip(entradas, resultados):
+            for questao in questoes:
+                chave = _chave_questao(questao)
+                if chave in vistas:
+                    duplicadas += 1
+                    continue
+                vistas.add(chave)
+                questoes_lote.append({**questao, 'id': len(questoes_lote) + 1, 'arquivo': nome})
+        
+        relatorio = avisos + [
+            {"arquivo": nome, "questoes": len(questoes), "mensagem": mensagem, "segundos": segundos}
+            for (nome, _), (questoes, mensagem, segundos) in zip(entradas, resultados)
+        ]
+        
+        return {
+            "questoes": questoes_lote,
+            "arquivos": relatorio,
+            "total_arquivos": total,
+            "duplicadas": duplicadas
+        }
+    
+    def iterar_questoes_pdf(self, arquivo_bytes) -> Iterator[Dict]:
+        """Gera as questões de um PDF à medida que as páginas são extraídas"""
+        return self._extrair_questoes_incremental(
+            texto_pagina + "\n" for texto_pagina in self._iterar_paginas_pdf(arquivo_bytes)
+        )
+    
+    def _processar_pdf(self, arquivo_bytes, ao_extrair_questao=None) -> Tuple[List[Dict], str]:
         """Extrai texto de PDF"""
         if PyPDF2 is None:
             return [], "❌ PyPDF2 não está instalado"
         
         try:
-            pdf_file = io.BytesIO(arquivo_bytes)
-            reader = PyPDF2.PdfReader(pdf_file)
-            texto = ""
-            
-            for page in reader.pages:
-                texto += page.extract_text() + "\n"
+            questoes = self._coletar_questoes(self.iterar_questoes_pdf(arquivo_bytes), ao_extrair_questao)
             
-            questoes = self._extrair_questoes_do_texto(texto)
+            paginas_ocr = sum(1 for pagina in self.relatorio_paginas if pagina["ocr"])
             
-            if questoes:
+            if questoes and paginas_ocr:
+                return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) do PDF ({paginas_ocr} página(s) via OCR)"
+            elif questoes:
                 return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) do PDF"
             else:
                 return [], "⚠️ Nenhuma questão encontrada no PDF"
@@ -78,17 +674,97 @@ class ParserArquivos:
         except Exception as e:
             return [], f"❌ Erro ao processar PDF: {str(e)}"
     
-    def _processar_docx(self, arquivo_bytes) -> Tuple[List[Dict], str]:
-        """Extrai texto de DOCX"""
-        if Document is None:
-            return [], "❌ python-docx não está instalado"
+    def _iterar_paginas_pdf(self, arquivo_bytes) -> Iterator[str]:
+        """
+        Gera o texto de cada página do PDF, em ordem
+        
+        Documentos grandes são divididos em intervalos de páginas extraídos
+        em paralelo por um pool de processos. Páginas sem camada de texto
+        (digitalizadas) são rasterizadas e reconhecidas pelo serviço de OCR
+        enquanto as seguintes continuam sendo extraídas. O tempo de cada
+        página fica em `self.relatorio_paginas`.
+        """
+        self.relatorio_paginas = []
+        leitor = PyPDF2.PdfReader(io.BytesIO(arquivo_bytes))
+        total_paginas = len(leitor.pages)
+        workers = min(self.max_workers, total_paginas)
+        rasterizar = ocr_disponivel()
+        
+        if workers <= 1 or total_paginas < MIN_PAGINAS_PARALELO:
+            intervalos = (
+                _extrair_intervalo_paginas(indice, indice + 1, leitor, arquivo_bytes, rasterizar)
+                for indice in range(total_paginas)
+            )
+            executor = None
+        else:
+            tamanho = math.ceil(total_paginas / (workers * TAREFAS_POR_WORKER))
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_inicializar_worker_pdf,
+                initargs=(arquivo_bytes, rasterizar)
+            )
+            inicios = range(0, total_paginas, tamanho)
+            intervalos = _mapear_em_ordem(
+                executor,
+                _extrair_intervalo_paginas,
+                inicios,
+                [min(i + tamanho, total_paginas) for i in inicios],
+                janela=workers * 2
+            )
+        
+        # Páginas na ordem do documento; as digitalizadas aguardam o OCR
+        pendentes = deque()
         
         try:
-            docx_file = io.BytesIO(arquivo_bytes)
-            doc = Document(docx_file)
-            texto = "\n".join([p.text for p in doc.paragraphs])
+            for paginas in intervalos:
+                for indice, texto, segundos, imagem in paginas:
+                    entrada = {
+                        "pagina": indice + 1,
+                        "segundos": segundos,
+                        "caracteres": len(texto),
+                        "ocr": False
+                    }
+                    self.relatorio_paginas.append(entrada)
+                    futuro = obter_servico_ocr(self.max_workers).enviar(imagem) if imagem is not None else None
+                    pendentes.append((entrada, texto, futuro))
+                    
+                    while pendentes and (pendentes[0][2] is None or pendentes[0][2].done()):
+                        yield self._texto_pagina(*pendentes.popleft())
+            
+            while pendentes:
+                yield self._texto_pagina(*pendentes.popleft())
+        finally:
+            for _, _, futuro in pendentes:
+                if futuro is not None:
+                    futuro.cancel()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+    
+    @staticmethod
+    def _texto_pagina(entrada: Dict, texto: str, futuro) -> str:
+        """Texto final da página: o do OCR, se houver, ou o da camada de texto"""
+        if futuro is None:
+            return texto
+        
+        try:
+            resultado = futuro.result()
+        except Exception:
+            return texto  # Falha no OCR de uma página não interrompe o documento
+        
+        entrada.update(
+            ocr=True,
+            segundos=entrada["segundos"] + resultado["latencia"],
+            caracteres=len(resultado["texto"])
+        )
+        return resultado["texto"]
+    
+    def _processar_docx(self, arquivo_bytes, ao_extrair_questao=None) -> Tuple[List[Dict], str]:
+        """Extrai texto de DOCX, parágrafo a parágrafo"""
+        try:
+            paragrafos = iterar_paragrafos_docx(arquivo_bytes)
+            trechos = (("\n" if indice else "") + texto for indice, texto in enumerate(paragrafos))
             
-            questoes = self._extrair_questoes_do_texto(texto)
+            questoes = self._coletar_questoes(self._extrair_questoes_incremental(trechos), ao_extrair_questao)
             
             if questoes:
                 return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) do DOCX"
@@ -98,26 +774,22 @@ class ParserArquivos:
         except Exception as e:
             return [], f"❌ Erro ao processar DOCX: {str(e)}"
     
-    def _processar_imagem(self, arquivo_bytes, extensao) -> Tuple[List[Dict], str]:
-        """Usa OCR para extrair texto de imagem com pytesseract"""
+    def _processar_imagem(self, arquivo_bytes, extensao, ao_extrair_questao=None) -> Tuple[List[Dict], str]:
+        """Usa OCR para extrair texto de imagem no pool de workers do Tesseract"""
         
         if Image is None:
             return [], "❌ Pillow não está instalado"
         
-        if pytesseract is None:
+        if not ocr_disponivel():
             return [], "❌ pytesseract não está instalado"
         
         try:
-            import streamlit as st
-            
-            # Carregar imagem
-            imagem = Image.open(io.BytesIO(arquivo_bytes))
+            resultado = obter_servico_ocr(self.max_workers).reconhecer(arquivo_bytes)
+            self.relatorio_ocr = [{"imagem": 1, **self._metricas_ocr(resultado)}]
             
-            # Fazer OCR com pytesseract (muito mais rápido que easyocr)
-            with st.spinner("🔄 Processando imagem com OCR..."):
-                texto = pytesseract.image_to_string(imagem, lang='por')
-            
-            questoes = self._extrair_questoes_do_texto(texto)
+            questoes = self._coletar_questoes(
+                self._extrair_questoes_incremental([resultado['texto']]), ao_extrair_questao
+            )
             
             if questoes:
                 return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) da imagem via OCR"
@@ -127,213 +799,87 @@ class ParserArquivos:
         except Exception as e:
             return [], f"❌ Erro ao processar imagem: {str(e)}"
     
-    def _extrair_questoes_do_texto(self, texto: str) -> List[Dict]:
-        """
-        Extrai questões de múltipla escolha do texto
-        Procura por padrão: Questão X / Q X / Questão X:
-        Seguindo por alternativas A), B), C), D)
+    def processar_imagens(self, imagens: List[Tuple[str, bytes]]) -> List[Tuple[List[Dict], str]]:
         """
-        questoes = []
-        linhas = texto.split('\n')
+        Extrai questões de várias imagens, reconhecidas em paralelo
         
-        i = 0
-        numero_questao = 1
+        Imagens já processadas vêm do cache; as demais vão juntas para o
+        serviço de OCR. As métricas de cada imagem reconhecida (tempo de OCR,
+        espera na fila e latência) ficam em `self.relatorio_ocr`.
         
-        while i < len(linhas):
-            linha = linhas[i].strip()
+        Args:
+            imagens: Lista de tuplas (nome_arquivo, conteudo_bytes)
             
-            # Procurar por início de questão
-            if re.match(r'^(questão|q|q\.|questão)\s*[\d]+', linha, re.IGNORECASE):
-                questao_dict = self._extrair_questao_bloco(linhas, i)
-                
-                if questao_dict.get('alternativas'):
-                    questao_dict['id'] = numero_questao
-                    questoes.append(questao_dict)
-                    numero_questao += 1
-                    i += questao_dict.get('linhas_processadas', 1)
-                else:
-                    i += 1
-            else:
-                i += 1
+        Returns:
+            Lista, na ordem das imagens, de tuplas (lista_questoes, mensagem_status)
+        """
+        self.relatorio_ocr = []
         
-        return questoes
-    
-    def _extrair_questao_bloco(self, linhas: List[str], indice_inicio: int) -> Dict:
-        """Extrai uma questão completa começando em um índice"""
-        questao = {
-            'enunciado': '',
-            'alternativas': {},
-            'linhas_processadas': 0
-        }
+        if Image is None:
+            return [([], "❌ Pillow não está instalado") for _ in imagens]
         
-        i = indice_inicio
-        blocos_enunciado = []
-        alternativas_encontradas = {}
+        if not ocr_disponivel():
+            return [([], "❌ pytesseract não está instalado") for _ in imagens]
         
-        # Coletar enunciado
-        while i < len(linhas):
-            linha = linhas[i].strip()
-            
-            # Verificar se é uma alternativa
-            if re.match(r'^[a-dA-D]\)', linha):
-                # Encontrou primeira alternativa
-                break
-            
-            if linha and not re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
-                blocos_enunciado.append(linha)
-            
-            i += 1
+        saida = [None] * len(imagens)
+        chaves = [None] * len(imagens)
+        pendentes = []
         
-        questao['enunciado'] = ' '.join(blocos_enunciado)
+        for posicao, (nome, conteudo) in enumerate(imagens):
+            chaves[posicao], saida[posicao] = self._consultar_cache(conteudo, Path(nome).suffix.lower())
+            if saida[posicao] is None:
+                pendentes.append(posicao)
         
-        # Coletar alternativas
-        while i < len(linhas):
-            linha = linhas[i].strip()
-            
-            # Padrão: A) texto, B) texto, etc
-            match = re.match(r'^([a-dA-D])\)\s*(.*)', linha)
-            if match:
-                letra = match.group(1).upper()
-                texto = match.group(2)
-                alternativas_encontradas[letra] = texto
-                i += 1
-            elif re.match(r'^[a-dA-D]\)', linha):
-                i += 1
-            elif linha and re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
-                # Encontrou próxima questão
-                break
-            elif not linha:
-                # Linha vazia, continua
-                i += 1
-            else:
-                # Pode ser continuação de alternativa anterior
-                if alternativas_encontradas:
-                    ultima_letra = list(alternativas_encontradas.keys())[-1]
-                    alternativas_encontradas[ultima_letra] += ' ' + linha
-                i += 1
+        resultados = obter_servico_ocr(self.max_workers).reconhecer_lote([imagens[p][1] for p in pendentes])
         
-        questao['alternativas'] = alternativas_encontradas
-        questao['linhas_processadas'] = i - indice_inicio
+        for posicao, resultado in zip(pendentes, resultados):
+            saida[posicao] = self._questoes_do_ocr(imagens[posicao][0], resultado)
+            self._guardar_cache(chaves[posicao], *saida[posicao])
         
-        return questao if alternativas_encontradas else {}
-
-
-def formatar_questoes_extraidas(questoes: List[Dict]) -> List[Dict]:
-    """
-    Formata questões extraídas para o formato esperado pelo analisador
-    Sem resposta_correta nem descritor (O usuário fornecerá)
-    """
-    formatadas = []
-    
-    for q in questoes:
-        formatada = {
-            'id': q.get('id', len(formatadas) + 1),
-            'enunciado': q.get('enunciado', ''),
-            'alternativas': q.get('alternativas', {}),
-            'descritor': None,  # Será definido pelo usuário
-            'resposta_usuario': None,  # Será definida pelo usuário
-            'tipo_texto': 'Extraído de arquivo'
-        }
-        formatadas.append(formatada)
-    
-    return formatadas
+        return saida
     
-    def processar_arquivo(self, arquivo_bytes, nome_arquivo: str) -> Tuple[List[Dict], str]:
-        """
-        Processa arquivo e extrai questões
+    def _questoes_do_ocr(self, nome: str, resultado: Dict) -> Tuple[List[Dict], str]:
+        """Extrai as questões do texto reconhecido de uma imagem"""
+        if 'erro' in resultado:
+            return [], f"❌ Erro ao processar imagem {nome}: {resultado['erro']}"
         
-        Args:
-            arquivo_bytes: Conteúdo do arquivo em bytes
-            nome_arquivo: Nome do arquivo
-            
-        Returns:
-            Tupla (lista_questoes, mensagem_status)
-        """
-        extensao = Path(nome_arquivo).suffix.lower()
+        self.relatorio_ocr.append({"imagem": nome, **self._metricas_ocr(resultado)})
+        questoes = self._extrair_questoes_do_texto(resultado['texto'])
         
-        if extensao == '.pdf':
-            return self._processar_pdf(arquivo_bytes)
-        elif extensao == '.docx':
-            return self._processar_docx(arquivo_bytes)
-        elif extensao in ['.png', '.jpg', '.jpeg', '.bmp', '.gif']:
-            return self._processar_imagem(arquivo_bytes, extensao)
+        if questoes:
+            return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) da imagem via OCR"
         else:
-            return [], f"❌ Formato não suportado: {extensao}"
+            return [], "⚠️ Nenhuma questão encontrada na imagem"
     
-    def _processar_pdf(self, arquivo_bytes) -> Tuple[List[Dict], str]:
-        """Extrai texto de PDF"""
-        if PyPDF2 is None:
-            return [], "❌ PyPDF2 não está instalado"
-        
-        try:
-            pdf_file = io.BytesIO(arquivo_bytes)
-            leitor = PyPDF2.PdfReader(pdf_file)
-            texto = ""
-            
-            for pagina in leitor.pages:
-                texto += pagina.extract_text() + "\n"
-            
-            questoes = self._extrair_questoes_do_texto(texto)
-            
-            if questoes:
-                return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) do PDF"
-            else:
-                return [], "⚠️ Nenhuma questão encontrada no PDF"
-        
-        except Exception as e:
-            return [], f"❌ Erro ao processar PDF: {str(e)}"
+    @staticmethod
+    def _metricas_ocr(resultado: Dict) -> Dict:
+        return {
+            "segundos_preprocessamento": resultado['segundos_preprocessamento'],
+            "segundos_ocr": resultado['segundos_ocr'],
+            "espera_fila": resultado['espera_fila'],
+            "latencia": resultado['latencia'],
+            "caracteres": len(resultado['texto'])
+        }
     
-    def _processar_docx(self, arquivo_bytes) -> Tuple[List[Dict], str]:
-        """Extrai texto de DOCX"""
-        if Document is None:
-            return [], "❌ python-docx não está instalado"
+    def _coletar_questoes(self, questoes: Iterable[Dict], ao_extrair_questao=None) -> List[Dict]:
+        """Consome o gerador de questões, avisando cada uma ao callback"""
+        coletadas = []
         
-        try:
-            docx_file = io.BytesIO(arquivo_bytes)
-            doc = Document(docx_file)
-            texto = "\n".join([p.text for p in doc.paragraphs])
-            
-            questoes = self._extrair_questoes_do_texto(texto)
-            
-            if questoes:
-                return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) do DOCX"
-            else:
-                return [], "⚠️ Nenhuma questão encontrada no DOCX"
+        for questao in questoes:
+            coletadas.append(questao)
+            if ao_extrair_questao is not None:
+                ao_extrair_questao(questao)
         
-        except Exception as e:
-            return [], f"❌ Erro ao processar DOCX: {str(e)}"
+        return coletadas
     
-    def _processar_imagem(self, arquivo_bytes, extensao) -> Tuple[List[Dict], str]:
-        """Usa OCR para extrair texto de imagem"""
+    def _extrair_questoes_incremental(self, trechos: Iterable[str]) -> Iterator[Dict]:
+        """Gera as questões à medida que os trechos de texto chegam"""
+        extrator = ExtratorQuestoesIncremental()
         
-        if Image is None:
-            return [], "❌ Pillow não está instalado"
+        for trecho in trechos:
+            yield from extrator.alimentar(trecho)
         
-        try:
-            import streamlit as st
-            
-            # Carregar modelo OCR sob demanda
-            with st.spinner("🔄 Inicializando OCR (primeira vez pode demorar ~1-2 min)..."):
-                leitor_ocr = self._carregar_ocr()
-            
-            # Carregar imagem
-            imagem = Image.open(io.BytesIO(arquivo_bytes))
-            
-            # Fazer OCR
-            with st.spinner("🔄 Processando imagem com OCR..."):
-                resultado = leitor_ocr.readtext(imagem, detail=0)
-            
-            texto = "\n".join(resultado)
-            
-            questoes = self._extrair_questoes_do_texto(texto)
-            
-            if questoes:
-                return questoes, f"✅ {len(questoes)} questão(ões) extraída(s) da imagem via OCR"
-            else:
-                return [], "⚠️ Nenhuma questão encontrada na imagem"
-        
-        except Exception as e:
-            return [], f"❌ Erro ao processar imagem: {str(e)}"
+        yield from extrator.finalizar()
     
     def _extrair_questoes_do_texto(self, texto: str) -> List[Dict]:
         """
@@ -341,89 +887,56 @@ def formatar_questoes_extraidas(questoes: List[Dict]) -> List[Dict]:
         Procura por padrão: Questão X / Q X / Questão X:
         Seguindo por alternativas A), B), C), D)
         """
-        questoes = []
-        linhas = texto.split('\n')
-        
-        i = 0
-        numero_questao = 1
-        
-        while i < len(linhas):
-            linha = linhas[i].strip()
-            
-            # Procurar por início de questão
-            if re.match(r'^(questão|q|q\.|questão)\s*[\d]+', linha, re.IGNORECASE):
-                questao_dict = self._extrair_questao_bloco(linhas, i)
-                
-                if questao_dict.get('alternativas'):
-                    questao_dict['id'] = numero_questao
-                    questoes.append(questao_dict)
-                    numero_questao += 1
-                    i += questao_dict.get('linhas_processadas', 1)
-                else:
-                    i += 1
-            else:
-                i += 1
-        
-        return questoes
+        return list(self._extrair_questoes_incremental([texto]))
+
+
+def extrair_questoes_arquivos(arquivos: List[Tuple[str, bytes]],
+                              reportar: Optional[Callable[[Optional[float], Optional[str]], None]] = None,
+                              max_workers: Optional[int] = None) -> Dict:
+    """
+    Extrai as questões de um ou mais arquivos enviados, pronto para a página
     
-    def _extrair_questao_bloco(self, linhas: List[str], indice_inicio: int) -> Dict:
-        """Extrai uma questão completa começando em um índice"""
-        questao = {
-            'enunciado': '',
-            'alternativas': {},
-            'linhas_processadas': 0
-        }
-        
-        i = indice_inicio
-        blocos_enunciado = []
-        alternativas_encontradas = {}
-        
-        # Coletar enunciado
-        while i < len(linhas):
-            linha = linhas[i].strip()
-            
-            # Verificar se é uma alternativa
-            if re.match(r'^[a-dA-D]\)', linha):
-                # Encontrou primeira alternativa
-                break
-            
-            if linha and not re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
-                blocos_enunciado.append(linha)
-            
-            i += 1
-        
-        questao['enunciado'] = ' '.join(blocos_enunciado)
-        
-        # Coletar alternativas
-        while i < len(linhas):
-            linha = linhas[i].strip()
-            
-            # Padrão: A) texto, B) texto, etc
-            match = re.match(r'^([a-dA-D])\)\s*(.*)', linha)
-            if match:
-                letra = match.group(1).upper()
-                texto = match.group(2)
-                alternativas_encontradas[letra] = texto
-                i += 1
-            elif re.match(r'^[a-dA-D]\)', linha):
-                i += 1
-            elif linha and re.match(r'^(questão|q|q\.)', linha, re.IGNORECASE):
-                # Encontrou próxima questão
-                break
-            elif not linha:
-                # Linha vazia, continua
-                i += 1
-            else:
-                # Pode ser continuação de alternativa anterior
-                if alternativas_encontradas:
-                    ultima_letra = list(alternativas_encontradas.keys())[-1]
-                    alternativas_encontradas[ultima_letra] += ' ' + linha
-                i += 1
-        
-        questao['alternativas'] = alternativas_encontradas
-        questao['linhas_processadas'] = i - indice_inicio
-        
-        return questao if alternativas_encontradas else {}
+    Um único arquivo (não ZIP) usa `processar_arquivo`; vários arquivos ou
+    ZIPs usam `processar_lote`. Feito para rodar na fila de tarefas, que
+    passa `reportar(progresso, mensagem)`. `max_workers` é repassado ao
+    ParserArquivos (1 quando a chamada já roda em um pool de processos).
+    
+    Returns:
+        Dict com "questoes" (já formatadas), "mensagem", "relatorio_paginas"
+        e "relatorio_lote"
+    """
+    reportar = reportar or (lambda progresso=None, mensagem=None: None)
+    parser = ParserArquivos(max_workers)
+    
+    if len(arquivos) == 1 and Path(arquivos[0][0]).suffix.lower() not in EXTENSOES_ZIP:
+        nome, conteudo = arquivos[0]
+        questoes, mensagem = parser.processar_arquivo(
+            conteudo,
+            nome,
+            lambda questao: reportar(None, f"🔄 {questao['id']} questão(ões) extraída(s)...")
+        )
+        relatorio_lote = []
+    else:
+        resultado_lote = parser.processar_lote(
+            arquivos,
+            lambda concluidos, total, nome, _: reportar(concluidos / total, f"{concluidos}/{total} arquivo(s) — {nome}")
+        )
+        questoes = resultado_lote['questoes']
+        relatorio_lote = resultado_lote['arquivos']
+        
+        if questoes:
+            mensagem = f"✅ {len(questoes)} questão(ões) extraída(s) de {resultado_lote['total_arquivos']} arquivo(s)"
+            if resultado_lote['duplicadas']:
+                mensagem += f" ({resultado_lote['duplicadas']} repetida(s) removida(s))"
+        else:
+            mensagem = "⚠️ Nenhuma questão encontrada nos arquivos"
+    
+    return {
+        "questoes": formatar_questoes_extraidas(questoes),
+        "mensagem": mensagem,
+        "relatorio_paginas": parser.relatorio_paginas if not relatorio_lote else [],
+        "relatorio_lote": relatorio_lote
+    }
 
 
 def formatar_questoes_extraidas(questoes: List[Dict]) -> List[Dict]:
@@ -440,7 +953,8 @@ def formatar_questoes_extraidas(questoes: List[Dict]) -> List[Dict]:
             'alternativas': q.get('alternativas', {}),
             'descritor': None,  # Será definido pelo usuário
             'resposta_usuario': None,  # Será definida pelo usuário
-            'tipo_texto': 'Extraído de arquivo'
+            'tipo_texto': 'Extraído de arquivo',
+            'arquivo': q.get('arquivo')  # Origem, em uploads de vários arquivos
         }
         formatadas.append(formatada)
     
@@ -0,0 +1,181 @@
+"""
+Serviço de OCR com Workers Persistentes
+Mantém processos com o Tesseract carregado e reconhece lotes de imagens em paralelo
+"""
+
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from src.preprocessamento import mesclar_config, preprocessar_imagem
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+IDIOMA_PADRAO = "por"
+
+# Imagens aguardando ou em reconhecimento por worker; acima disso `enviar` bloqueia
+IMAGENS_NA_FILA_POR_WORKER = 4
+
+# Motor do Tesseract de cada processo do pool (tesserocr), criado uma vez
+_motor_worker = None
+
+# Configuração de pré-processamento de cada processo do pool
+_config_worker = None
+
+
+def ocr_disponivel() -> bool:
+    """Indica se há algum backend de OCR instalado"""
+    return Image is not None and (tesserocr is not None or pytesseract is not None)
+
+
+def _inicializar_worker_ocr(idioma: str, config_preprocessamento: Dict):
+    """
+    Prepara o processo do pool: uma thread por Tesseract (o paralelismo vem
+    dos processos) e, com tesserocr, o motor já carregado com o idioma
+    """
+    global _motor_worker, _config_worker
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    _config_worker = config_preprocessamento
+
+    if tesserocr is not None:
+        try:
+            _motor_worker = tesserocr.PyTessBaseAPI(lang=idioma)
+        except RuntimeError:
+            # Dados do idioma fora do caminho do tesserocr: segue com o pytesseract
+            if pytesseract is None:
+                raise
+
+
+def _reconhecer_imagem(imagem_bytes: bytes, idioma: str, enviado_em: float) -> Dict:
+    """Executa o OCR de uma imagem no processo do pool"""
+    espera = max(0.0, time.time() - enviado_em)
+    inicio = time.perf_counter()
+    imagem, info = preprocessar_imagem(Image.open(io.BytesIO(imagem_bytes)), _config_worker)
+    inicio_ocr = time.perf_counter()
+
+    if _motor_worker is not None:
+        _motor_worker.SetImage(imagem)
+        texto = _motor_worker.GetUTF8Text()
+    else:
+        texto = pytesseract.image_to_string(imagem, lang=idioma)
+
+    fim = time.perf_counter()
+    return {
+        "texto": texto,
+        "segundos_preprocessamento": info["segundos_preprocessamento"],
+        "segundos_ocr": fim - inicio_ocr,
+        "espera_fila": espera,
+        "latencia": espera + fim - inicio,
+        "angulo": info["angulo"]
+    }
+
+
+class ServicoOCR:
+    """
+    Pool de processos com Tesseract aquecido
+
+    Com tesserocr instalado, cada worker mantém um motor com o idioma já
+    carregado entre imagens; sem ele, cada worker chama o pytesseract. Antes
+    do OCR, as imagens passam por `preprocessar_imagem` com a configuração
+    do serviço (parcial; o restante vem de `CONFIG_PADRAO_PREPROCESSAMENTO`). O
+    número de imagens em andamento é limitado para não acumular arquivos na
+    memória quando chegam mais imagens do que os workers conseguem tratar.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, tamanho_fila: Optional[int] = None,
+                 idioma: str = IDIOMA_PADRAO, preprocessamento: Optional[Dict] = None):
+        if not ocr_disponivel():
+            raise RuntimeError("Nenhum backend de OCR instalado (tesserocr ou pytesseract)")
+
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.idioma = idioma
+        self.preprocessamento = mesclar_config(preprocessamento)
+        self._vagas = threading.BoundedSemaphore(tamanho_fila or self.n_workers * IMAGENS_NA_FILA_POR_WORKER)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            initializer=_inicializar_worker_ocr,
+            initargs=(idioma, self.preprocessamento)
+        )
+
+    def enviar(self, imagem_bytes: bytes) -> Future:
+        """
+        Envia uma imagem para reconhecimento; bloqueia se a fila estiver cheia
+
+        Returns:
+            Future com dict {"texto", "segundos_preprocessamento", "segundos_ocr",
+            "espera_fila", "latencia", "angulo"}
+        """
+        self._vagas.acquire()
+
+        try:
+            futuro = self._executor.submit(_reconhecer_imagem, imagem_bytes, self.idioma, time.time())
+        except BaseException:
+            self._vagas.release()
+            raise
+
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return futuro
+
+    def reconhecer(self, imagem_bytes: bytes) -> Dict:
+        """Reconhece uma imagem e aguarda o resultado"""
+        return self.enviar(imagem_bytes).result()
+
+    def reconhecer_lote(self, imagens: Sequence[bytes]) -> List[Dict]:
+        """
+        Reconhece um lote de imagens em paralelo
+
+        Returns:
+            Lista, na ordem das imagens, dos dicts de `enviar` ou {"erro"}
+            para imagens que falharam
+        """
+        # As vagas da fila são liberadas quando cada imagem termina, então o
+        # envio avança sozinho à medida que os workers concluem
+        futuros = [self.enviar(imagem) for imagem in imagens]
+
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append({"erro": str(e)})
+
+        return resultados
+
+    def encerrar(self):
+        """Encerra os processos do pool"""
+        self._executor.shutdown(cancel_futures=True)
+
+
+_servico_padrao = None
+_trava_servico = threading.Lock()
+
+
+def obter_servico_ocr(n_workers: Optional[int] = None) -> ServicoOCR:
+    """
+    Serviço de OCR compartilhado pelo processo, criado no primeiro uso
+
+    `n_workers` só vale na criação (padrão: número de CPUs).
+    """
+    global _servico_padrao
+
+    with _trava_servico:
+        if _servico_padrao is None:
+            _servico_padrao = ServicoOCR(n_workers)
+
+    return _servico_padrao
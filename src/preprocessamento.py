@@ -0,0 +1,172 @@
+"""
+Pré-processamento de Imagens para OCR
+Reduz, binariza, endireita e recorta fotos de provas antes do Tesseract
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+# Altura de uma folha A4 em polegadas, usada para estimar a resolução de
+# fotos sem DPI registrado (assume-se que a página ocupa a foto inteira)
+ALTURA_PAGINA_POLEGADAS = 11.69
+
+# DPI registrado abaixo disso é tratado como ausente: câmeras de celular
+# gravam o padrão de 72 DPI do EXIF/JFIF, que não diz nada sobre a página
+DPI_MINIMO_CONFIAVEL = 150
+
+CONFIG_PADRAO_PREPROCESSAMENTO = {
+    "ativo": True,
+    # Resolução alvo; imagens acima dela são reduzidas
+    "dpi_alvo": 300,
+    "binarizar": True,
+    "endireitar": True,
+    # Maior inclinação procurada e passo da busca, em graus
+    "angulo_maximo": 5.0,
+    "passo_angulo": 0.5,
+    # Lado da miniatura usada para estimar a inclinação
+    "lado_estimativa_angulo": 1000,
+    "recortar": True,
+    # Margem mantida ao redor do texto, em pixels
+    "margem_recorte": 20
+}
+
+
+def mesclar_config(config: Optional[Dict] = None) -> Dict:
+    """Completa uma configuração parcial com os valores padrão"""
+    return {**CONFIG_PADRAO_PREPROCESSAMENTO, **(config or {})}
+
+
+def reduzir_para_dpi(imagem, dpi_alvo: float):
+    """
+    Reduz a imagem para a resolução alvo (nunca amplia)
+
+    Sem DPI registrado, ou com um valor implausível para uma digitalização
+    (ver DPI_MINIMO_CONFIAVEL), a resolução é estimada pela altura da página.
+    """
+    dpi = imagem.info.get("dpi")
+    if dpi and dpi[0] and float(dpi[0]) >= DPI_MINIMO_CONFIAVEL:
+        escala = dpi_alvo / float(dpi[0])
+    else:
+        escala = dpi_alvo * ALTURA_PAGINA_POLEGADAS / max(imagem.size)
+
+    if escala >= 1:
+        return imagem
+
+    tamanho = (max(1, round(imagem.width * escala)), max(1, round(imagem.height * escala)))
+    return imagem.resize(tamanho, Image.LANCZOS)
+
+
+def limiar_otsu(pixels: np.ndarray) -> int:
+    """Limiar de Otsu de uma imagem em tons de cinza (uint8)"""
+    histograma = np.bincount(pixels.ravel(), minlength=256).astype(np.float64)
+    niveis = np.arange(256, dtype=np.float64)
+
+    peso_fundo = np.cumsum(histograma)
+    peso_frente = peso_fundo[-1] - peso_fundo
+    soma_fundo = np.cumsum(histograma * niveis)
+    media_fundo = np.divide(soma_fundo, peso_fundo, out=np.zeros(256), where=peso_fundo > 0)
+    media_frente = np.divide(soma_fundo[-1] - soma_fundo, peso_frente, out=np.zeros(256), where=peso_frente > 0)
+
+    variancia_entre = peso_fundo * peso_frente * (media_fundo - media_frente) ** 2
+    return int(np.argmax(variancia_entre))
+
+
+def estimar_inclinacao(imagem, angulo_maximo: float, passo: float, lado: int) -> float:
+    """
+    Estima a inclinação do texto pelo perfil de projeção horizontal
+
+    Com as linhas alinhadas à horizontal, a soma de pixels escuros por linha
+    alterna entre picos (texto) e vales (entrelinhas), o que maximiza a
+    variação entre linhas vizinhas. Retorna o ângulo que endireita a imagem.
+    """
+    miniatura = imagem.copy()
+    miniatura.thumbnail((lado, lado))
+    pixels = np.asarray(miniatura)
+    tinta = Image.fromarray(((pixels < limiar_otsu(pixels)) * 255).astype(np.uint8))
+
+    melhor_angulo, melhor_pontuacao = 0.0, -1.0
+    for angulo in np.arange(-angulo_maximo, angulo_maximo + passo / 2, passo):
+        perfil = np.asarray(tinta.rotate(angulo, resample=Image.NEAREST), dtype=np.float64).sum(axis=1)
+        pontuacao = float(np.sum(np.diff(perfil) ** 2))
+        if pontuacao > melhor_pontuacao:
+            melhor_angulo, melhor_pontuacao = float(angulo), pontuacao
+
+    return melhor_angulo
+
+
+def caixa_texto(pixels: np.ndarray, margem: int) -> Optional[Tuple[int, int, int, int]]:
+    """Caixa (esquerda, topo, direita, base) dos pixels escuros, com margem"""
+    linhas = np.flatnonzero((pixels < 128).any(axis=1))
+    colunas = np.flatnonzero((pixels < 128).any(axis=0))
+
+    if not len(linhas):
+        return None
+
+    altura, largura = pixels.shape
+    return (
+        max(0, colunas[0] - margem),
+        max(0, linhas[0] - margem),
+        min(largura, colunas[-1] + 1 + margem),
+        min(altura, linhas[-1] + 1 + margem)
+    )
+
+
+def preprocessar_imagem(imagem, config: Optional[Dict] = None) -> Tuple[object, Dict]:
+    """
+    Prepara uma imagem para o OCR
+
+    Etapas: orientação EXIF (fotos de celular), tons de cinza, redução
+    para o DPI alvo, correção de inclinação, binarização (Otsu) e recorte
+    na região do texto. Cada etapa pode ser desligada na configuração (ver
+    `CONFIG_PADRAO_PREPROCESSAMENTO`).
+
+    Args:
+        imagem: Imagem PIL
+        config: Configuração parcial; chaves ausentes usam o padrão
+
+    Returns:
+        Tupla (imagem_processada, info) com tamanho original e final,
+        ângulo corrigido e tempo gasto
+    """
+    config = mesclar_config(config)
+    inicio = time.perf_counter()
+    info = {"tamanho_original": imagem.size, "angulo": 0.0}
+
+    if not config["ativo"]:
+        info.update(tamanho_final=imagem.size, segundos_preprocessamento=0.0)
+        return imagem, info
+
+    # Converter antes de reduzir: o filtro trabalha em um canal, não em três
+    imagem = ImageOps.exif_transpose(imagem).convert("L")
+    imagem = reduzir_para_dpi(imagem, config["dpi_alvo"])
+
+    if config["endireitar"]:
+        angulo = estimar_inclinacao(
+            imagem, config["angulo_maximo"], config["passo_angulo"], config["lado_estimativa_angulo"]
+        )
+        if angulo:
+            imagem = imagem.rotate(angulo, resample=Image.BICUBIC, expand=True, fillcolor=255)
+        info["angulo"] = angulo
+
+    pixels = np.asarray(imagem)
+
+    if config["binarizar"]:
+        pixels = np.where(pixels < limiar_otsu(pixels), 0, 255).astype(np.uint8)
+
+    if config["recortar"]:
+        caixa = caixa_texto(pixels, config["margem_recorte"])
+        if caixa is not None:
+            esquerda, topo, direita, base = caixa
+            pixels = pixels[topo:base, esquerda:direita]
+
+    imagem = Image.fromarray(pixels)
+    info.update(tamanho_final=imagem.size, segundos_preprocessamento=time.perf_counter() - inicio)
+    return imagem, info
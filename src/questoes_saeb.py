@@ -3,6 +3,8 @@ Banco de Questões SAEB - Português 9º Ano
 Questões de múltipla escolha com descritores
 """
 
+import os
+
 QUESTOES_SAEB = [
     {
         "id": 1,
@@ -220,21 +222,154 @@ Qual par de conectivos melhor completa as lacunas?""",
     }
 ]
 
+class BancoQuestoes:
+    """
+    Banco de questões com índices por id, descritor e tipo de texto
+    
+    Os índices são montados uma única vez, no primeiro acesso, e descartados
+    sempre que uma questão é adicionada, editada ou removida. Quem alterar a
+    lista de questões diretamente deve chamar `invalidar()`.
+    """
+    
+    def __init__(self, questoes=None):
+        self._questoes = questoes if questoes is not None else []
+        self._indices = None
+        self.versao = 0
+    
+    def _obter_indices(self):
+        """Retorna os índices, montando-os se necessário"""
+        if self._indices is None:
+            por_id = {}
+            por_descritor = {}
+            por_tipo_texto = {}
+            
+            for q in self._questoes:
+                # Mantém a primeira ocorrência, como na busca linear
+                por_id.setdefault(q["id"], q)
+                por_descritor.setdefault(q["descritor"], []).append(q)
+                por_tipo_texto.setdefault(q.get("tipo_texto"), []).append(q)
+            
+            self._indices = {
+                "id": por_id,
+                "descritor": por_descritor,
+                "tipo_texto": por_tipo_texto,
+                "descritores_unicos": sorted(por_descritor)
+            }
+        
+        return self._indices
+    
+    def invalidar(self):
+        """Descarta os índices após alterações no banco"""
+        self._indices = None
+        self.versao += 1
+    
+    def obter_questao(self, id_questao):
+        """Retorna uma questão específica"""
+        return self._obter_indices()["id"].get(id_questao)
+    
+    def obter_questoes_por_descritor(self, descritor):
+        """Retorna questões de um descritor específico"""
+        return list(self._obter_indices()["descritor"].get(descritor, []))
+    
+    def obter_questoes_por_tipo_texto(self, tipo_texto):
+        """Retorna questões de um tipo de texto específico"""
+        return list(self._obter_indices()["tipo_texto"].get(tipo_texto, []))
+    
+    def obter_descritores_unicos(self):
+        """Retorna lista de descritores únicos"""
+        return list(self._obter_indices()["descritores_unicos"])
+    
+    def listar_todas(self):
+        """Lista todas as questões"""
+        return self._questoes
+    
+    def adicionar_questao(self, questao):
+        """Adiciona uma questão ao banco"""
+        self._questoes.append(questao)
+        self.invalidar()
+    
+    def atualizar_questao(self, id_questao, **campos):
+        """Atualiza campos de uma questão existente; retorna a questão ou None"""
+        questao = self.obter_questao(id_questao)
+        
+        if questao is None:
+            return None
+        
+        questao.update(campos)
+        self.invalidar()
+        return questao
+    
+    def remover_questao(self, id_questao):
+        """Remove uma questão do banco; retorna True se ela existia"""
+        questao = self.obter_questao(id_questao)
+        
+        if questao is None:
+            return False
+        
+        self._questoes.remove(questao)
+        self.invalidar()
+        return True
+
+def _criar_banco_padrao():
+    """
+    Cria o banco usado pelas funções do módulo
+    
+    Se a variável de ambiente SAEB_BANCO_SQLITE apontar para um arquivo, as
+    questões são servidas pelo SQLite (criado com QUESTOES_SAEB se vazio).
+    """
+    caminho_sqlite = os.environ.get("SAEB_BANCO_SQLITE")
+    
+    if caminho_sqlite:
+        from src.banco_sqlite import abrir_banco_sqlite
+        return abrir_banco_sqlite(caminho_sqlite, QUESTOES_SAEB)
+    
+    return BancoQuestoes(QUESTOES_SAEB)
+
+_banco = _criar_banco_padrao()
+
+# Incrementado a cada troca de banco, para distinguir bancos com a mesma versão
+_geracao_banco = 0
+
+def obter_banco():
+    """Retorna o banco de questões em uso"""
+    return _banco
+
+def definir_banco(banco):
+    """
+    Troca o banco usado pelas funções do módulo
+    
+    Aceita qualquer objeto com a interface de BancoQuestoes, como
+    `BancoQuestoesSQLite`.
+    """
+    global _banco, _geracao_banco
+    _banco = banco
+    _geracao_banco += 1
+
+def obter_versao_banco():
+    """
+    Identifica o conteúdo do banco em uso
+    
+    Muda quando o banco é trocado ou alterado; serve de chave para caches
+    de dados derivados das questões.
+    """
+    return (_geracao_banco, _banco.versao)
+
 def obter_questao(id_questao):
     """Retorna uma questão específica"""
-    for q in QUESTOES_SAEB:
-        if q["id"] == id_questao:
-            return q
-    return None
+    return _banco.obter_questao(id_questao)
 
 def obter_questoes_por_descritor(descritor):
     """Retorna questões de um descritor específico"""
-    return [q for q in QUESTOES_SAEB if q["descritor"] == descritor]
+    return _banco.obter_questoes_por_descritor(descritor)
+
+def obter_questoes_por_tipo_texto(tipo_texto):
+    """Retorna questões de um tipo de texto específico"""
+    return _banco.obter_questoes_por_tipo_texto(tipo_texto)
 
 def listar_todas_questoes():
     """Lista todas as questões"""
-    return QUESTOES_SAEB
+    return _banco.listar_todas()
 
 def obter_descritores_unicos():
     """Retorna lista de descritores únicos"""
-    return sorted(list(set(q["descritor"] for q in QUESTOES_SAEB)))
+    return _banco.obter_descritores_unicos()
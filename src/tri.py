@@ -0,0 +1,377 @@
+"""
+Módulo de Teoria de Resposta ao Item (TRI) - Modelo Logístico de 3 Parâmetros
+Calibra itens (a, b, c) e estima a proficiência (θ) dos alunos
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.correcao_vetorizada import corrigir_matriz, montar_gabarito
+
+# Constante de escala que aproxima a logística da ogiva normal
+D = 1.7
+
+N_PONTOS_QUADRATURA = 41
+LIMITES_THETA = (-4.0, 4.0)
+
+# Limites dos parâmetros durante a calibração
+LIMITES_A = (0.2, 4.0)
+LIMITES_B = (-5.0, 5.0)
+LIMITES_C = (0.0, 0.5)
+
+# Prioris dos parâmetros: log(a) ~ N(0, 0.5²), b ~ N(0, 2²), c ~ Beta(5, 17)
+DESVIO_LOG_A = 0.5
+DESVIO_B = 2.0
+ALFA_C, BETA_C = 5.0, 17.0
+
+# Escala SAEB de Língua Portuguesa (média 250, desvio 50 na população de referência)
+MEDIA_ESCALA_SAEB = 250.0
+DESVIO_ESCALA_SAEB = 50.0
+
+TAMANHO_BLOCO_PADRAO = 50000
+
+_EPSILON = 1e-9
+
+
+def probabilidade_3pl(theta, a, b, c):
+    """Probabilidade de acerto no modelo logístico de 3 parâmetros"""
+    return c + (1 - c) / (1 + np.exp(-D * a * (theta - b)))
+
+
+def montar_tabela_quadratura(parametros: Optional[Dict] = None,
+                             n_pontos: int = N_PONTOS_QUADRATURA) -> Dict:
+    """
+    Pré-calcula os pontos de quadratura e, se houver parâmetros, as tabelas
+    log P e log (1 - P) de cada item em cada ponto
+
+    Args:
+        parametros: Dict com vetores "a", "b" e "c" (opcional)
+        n_pontos: Número de pontos de quadratura em LIMITES_THETA
+
+    Returns:
+        Dict com "theta", "pesos" (priori normal padrão) e, se houver
+        parâmetros, "log_p" e "log_q" (pontos × itens)
+    """
+    theta = np.linspace(LIMITES_THETA[0], LIMITES_THETA[1], n_pontos)
+    pesos = np.exp(-0.5 * theta ** 2)
+    pesos /= pesos.sum()
+
+    tabela = {"theta": theta, "pesos": pesos, "log_pesos": np.log(pesos)}
+
+    if parametros is not None:
+        p = probabilidade_3pl(
+            theta[:, None], parametros["a"][None, :], parametros["b"][None, :], parametros["c"][None, :]
+        )
+        p = np.clip(p, _EPSILON, 1 - _EPSILON)
+        tabela["log_p"] = np.log(p)
+        tabela["log_q"] = np.log1p(-p)
+
+    return tabela
+
+
+def _log_verossimilhanca(acertos, respondidas, tabela):
+    """Log-verossimilhança de cada aluno em cada ponto de quadratura (alunos × pontos)"""
+    x = acertos.astype(np.float64)
+    erros = respondidas.astype(np.float64) - x
+    return x @ tabela["log_p"].T + erros @ tabela["log_q"].T
+
+
+def _posteriori(acertos, respondidas, tabela):
+    """Distribuição a posteriori normalizada e log-verossimilhança marginal por aluno"""
+    log_post = _log_verossimilhanca(acertos, respondidas, tabela) + tabela["log_pesos"]
+    maximo = log_post.max(axis=1, keepdims=True)
+    post = np.exp(log_post - maximo)
+    soma = post.sum(axis=1, keepdims=True)
+    post /= soma
+    return post, (np.log(soma) + maximo).ravel()
+
+
+def _estimar_eap(acertos, respondidas, tabela):
+    """Esperança a posteriori (EAP) e desvio padrão a posteriori"""
+    post, _ = _posteriori(acertos, respondidas, tabela)
+    theta = tabela["theta"]
+    media = post @ theta
+    variancia = np.maximum(post @ theta ** 2 - media ** 2, 0.0)
+    return media, np.sqrt(variancia)
+
+
+def _estimar_mle(acertos, respondidas, parametros, tabela, max_iteracoes=25, tolerancia=1e-4):
+    """Máxima verossimilhança por escore de Fisher, partindo da EAP"""
+    a, b, c = parametros["a"], parametros["b"], parametros["c"]
+    x = acertos.astype(np.float64)
+    r = respondidas.astype(np.float64)
+    theta, _ = _estimar_eap(acertos, respondidas, tabela)
+    informacao = np.zeros_like(theta)
+
+    for _ in range(max_iteracoes):
+        p = np.clip(probabilidade_3pl(theta[:, None], a, b, c), _EPSILON, 1 - _EPSILON)
+        fator = D * a * (p - c) / (1 - c)
+        gradiente = (r * fator * (x - p) / p).sum(axis=1)
+        informacao = (r * fator ** 2 * (1 - p) / p).sum(axis=1)
+
+        passo = np.divide(gradiente, informacao, out=np.zeros_like(theta), where=informacao > 0)
+        passo = np.clip(passo, -1.0, 1.0)
+        theta = np.clip(theta + passo, *LIMITES_THETA)
+
+        if np.max(np.abs(passo), initial=0.0) < tolerancia:
+            break
+
+    with np.errstate(divide="ignore"):
+        erro_padrao = 1 / np.sqrt(informacao)
+
+    return theta, erro_padrao
+
+
+def _estimar_bloco(acertos, respondidas, parametros, metodo, n_pontos):
+    """Estima um bloco de alunos (executado também nos processos do pool)"""
+    tabela = montar_tabela_quadratura(parametros, n_pontos)
+    if metodo == "EAP":
+        return _estimar_eap(acertos, respondidas, tabela)
+    return _estimar_mle(acertos, respondidas, parametros, tabela)
+
+
+def estimar_proficiencia(acertos, respondidas, parametros: Dict, metodo: str = "EAP",
+                         n_pontos: int = N_PONTOS_QUADRATURA,
+                         tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                         n_processos: Optional[int] = None) -> Dict:
+    """
+    Estima θ para todos os alunos
+
+    Args:
+        acertos: Máscara booleana alunos × itens de respostas corretas
+        respondidas: Máscara booleana alunos × itens de itens respondidos
+        parametros: Dict com vetores "a", "b" e "c" por item
+        metodo: "EAP" (esperança a posteriori) ou "MLE" (máxima verossimilhança)
+        n_pontos: Pontos de quadratura
+        tamanho_bloco: Alunos por bloco de estimação
+        n_processos: Se > 1, distribui os blocos em um pool de processos
+
+    Returns:
+        Dict com "theta" e "erro_padrao" por aluno
+    """
+    if metodo not in ("EAP", "MLE"):
+        raise ValueError(f"Método de estimação desconhecido: {metodo}")
+
+    acertos = np.asarray(acertos, dtype=bool)
+    respondidas = np.asarray(respondidas, dtype=bool)
+    parametros = {k: np.asarray(parametros[k], dtype=np.float64) for k in ("a", "b", "c")}
+
+    blocos = [slice(i, i + tamanho_bloco) for i in range(0, acertos.shape[0], tamanho_bloco)]
+
+    if n_processos and n_processos > 1 and len(blocos) > 1:
+        with ProcessPoolExecutor(max_workers=n_processos) as executor:
+            futuros = [
+                executor.submit(_estimar_bloco, acertos[s], respondidas[s], parametros, metodo, n_pontos)
+                for s in blocos
+            ]
+            estimativas = [f.result() for f in futuros]
+    else:
+        estimativas = [
+            _estimar_bloco(acertos[s], respondidas[s], parametros, metodo, n_pontos) for s in blocos
+        ]
+
+    if not estimativas:
+        return {"theta": np.zeros(0), "erro_padrao": np.zeros(0)}
+
+    return {
+        "theta": np.concatenate([e[0] for e in estimativas]),
+        "erro_padrao": np.concatenate([e[1] for e in estimativas])
+    }
+
+
+def _parametros_iniciais(acertos, respondidas):
+    """Valores iniciais: a = 1, c = 0,2 e b a partir da proporção de acerto"""
+    n_itens = acertos.shape[1]
+    total = respondidas.sum(axis=0)
+    p_valor = np.divide(acertos.sum(axis=0), total, out=np.full(n_itens, 0.5), where=total > 0)
+
+    a = np.ones(n_itens)
+    c = np.full(n_itens, 0.2)
+    p_ajustado = np.clip((p_valor - c) / (1 - c), 0.02, 0.98)
+    b = np.clip(-np.log(p_ajustado / (1 - p_ajustado)) / D, *LIMITES_B)
+
+    return {"a": a, "b": b, "c": c}
+
+
+def _passo_m(parametros, theta, n_esperado, r_esperado, iteracoes=5):
+    """
+    Passo M: maximiza a verossimilhança esperada de todos os itens ao mesmo
+    tempo por escore de Fisher com prioris nos parâmetros
+    """
+    a, b, c = parametros["a"].copy(), parametros["b"].copy(), parametros["c"].copy()
+
+    for _ in range(iteracoes):
+        p_estrela = 1 / (1 + np.exp(-D * a[:, None] * (theta[None, :] - b[:, None])))
+        p = np.clip(c[:, None] + (1 - c[:, None]) * p_estrela, _EPSILON, 1 - _EPSILON)
+        derivada_logistica = (1 - c[:, None]) * p_estrela * (1 - p_estrela) * D
+
+        # Derivadas de P em relação a (a, b, c): itens × 3 × pontos
+        derivadas = np.stack([
+            derivada_logistica * (theta[None, :] - b[:, None]),
+            -derivada_logistica * a[:, None],
+            1 - p_estrela
+        ], axis=1)
+
+        peso = 1 / (p * (1 - p))
+        gradiente = np.einsum("ik,ijk->ij", (r_esperado - n_esperado * p) * peso, derivadas)
+        informacao = np.einsum("ik,ijk,ilk->ijl", n_esperado * peso, derivadas, derivadas)
+
+        # Prioris
+        gradiente[:, 0] += -np.log(a) / (DESVIO_LOG_A ** 2 * a) - 1 / a
+        gradiente[:, 1] += -b / DESVIO_B ** 2
+        gradiente[:, 2] += (ALFA_C - 1) / c - (BETA_C - 1) / (1 - c)
+        informacao[:, 0, 0] += 1 / (DESVIO_LOG_A ** 2 * a ** 2)
+        informacao[:, 1, 1] += 1 / DESVIO_B ** 2
+        informacao[:, 2, 2] += (ALFA_C - 1) / c ** 2 + (BETA_C - 1) / (1 - c) ** 2
+
+        passo = np.linalg.solve(informacao, gradiente[:, :, None])[:, :, 0]
+        passo = np.clip(passo, [-0.5, -0.5, -0.05], [0.5, 0.5, 0.05])
+
+        a = np.clip(a + passo[:, 0], *LIMITES_A)
+        b = np.clip(b + passo[:, 1], *LIMITES_B)
+        c = np.clip(c + passo[:, 2], LIMITES_C[0] + 1e-3, LIMITES_C[1])
+
+    return {"a": a, "b": b, "c": c}
+
+
+def calibrar_itens(acertos, respondidas, n_pontos: int = N_PONTOS_QUADRATURA,
+                   max_iteracoes: int = 100, tolerancia: float = 1e-3,
+                   tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                   parametros_iniciais: Optional[Dict] = None) -> Dict:
+    """
+    Calibra os parâmetros (a, b, c) por máxima verossimilhança marginal (EM)
+
+    A distribuição de θ é fixada em N(0, 1), o que define a métrica.
+
+    Args:
+        acertos: Máscara booleana alunos × itens de respostas corretas
+        respondidas: Máscara booleana alunos × itens de itens respondidos
+        n_pontos: Pontos de quadratura
+        max_iteracoes: Limite de ciclos EM
+        tolerancia: Maior variação de parâmetro aceita para convergência
+        tamanho_bloco: Alunos processados por bloco no passo E
+
+    Returns:
+        Dict com vetores "a", "b", "c", número de "iteracoes", "convergiu"
+        e "log_verossimilhanca" final
+    """
+    acertos = np.asarray(acertos, dtype=bool)
+    respondidas = np.asarray(respondidas, dtype=bool)
+
+    if acertos.shape != respondidas.shape or acertos.ndim != 2:
+        raise ValueError("As máscaras de acertos e respondidas devem ter o mesmo formato alunos × itens")
+
+    parametros = parametros_iniciais or _parametros_iniciais(acertos, respondidas)
+    parametros = {k: np.asarray(v, dtype=np.float64) for k, v in parametros.items()}
+    n_alunos, n_itens = acertos.shape
+    convergiu = False
+    log_verossimilhanca = -np.inf
+    iteracao = 0
+
+    for iteracao in range(1, max_iteracoes + 1):
+        tabela = montar_tabela_quadratura(parametros, n_pontos)
+        n_esperado = np.zeros((n_itens, n_pontos))
+        r_esperado = np.zeros((n_itens, n_pontos))
+        log_verossimilhanca = 0.0
+
+        # Passo E: contagens esperadas de respondentes e acertos em cada ponto
+        for inicio in range(0, n_alunos, tamanho_bloco):
+            bloco = slice(inicio, inicio + tamanho_bloco)
+            post, log_marginal = _posteriori(acertos[bloco], respondidas[bloco], tabela)
+            n_esperado += respondidas[bloco].T.astype(np.float64) @ post
+            r_esperado += acertos[bloco].T.astype(np.float64) @ post
+            log_verossimilhanca += log_marginal.sum()
+
+        novos = _passo_m(parametros, tabela["theta"], n_esperado, r_esperado)
+        variacao = max(np.max(np.abs(novos[k] - parametros[k]), initial=0.0) for k in novos)
+        parametros = novos
+
+        if variacao < tolerancia:
+            convergiu = True
+            break
+
+    return {
+        **parametros,
+        "iteracoes": iteracao,
+        "convergiu": convergiu,
+        "log_verossimilhanca": float(log_verossimilhanca)
+    }
+
+
+def _mascaras(matriz, ids_questoes: Sequence, omissao_como_erro: bool):
+    """Corrige a matriz de códigos e devolve as máscaras usadas pela TRI"""
+    gabarito, descritores = montar_gabarito(ids_questoes)
+    correcao = corrigir_matriz(matriz, gabarito, descritores)
+    respondidas = correcao["mascara_respondidas"]
+
+    if omissao_como_erro:
+        # Itens em branco contam como erro; apenas questões inexistentes ficam de fora
+        respondidas = np.broadcast_to(gabarito != 0, respondidas.shape)
+
+    return correcao["mascara_acertos"], respondidas
+
+
+def calibrar_banco(matriz, ids_questoes: Sequence, omissao_como_erro: bool = True, **opcoes) -> Dict:
+    """
+    Calibra as questões do banco a partir de uma matriz de respostas codificada
+
+    Args:
+        matriz: Array uint8 (alunos × questões) com códigos de CODIGOS_ALTERNATIVAS
+        ids_questoes: IDs das questões na ordem das colunas
+        omissao_como_erro: Se True, respostas em branco contam como erro
+        **opcoes: Repassadas para `calibrar_itens`
+
+    Returns:
+        Dict com "parametros" ({id_questao: {"a", "b", "c"}}), "iteracoes",
+        "convergiu" e "log_verossimilhanca"
+    """
+    acertos, respondidas = _mascaras(matriz, ids_questoes, omissao_como_erro)
+    calibracao = calibrar_itens(acertos, respondidas, **opcoes)
+
+    return {
+        "parametros": {
+            id_questao: {
+                "a": float(calibracao["a"][i]),
+                "b": float(calibracao["b"][i]),
+                "c": float(calibracao["c"][i])
+            }
+            for i, id_questao in enumerate(ids_questoes)
+        },
+        "iteracoes": calibracao["iteracoes"],
+        "convergiu": calibracao["convergiu"],
+        "log_verossimilhanca": calibracao["log_verossimilhanca"]
+    }
+
+
+def estimar_proficiencia_banco(matriz, ids_questoes: Sequence, parametros: Dict,
+                               omissao_como_erro: bool = True, **opcoes) -> Dict:
+    """
+    Estima θ dos alunos de uma matriz de respostas codificada
+
+    Args:
+        matriz: Array uint8 (alunos × questões) com códigos de CODIGOS_ALTERNATIVAS
+        ids_questoes: IDs das questões na ordem das colunas
+        parametros: Dict {id_questao: {"a", "b", "c"}} (ex.: "parametros" de `calibrar_banco`)
+        omissao_como_erro: Se True, respostas em branco contam como erro
+        **opcoes: Repassadas para `estimar_proficiencia`
+
+    Returns:
+        Dict com "theta", "erro_padrao" e "escala_saeb" por aluno
+    """
+    acertos, respondidas = _mascaras(matriz, ids_questoes, omissao_como_erro)
+    vetores = {
+        k: np.array([parametros[i][k] for i in ids_questoes], dtype=np.float64)
+        for k in ("a", "b", "c")
+    }
+
+    estimativa = estimar_proficiencia(acertos, respondidas, vetores, **opcoes)
+    estimativa["escala_saeb"] = converter_escala_saeb(estimativa["theta"])
+
+    return estimativa
+
+
+def converter_escala_saeb(theta, media: float = MEDIA_ESCALA_SAEB, desvio: float = DESVIO_ESCALA_SAEB):
+    """Converte θ da métrica (0, 1) para a escala de proficiência SAEB"""
+    return media + desvio * np.asarray(theta)
@@ -0,0 +1,46 @@
+"""
+Testes dos Agregados Incrementais
+Turmas de mesmo nome em escolas diferentes não podem ser somadas juntas
+"""
+
+from src.agregados import AgregadosRespostas
+
+
+def _resultado(acertou: bool) -> dict:
+    return {"questao_id": 1, "descritor": "D1", "acertou": acertou}
+
+
+def _registrar_duas_escolas(agregados: AgregadosRespostas):
+    agregados.registrar(_resultado(True), turma="9A", escola="E1")
+    agregados.registrar(_resultado(False), turma="9A", escola="E2")
+    agregados.registrar(_resultado(False), turma="9A", escola="E2")
+
+
+def _verificar(agregados: AgregadosRespostas):
+    turma_e1 = agregados.resumo(turma="9A", escola="E1")
+    turma_e2 = agregados.resumo(turma="9A", escola="E2")
+
+    assert (turma_e1["total_questoes"], turma_e1["acertos"]) == (1, 1)
+    assert (turma_e2["total_questoes"], turma_e2["acertos"]) == (2, 0)
+    assert agregados.por_questao(turma="9A", escola="E1")[1]["respostas"] == 1
+    assert agregados.por_questao(turma="9A", escola="E2")[1]["respostas"] == 2
+    assert agregados.resumo()["total_questoes"] == 3
+    assert agregados.listar_escopos("turma") == [("E1", "9A"), ("E2", "9A")]
+    assert agregados.listar_escopos("escola") == ["E1", "E2"]
+
+
+def test_turmas_homonimas_em_memoria():
+    agregados = AgregadosRespostas()
+    _registrar_duas_escolas(agregados)
+    _verificar(agregados)
+
+
+def test_turmas_homonimas_no_arquivo(tmp_path):
+    caminho = tmp_path / "agregados.sqlite"
+    agregados = AgregadosRespostas(caminho)
+    _registrar_duas_escolas(agregados)
+    agregados.fechar()
+
+    relidos = AgregadosRespostas(caminho)
+    _verificar(relidos)
+    relidos.fechar()